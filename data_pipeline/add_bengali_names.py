@@ -1,6 +1,8 @@
 """
 Bengali Transliteration Script for Medicine Names
 Adds Bengali (বাংলা) names to the medicine database for Bangla search support.
+The names are added to an in-memory copy that replaces the database
+atomically once every step succeeded (db_publish.py).
 
 Usage:
     python add_bengali_names.py
@@ -9,6 +11,8 @@ Usage:
 import sqlite3
 from pathlib import Path
 
+from db_publish import transform
+
 # Database paths
 DB_PATH = Path("output/medicines.db")
 FLUTTER_DB_PATH = Path("../assets/db/medicines.db")
@@ -334,6 +338,9 @@ def update_fts_index(conn: sqlite3.Connection):
         LEFT JOIN manufacturers m ON b.manufacturer_id = m.id
     """)
     
+    # Merge the index into one segment
+    cursor.execute("INSERT INTO brands_fts (brands_fts) VALUES ('optimize')")
+    
     conn.commit()
     print("FTS index updated with Bengali names.")
 
@@ -398,10 +405,8 @@ def main():
         print(f"Expected: {DB_PATH} or {FLUTTER_DB_PATH}")
         return
     
-    # Connect to database
-    conn = sqlite3.connect(db_path)
-    
-    try:
+    # Work on an in-memory copy, published when every step succeeded
+    with transform(db_path) as conn:
         # Step 1: Add Bengali columns
         add_bengali_columns(conn)
         
@@ -413,15 +418,12 @@ def main():
         
         # Step 4: Verify
         verify_bengali_names(conn)
-        
-        print("\n" + "=" * 60)
-        print("BENGALI NAMES ADDED SUCCESSFULLY!")
-        print("=" * 60)
-        print(f"Database: {db_path}")
-        print("You can now search in Bengali (বাংলা)")
-        
-    finally:
-        conn.close()
+    
+    print("\n" + "=" * 60)
+    print("BENGALI NAMES ADDED SUCCESSFULLY!")
+    print("=" * 60)
+    print(f"Database: {db_path}")
+    print("You can now search in Bengali (বাংলা)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,1243 @@
+"""
+Medicine Saver BD - Pipeline Benchmarks
+
+Synthetic benchmarks for the data pipeline's hot paths. Every benchmark
+generates its own data, so no scraped input is required.
+
+Usage:
+    python benchmarks.py records --count 1000000   # Record memory footprint
+    python benchmarks.py blocking --count 100000   # Fuzzy cross-source matching
+    python benchmarks.py matcher --queries 5000    # Batch edit-distance throughput
+    python benchmarks.py discrepancy --keys 1000000  # Vectorized price discrepancy
+    python benchmarks.py parallel --count 500000     # Sharded cross-verification
+    python benchmarks.py merge --counts 50000 200000  # Streaming N-source merge memory
+    python benchmarks.py neardup --counts 20000 1000000  # MinHash/LSH near-duplicates
+    python benchmarks.py rules --counts 100000 1000000   # Vectorized validation rules
+    python benchmarks.py outliers --count 1000000        # Median/MAD price outlier flags
+    python benchmarks.py build --counts 20000 200000 1000000  # build_db load: row-by-row vs bulk
+    python benchmarks.py incremental --counts 200000 1000000  # Full rebuild vs incremental refresh
+    python benchmarks.py shards --count 1000000 --workers 1 2 4  # Parallel staging-shard build
+    python benchmarks.py layout --count 200000     # Cold-cache alternatives: input vs clustered order
+    python benchmarks.py monographs --count 20000   # Cold-cache search I/O: inline vs split medical text
+    python benchmarks.py monostore --counts 20000 200000  # Monograph text: plain vs interned + compressed
+"""
+
+import argparse
+import bisect
+import contextlib
+import csv
+import gc
+import io
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from dataclasses import MISSING, field, fields, make_dataclass
+
+import numpy as np
+
+from blocking_index import MATCH_THRESHOLD, bounded_levenshtein, match_keys
+from build_db import (
+    FAST_BUILD_PRAGMAS,
+    SAFE_PRAGMAS,
+    BulkLoader,
+    IncrementalLoader,
+    ParallelLoader,
+    apply_pragmas,
+    create_schema,
+    create_tables,
+    finalize_database,
+    monograph,
+    parse_price,
+    populate_fts,
+)
+from cross_verify import (
+    CONFIDENCE_HIGH,
+    CONFIDENCE_LOW,
+    CONFIDENCE_MEDIUM,
+    CONFIDENCE_TIERS,
+    MedicineRecord,
+    VerifiedMedicine,
+    assign_confidence_tiers,
+    build_price_matrix,
+    calculate_price_discrepancies,
+    calculate_price_discrepancy,
+    verify_and_merge,
+)
+from db_publish import open_copy, publish
+from fuzzy_match import BatchMatcher
+from generic_index import GenericIndex
+from manufacturer_registry import load_registry
+from merge_engine import external_sort, merge_verify
+from monograph_store import MONOGRAPH_FIELDS, MonographStore
+from near_duplicates import IDENTITY_FIELDS, candidate_pairs, cluster_products, product_signatures
+from normalize_prices import FLAG_CODES, FLAGS, find_price_flags, form_group
+from validate import FIELDNAMES
+from validation_rules import CHUNK_SIZE, RuleSet, iter_chunks, load_rules
+
+# Vocabulary for synthetic records (roughly the shape of the Kaggle catalog)
+MANUFACTURERS = [f"Pharma {i} Ltd." for i in range(240)]
+DOSAGE_FORMS = ["Tablet", "Capsule", "Syrup", "Injection", "Cream", "Drops",
+                "Oral Suspension", "IV Infusion", "Ointment", "Inhaler"]
+GENERICS = [f"Generic {i}" for i in range(1500)]
+STRENGTHS = ["5 mg", "10 mg", "20 mg", "50 mg", "100 mg", "250 mg", "500 mg",
+             "1 gm", "125 mg/5 ml", "0.1%"]
+SYLLABLES = ["na", "pa", "se", "clo", "max", "pro", "zi", "ce", "fex", "mon",
+             "tas", "ri", "vo", "lin", "to", "ra", "de", "xa", "mi", "lo"]
+
+
+def fresh(value: str) -> str:
+    """Return an equal but distinct string object (as a CSV parser would)."""
+    return value.encode("utf-8").decode("utf-8")
+
+
+def synthetic_rows(count: int, seed: int = 42):
+    """
+    Yield CSV-like row dicts. Every string is built at runtime so, like rows
+    coming out of csv.DictReader, equal values are distinct objects.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        generic = rng.choice(GENERICS)
+        brand = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        price = round(rng.uniform(1, 500), 2)
+        yield {
+            "brand_name": f"{brand.title()} {i % 97}",
+            "generic_name": fresh(generic),
+            "strength": fresh(rng.choice(STRENGTHS)),
+            "dosage_form": fresh(rng.choice(DOSAGE_FORMS)),
+            "manufacturer": fresh(rng.choice(MANUFACTURERS)),
+            "price": price,
+            "unit_price": price,
+            "pack_size": f"{rng.choice((10, 30, 50, 100))}'s pack",
+            "indication": f"Used for conditions treated by {generic}.",
+            "side_effects": f"Common side effects of {generic} include nausea.",
+        }
+
+
+def unslotted(cls):
+    """Build a plain (dict-backed, non-interning) copy of a dataclass for comparison."""
+    spec = []
+    for f in fields(cls):
+        if f.default is not MISSING:
+            spec.append((f.name, f.type, field(default=f.default)))
+        elif f.default_factory is not MISSING:
+            spec.append((f.name, f.type, field(default_factory=f.default_factory)))
+        else:
+            spec.append((f.name, f.type))
+    return make_dataclass(f"Legacy{cls.__name__}", spec)
+
+
+def measure(build) -> tuple[int, float]:
+    """Return (bytes retained, seconds) for the object graph built by build()."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return retained, elapsed
+
+
+def build_records(cls, count: int) -> list:
+    return [
+        cls(
+            brand_name=row["brand_name"],
+            generic_name=row["generic_name"],
+            strength=row["strength"],
+            dosage_form=row["dosage_form"],
+            manufacturer=row["manufacturer"],
+            price=row["price"],
+            unit_price=row["unit_price"],
+            pack_size=row["pack_size"],
+            indication=row["indication"],
+            side_effects=row["side_effects"],
+            source="medex",
+        )
+        for row in synthetic_rows(count)
+    ]
+
+
+def build_verified(cls, count: int) -> list:
+    return [
+        cls(
+            brand_name=row["brand_name"],
+            generic_name=row["generic_name"],
+            strength=row["strength"],
+            dosage_form=row["dosage_form"],
+            manufacturer=row["manufacturer"],
+            verified_price=row["price"],
+            unit_price=row["unit_price"],
+            pack_size=row["pack_size"],
+            indication=row["indication"],
+            side_effects=row["side_effects"],
+            confidence="LOW",
+            price_sources={"medex": row["unit_price"]},
+        )
+        for row in synthetic_rows(count)
+    ]
+
+
+def bench_records(args) -> None:
+    """Memory footprint of MedicineRecord / VerifiedMedicine, legacy vs compact."""
+    print(f"Record memory benchmark ({args.count:,} synthetic records)")
+    print("-" * 60)
+    for cls, build in ((MedicineRecord, build_records), (VerifiedMedicine, build_verified)):
+        legacy_bytes, legacy_time = measure(lambda: build(unslotted(cls), args.count))
+        compact_bytes, compact_time = measure(lambda: build(cls, args.count))
+        saved = 1 - compact_bytes / legacy_bytes
+        print(f"{cls.__name__}:")
+        print(f"  legacy:  {legacy_bytes / 2**20:8.1f} MiB  {legacy_time:6.2f}s")
+        print(f"  compact: {compact_bytes / 2**20:8.1f} MiB  {compact_time:6.2f}s")
+        print(f"  saved:   {saved:8.1%}  ({legacy_bytes / args.count:.0f} -> "
+              f"{compact_bytes / args.count:.0f} bytes/record)")
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Apply one random typo (substitution, deletion, insertion or transposition)."""
+    i = rng.randrange(len(word))
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    kind = rng.randrange(4)
+    if kind == 0:
+        return word[:i] + letter + word[i + 1:]
+    if kind == 1 and len(word) > 4:
+        return word[:i] + word[i + 1:]
+    if kind == 2:
+        return word[:i] + letter + word[i:]
+    if i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word + letter
+
+
+def brand_word(rng: random.Random) -> str:
+    """A pronounceable brand-like word ("zimax", "tofenor", ...)."""
+    syllables = []
+    for _ in range(rng.randint(2, 4)):
+        syllable = rng.choice("bcdfgklmnprstvxz") + rng.choice("aeiou")
+        if rng.random() < 0.3:
+            syllable += rng.choice("lnrsx")
+        syllables.append(syllable)
+    return "".join(syllables)
+
+
+def synthetic_key_pairs(count: int, variant_rate: float, seed: int = 7):
+    """
+    Build two key lists shaped like Medex/DGDA match keys.
+    Returns (left_keys, right_keys, truth) where truth maps each misspelled
+    left key to the right key it should match.
+    """
+    rng = random.Random(seed)
+    strengths = [s.lower().replace(" ", "").replace("/", "").replace(".", "") for s in STRENGTHS]
+    brands = set()
+    while len(brands) < count:
+        brands.add(brand_word(rng))
+
+    left, right, truth = [], [], {}
+    for brand in sorted(brands):
+        strength = rng.choice(strengths)
+        key = f"{brand}_{strength}"
+        right.append(key)
+        roll = rng.random()
+        if roll < variant_rate:
+            variant = f"{misspell(brand, rng)}_{strength}"
+            if variant not in brands:
+                left.append(variant)
+                truth[variant] = key
+        elif roll < variant_rate + 0.05:
+            # Left-only brand with no counterpart at all
+            left.append(f"{brand}{brand_word(rng)}_{strength}")
+        else:
+            left.append(key)
+    rng.shuffle(left)
+    return left, right, truth
+
+
+def bench_blocking(args) -> None:
+    """Fuzzy cross-source matching throughput and match quality."""
+    left, right, truth = synthetic_key_pairs(args.count, args.variant_rate)
+    print(f"Blocking benchmark ({len(left):,} x {len(right):,} keys, "
+          f"{len(truth):,} misspelled, threshold {args.threshold})")
+    print("-" * 60)
+
+    # Pipeline path: exact matches first, fuzzy only for the remainder
+    start = time.perf_counter()
+    right_set = set(right)
+    left_set = set(left)
+    unmatched_left = [k for k in left if k not in right_set]
+    unmatched_right = [k for k in right if k not in left_set]
+    matches = match_keys(unmatched_left, unmatched_right, args.threshold)
+    elapsed = time.perf_counter() - start
+    print(f"Exact + fuzzy remainder: {elapsed:6.2f}s "
+          f"({len(unmatched_left):,} x {len(unmatched_right):,} fuzzy keys)")
+
+    # Worst case: every key goes through the fuzzy index
+    start = time.perf_counter()
+    match_keys(left, right, args.threshold)
+    elapsed = time.perf_counter() - start
+    print(f"All keys fuzzy:          {elapsed:6.2f}s "
+          f"({len(left) * len(right) / elapsed / 1e9:.1f}G naive pairs/sec equivalent)")
+
+    correct = sum(1 for k, (m, _) in matches.items() if truth.get(k) == m)
+    wrong = len(matches) - correct
+    precision = correct / len(matches) if matches else 1.0
+    recall = correct / len(truth) if truth else 1.0
+    print("\nMatch quality (misspelled keys only):")
+    print(f"  Proposed matches: {len(matches):,}")
+    print(f"  Correct:          {correct:,}")
+    print(f"  Wrong:            {wrong:,}")
+    print(f"  Missed:           {len(truth) - correct:,}")
+    print(f"  Precision:        {precision:.1%}")
+    print(f"  Recall:           {recall:.1%}")
+
+
+def bench_matcher(args) -> None:
+    """Batch edit-distance throughput (pairs/sec), bit-parallel vs scalar DP."""
+    rng = random.Random(11)
+    candidates = [f"{brand_word(rng)} {rng.choice(STRENGTHS)}" for _ in range(args.candidates)]
+    queries = [misspell(rng.choice(candidates), rng) for _ in range(args.queries)]
+    print(f"Matcher benchmark ({len(queries):,} queries x {len(candidates):,} candidates)")
+    print("-" * 60)
+
+    start = time.perf_counter()
+    matcher = BatchMatcher(candidates)
+    print(f"Index build:               {time.perf_counter() - start:6.2f}s")
+
+    start = time.perf_counter()
+    for query in queries:
+        matcher.top_k(query, k=5)
+    elapsed = time.perf_counter() - start
+    pairs = len(queries) * len(candidates)
+    print(f"Bit-parallel, all pairs:   {elapsed:6.2f}s  {pairs / elapsed / 1e6:8.2f}M pairs/sec")
+
+    start = time.perf_counter()
+    hits = 0
+    for query in queries:
+        hits += bool(matcher.top_k(query, k=5, min_score=args.min_score))
+    elapsed = time.perf_counter() - start
+    print(f"Bit-parallel, score>={args.min_score}: {elapsed:6.2f}s  "
+          f"{pairs / elapsed / 1e6:8.2f}M pairs/sec equivalent ({hits:,} queries matched)")
+
+    sample = queries[: max(1, len(queries) // 100)]
+    start = time.perf_counter()
+    for query in sample:
+        for candidate in candidates:
+            bounded_levenshtein(query, candidate, max(len(query), len(candidate)))
+    elapsed = time.perf_counter() - start
+    print(f"Scalar DP ({len(sample)} queries):   {elapsed:6.2f}s  "
+          f"{len(sample) * len(candidates) / elapsed / 1e6:8.2f}M pairs/sec")
+
+
+def bench_discrepancy(args) -> None:
+    """Per-key discrepancy/confidence: scalar loop vs vectorized passes."""
+    rng = random.Random(5)
+    price_rows = []
+    for _ in range(args.keys):
+        base = rng.uniform(1, 500)
+        row = [round(base, 2) if rng.random() > 0.05 else 0.0]
+        for _ in range(rng.choice((0, 0, 1, 1, 1, 2))):
+            row.append(round(base * rng.uniform(0.8, 1.2), 2))
+        price_rows.append(row)
+    print(f"Discrepancy benchmark ({len(price_rows):,} keys)")
+    print("-" * 60)
+
+    start = time.perf_counter()
+    legacy = []
+    for row in price_rows:
+        _, deviation, has_discrepancy = calculate_price_discrepancy(row)
+        if len(row) >= 2 and not has_discrepancy:
+            confidence = CONFIDENCE_HIGH
+        elif len(row) >= 2:
+            confidence = CONFIDENCE_MEDIUM
+        else:
+            confidence = CONFIDENCE_LOW
+        legacy.append((deviation, has_discrepancy, confidence))
+    legacy_time = time.perf_counter() - start
+    print(f"Scalar loop:  {legacy_time:6.2f}s")
+
+    start = time.perf_counter()
+    prices, mask = build_price_matrix(price_rows)
+    packed = time.perf_counter()
+    _, deviations, flags = calculate_price_discrepancies(prices, mask)
+    tiers = assign_confidence_tiers(mask.sum(axis=1), flags)
+    vector_time = time.perf_counter() - start
+    print(f"Vectorized:   {vector_time:6.2f}s  (packing {packed - start:.2f}s, "
+          f"compute {time.perf_counter() - packed:.2f}s)")
+    print(f"Speedup:      {legacy_time / vector_time:6.1f}x")
+
+    vectorized = [
+        (float(d), bool(f), CONFIDENCE_TIERS[t]) for d, f, t in zip(deviations, flags, tiers)
+    ]
+    print(f"Identical:    {legacy == vectorized}")
+
+
+def synthetic_sources(count: int) -> tuple[list[MedicineRecord], list[MedicineRecord]]:
+    """Medex/DGDA-like record lists where roughly 70% of keys overlap."""
+    rng = random.Random(3)
+    medex, dgda = [], []
+    for row in synthetic_rows(count):
+        record = dict(row, source="medex")
+        medex.append(MedicineRecord(**record))
+        if rng.random() < 0.7:
+            record["unit_price"] = round(row["unit_price"] * rng.uniform(0.85, 1.15), 2)
+            record["source"] = "dgda"
+            dgda.append(MedicineRecord(**record))
+    return medex, dgda
+
+
+def bench_parallel(args) -> None:
+    """Cross-verification wall time by worker count."""
+    medex, dgda = synthetic_sources(args.count)
+    print(f"Parallel verification benchmark ({len(medex):,} Medex x {len(dgda):,} DGDA records, "
+          f"{os.cpu_count()} CPUs)")
+    print("-" * 60)
+
+    reference = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = verify_and_merge(medex, dgda, workers=workers)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = (elapsed, result)
+        identical = result == reference[1]
+        print(f"workers={workers:<3} {elapsed:6.2f}s  speedup {reference[0] / elapsed:4.1f}x  "
+              f"identical={identical}")
+
+
+def synthetic_stream(count: int, source: str, keep: float, seed: int):
+    """Stream of MedicineRecords for one source: a share of the synthetic catalog, repriced."""
+    rng = random.Random(seed)
+    for row in synthetic_rows(count):
+        if rng.random() < keep:
+            price = round(row["unit_price"] * rng.uniform(0.85, 1.15), 2)
+            yield MedicineRecord(**dict(row, unit_price=price, source=source))
+
+
+def bench_merge(args) -> None:
+    """Streaming merge throughput and peak memory as the input grows."""
+    print(f"Streaming merge benchmark (3 sources, sort chunk {args.chunk_size:,} records)")
+    print("-" * 60)
+    for count in args.counts:
+        streams = {
+            source: external_sort(synthetic_stream(count, source, keep, seed), args.chunk_size)
+            for seed, (source, keep) in enumerate((("medex", 1.0), ("dgda", 0.7), ("kaggle", 0.5)))
+        }
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = merge_verify(
+            streams,
+            price_precedence=("dgda", "kaggle", "medex"),
+            info_precedence=("medex", "kaggle", "dgda"),
+        )
+        keys = sum(1 for _ in rows)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{count:>10,} catalog rows  {keys:>10,} keys  {elapsed:7.2f}s  "
+              f"peak {peak / 2**20:7.1f} MiB")
+
+
+def respell(brand: str, strength: str, rng: random.Random) -> str:
+    """A near-duplicate spelling of a brand name, as different sources write it."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        return brand.upper()
+    if kind == 1:
+        return brand.replace(" ", "-")
+    if kind == 2:
+        return f"{brand} {strength.split()[0]}"
+    return f"  {brand.lower()} "
+
+
+def synthetic_near_duplicates(count: int, variant_rate: float, seed: int = 11):
+    """
+    Catalog rows with respelled copies of a share of them mixed in.
+    Returns (records, origin) where origin[i] is the catalog row record i copies.
+    """
+    rng = random.Random(seed)
+    records, origin = [], []
+    for i, row in enumerate(synthetic_rows(count)):
+        row = {name: str(row[name]) for name in (*IDENTITY_FIELDS, "price")}
+        records.append(row)
+        origin.append(i)
+        if rng.random() < variant_rate:
+            records.append(dict(row, brand_name=respell(row["brand_name"], row["strength"], rng)))
+            origin.append(i)
+    return records, origin
+
+
+def bench_neardup(args) -> None:
+    """Near-duplicate clustering time and quality as the input grows."""
+    print(f"Near-duplicate benchmark (MinHash/LSH, {args.variant_rate:.0%} respelled copies)")
+    print("-" * 60)
+    for count in args.counts:
+        records, origin = synthetic_near_duplicates(count, args.variant_rate)
+        planted = len(records) - count
+
+        start = time.perf_counter()
+        product_of_row, signatures, compatibility = product_signatures(records)
+        signed = time.perf_counter()
+        clusters = cluster_products(product_of_row, signatures, compatibility)
+        elapsed = time.perf_counter() - start
+        candidates = len(candidate_pairs(signatures, compatibility))
+
+        found = 0
+        mixed = 0
+        for rows in clusters:
+            origins = {origin[row] for row in rows}
+            found += len(rows) - len(origins)
+            mixed += len(origins) > 1
+        all_pairs = len(records) * (len(records) - 1) // 2
+        print(f"{len(records):>10,} rows  {elapsed:7.2f}s  ({len(records) / elapsed:,.0f} rows/sec; "
+              f"signatures {signed - start:.2f}s, LSH + clustering {elapsed - (signed - start):.2f}s)")
+        print(f"{'':>16}{candidates:,} candidate pairs scored instead of {all_pairs:,}")
+        print(f"{'':>16}{len(clusters):,} clusters, planted copies found {found:,} / {planted:,} "
+              f"({found / max(planted, 1):.1%}), clusters mixing products: {mixed:,}")
+
+
+def synthetic_raw_records(count: int, invalid_rate: float, seed: int = 5) -> list[dict]:
+    """Scraped-CSV-like records (all strings) with a share of them broken."""
+    rng = random.Random(seed)
+    records = []
+    for row in synthetic_rows(count):
+        record = {name: str(row[name]) for name in (*FIELDNAMES, "unit_price")}
+        if rng.random() < invalid_rate:
+            broken = rng.choice(("brand_name", "generic_name", "manufacturer", "price", "price"))
+            record[broken] = rng.choice(("n/a", "999999")) if broken == "price" else ""
+        records.append(record)
+    return records
+
+
+def validate_price(price_str: str) -> tuple[bool, float | None]:
+    """Validate and parse price string."""
+    if not price_str:
+        return True, None  # Missing price is acceptable
+
+    try:
+        # Remove currency symbols and clean
+        cleaned = re.sub(r"[^\d.]", "", price_str)
+        price = float(cleaned)
+
+        # Sanity checks
+        if price < 0:
+            return False, None
+        if price > 50000:  # Unreasonably high
+            return False, None
+
+        return True, price
+    except ValueError:
+        return False, None
+
+
+def validate_record(record: dict) -> tuple[bool, list[str]]:
+    """validate.py's hand-written checks before the rule engine: the row-at-a-time baseline."""
+    errors = []
+
+    # Required fields
+    if not record.get("brand_name"):
+        errors.append("Missing brand name")
+    if not record.get("generic_name"):
+        errors.append("Missing generic name")
+    if not record.get("manufacturer"):
+        errors.append("Missing manufacturer")
+
+    # Price validation
+    if record.get("price"):
+        is_valid_price, _ = validate_price(record["price"])
+        if not is_valid_price:
+            errors.append(f"Invalid price: {record['price']}")
+
+    return len(errors) == 0, errors
+
+
+# Rules covering what validate_record checks
+LEGACY_RULES = ("brand_name_required", "generic_name_required", "manufacturer_required",
+                "price_numeric", "price_range")
+
+
+def run_rules(rules: RuleSet, records: list[dict], chunk_size: int) -> tuple[int, float]:
+    """(rows rejected, seconds) for evaluating a rule set chunk by chunk."""
+    start = time.perf_counter()
+    rejected = 0
+    for chunk in iter_chunks(records, chunk_size):
+        result = rules.evaluate(chunk)
+        result.counts()
+        rejected += int(result.rejected.sum())
+    return rejected, time.perf_counter() - start
+
+
+def bench_rules(args) -> None:
+    """Rule engine throughput against the row-at-a-time validate_record loop."""
+    rules = load_rules()
+    legacy_rules = RuleSet([rule for rule in rules.rules if rule.name in LEGACY_RULES])
+    print(f"Validation benchmark (validate_record vs rule engine, {args.invalid_rate:.0%} broken rows)")
+    print("-" * 60)
+    for count in args.counts:
+        records = synthetic_raw_records(count, args.invalid_rate)
+
+        start = time.perf_counter()
+        legacy_rejected = sum(1 for record in records if not validate_record(record)[0])
+        legacy = time.perf_counter() - start
+        print(f"{count:>10,} rows  validate_record loop     {legacy:6.2f}s "
+              f"({count / legacy:>9,.0f} rows/sec)  rejected {legacy_rejected:,}")
+
+        for label, rule_set in (("same checks", legacy_rules), ("all rules", rules)):
+            rejected, elapsed = run_rules(rule_set, records, args.chunk_size)
+            print(f"{'':>16}{len(rule_set.rules)} rules {'(' + label + ')':<15}  {elapsed:6.2f}s "
+                  f"({count / elapsed:>9,.0f} rows/sec)  rejected {rejected:,}  "
+                  f"{legacy / elapsed:4.1f}x")
+
+
+def synthetic_priced_catalog(count: int, error_rate: float, seed: int = 3):
+    """
+    Catalog columns (generic ids, strengths, forms, prices, pack counts) where
+    error_rate of the prices carry a planted unit-scale mistake.
+    Returns (columns, planted) with planted[i] the flag planted in row i ("" if none).
+    """
+    rng = np.random.default_rng(seed)
+    generic_ids = rng.integers(0, len(GENERICS), count)
+    strength_codes = rng.integers(0, len(STRENGTHS), count)
+    form_codes = rng.integers(0, len(DOSAGE_FORMS), count)
+    pack_counts = rng.choice([10.0, 20.0, 30.0, 50.0, 100.0], count)
+
+    # Each medicine (generic, strength, form group) has a typical price; brands vary ~15% around it
+    groups = {form: code for code, form in enumerate(dict.fromkeys(map(form_group, DOSAGE_FORMS)))}
+    group_codes = np.array([groups[form_group(form)] for form in DOSAGE_FORMS])[form_codes]
+    medicine = (generic_ids * len(STRENGTHS) + strength_codes) * len(groups) + group_codes
+    typical = np.exp(np.random.default_rng(seed + 1).uniform(0, 6, int(medicine.max()) + 1))
+    prices = typical[medicine] * rng.lognormal(0, 0.15, count)
+
+    planted = np.zeros(count, dtype=np.int8)
+    broken = np.flatnonzero(rng.random(count) < error_rate)
+    kinds = rng.choice(["pack_price", "unit_price", "paisa"], len(broken))
+    for kind, factor in (("pack_price", pack_counts), ("unit_price", 1 / pack_counts), ("paisa", 100.0)):
+        rows = broken[kinds == kind]
+        prices[rows] *= factor if np.isscalar(factor) else factor[rows]
+        planted[rows] = FLAG_CODES[kind]
+
+    strengths = [STRENGTHS[code] for code in strength_codes.tolist()]
+    forms = [DOSAGE_FORMS[code] for code in form_codes.tolist()]
+    return (generic_ids, strengths, forms, np.round(prices, 2), pack_counts), planted
+
+
+def bench_outliers(args) -> None:
+    """Grouped median/MAD outlier detection time and planted-error recall."""
+    columns, planted = synthetic_priced_catalog(args.count, args.error_rate)
+    print(f"Price outlier benchmark ({args.count:,} rows, {args.error_rate:.1%} planted scale errors)")
+    print("-" * 60)
+
+    start = time.perf_counter()
+    result = find_price_flags(*columns)
+    elapsed = time.perf_counter() - start
+    print(f"  {elapsed:.2f}s ({args.count / elapsed:,.0f} rows/sec)")
+
+    for kind in ("pack_price", "unit_price", "paisa"):
+        code = FLAG_CODES[kind]
+        rows = planted == code
+        print(f"  {kind:<14} planted {int(rows.sum()):>7,}  flagged as {kind} "
+              f"{int((result.flags[rows] == code).sum()):>7,}  flagged at all {int((result.flags[rows] > 0).sum()):>7,}")
+    clean = planted == 0
+    false_flags = int((result.flags[clean] > 0).sum())
+    print(f"  clean rows flagged: {false_flags:,} of {int(clean.sum()):,} ({false_flags / max(int(clean.sum()), 1):.3%})")
+    counts = np.bincount(result.flags, minlength=len(FLAGS))
+    print("  flags: " + ", ".join(f"{FLAGS[code]} {counts[code]:,}" for code in range(1, len(FLAGS))))
+
+
+def row_by_row_load(cursor: sqlite3.Cursor, records) -> int:
+    """The build loop before BulkLoader: a SELECT/UPDATE/INSERT round trip per record."""
+    registry, generic_index, generic_ids = load_registry(), GenericIndex(), {}
+    monographs = MonographStore(cursor)
+    inserted = 0
+    for record in records:
+        generic_name = record["generic_name"].strip()
+        brand_name = record["brand_name"].strip()
+        manufacturer_name = registry.canonical_name(record["manufacturer"].strip())
+        indication, side_effects = record["indication"], record["side_effects"]
+
+        key = generic_index.resolve(generic_name)
+        generic_id = generic_ids.get(key)
+        if generic_id is None:
+            cursor.execute("INSERT INTO generics (name) VALUES (?)", (generic_name,))
+            generic_id = generic_ids[key] = cursor.lastrowid
+        if indication or side_effects:
+            monographs.write([(generic_id, monograph(indication, side_effects))])
+
+        cursor.execute("SELECT id FROM manufacturers WHERE name = ?", (manufacturer_name,))
+        found = cursor.fetchone()
+        if found:
+            manufacturer_id = found[0]
+        else:
+            cursor.execute("INSERT INTO manufacturers (name) VALUES (?)", (manufacturer_name,))
+            manufacturer_id = cursor.lastrowid
+
+        price = parse_price(record["price"])
+        cursor.execute(
+            """
+            INSERT INTO brands (
+                name, generic_id, manufacturer_id, strength, dosage_form,
+                price, unit_price, pack_size, confidence, verified, last_updated
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (brand_name, generic_id, manufacturer_id, record["strength"], record["dosage_form"],
+             price, parse_price(record["unit_price"]) or price, record["pack_size"], "LOW", False,
+             time.strftime("%Y-%m-%d")),
+        )
+        inserted += 1
+    return inserted
+
+
+def bulk_load(cursor: sqlite3.Cursor, records) -> int:
+    loader = BulkLoader(cursor)
+    loader.load(records)
+    loader.finish()
+    return loader.inserted
+
+
+def timed_build(load, rows: list[dict], directory: str, fast: bool = False) -> tuple[int, float]:
+    """
+    (brands inserted, seconds) for building a fresh database file from rows:
+    schema, load and FTS, or with fast=True the fast-build profile (PRAGMAs,
+    tables only, then indexes, FTS and ANALYZE).
+    """
+    path = os.path.join(directory, f"{load.__name__}_{len(rows)}.db")
+    start = time.perf_counter()
+    conn = sqlite3.connect(path)
+    if fast:
+        apply_pragmas(conn, FAST_BUILD_PRAGMAS)
+        create_tables(conn)
+        inserted = load(conn.cursor(), rows)
+        conn.commit()
+        finalize_database(conn)
+    else:
+        create_schema(conn)
+        inserted = load(conn.cursor(), rows)
+        populate_fts(conn.cursor())
+        conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    os.remove(path)
+    return inserted, elapsed
+
+
+def bench_build(args) -> None:
+    """build_db load time: one round trip per record vs in-memory IDs and executemany."""
+    print("Database build benchmark (schema, load, FTS; fast profile adds ANALYZE)")
+    print("-" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.counts:
+            rows = list(synthetic_rows(count))
+            _, legacy = timed_build(row_by_row_load, rows, directory)
+            _, bulk = timed_build(bulk_load, rows, directory)
+            _, fast = timed_build(bulk_load, rows, directory, fast=True)
+            del rows
+            print(f"{count:>10,} rows  row-by-row {legacy:7.2f}s  bulk {bulk:7.2f}s ({legacy / bulk:4.1f}x)  "
+                  f"bulk + fast profile {fast:7.2f}s ({legacy / fast:4.1f}x, {count / fast:,.0f} rows/sec)")
+
+
+def refreshed_rows(rows: list[dict], share: float, seed: int = 7) -> list[dict]:
+    """
+    A catalog refresh touching a share of the rows: a quarter of them
+    delisted, a quarter joined by a new brand, half repriced.
+    """
+    rng = random.Random(seed)
+    refreshed = []
+    for i, row in enumerate(rows):
+        roll = rng.random() / share
+        if roll < 0.25:
+            continue
+        if roll < 0.5:
+            refreshed.append({**row, "brand_name": f"Newbrand {i}"})
+        elif roll < 1:
+            price = round(row["price"] * 1.1, 2)
+            row = {**row, "price": price, "unit_price": price}
+        refreshed.append(row)
+    return refreshed
+
+
+def full_build(rows: list[dict], path: str) -> None:
+    """build_db.py: load in memory, index, publish."""
+    conn = sqlite3.connect(":memory:")
+    apply_pragmas(conn, FAST_BUILD_PRAGMAS)
+    create_tables(conn)
+    loader = BulkLoader(conn.cursor())
+    loader.load(rows)
+    loader.finish()
+    conn.commit()
+    finalize_database(conn)
+    publish(conn, path)
+    conn.close()
+
+
+def incremental_build(rows: list[dict], path: str) -> IncrementalLoader:
+    """build_db.py --incremental: copy into memory, apply the differences, publish."""
+    conn = open_copy(path)
+    apply_pragmas(conn, SAFE_PRAGMAS)
+    loader = IncrementalLoader(conn.cursor())
+    loader.load(rows)
+    loader.finish()
+    conn.execute("PRAGMA optimize")
+    publish(conn, path)
+    conn.close()
+    return loader
+
+
+def bench_incremental(args) -> None:
+    """Refreshing a built database: full rebuild vs --incremental."""
+    print(f"Incremental build benchmark ({args.share:.0%} of the rows touched)")
+    print("-" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "medicines.db")
+        for count in args.counts:
+            rows = list(synthetic_rows(count))
+            refreshed = refreshed_rows(rows, args.share)
+            # All strings, as csv.DictReader yields them
+            rows, refreshed = ([{name: str(value) for name, value in row.items()} for row in table]
+                               for table in (rows, refreshed))
+            full_build(rows, path)
+
+            start = time.perf_counter()
+            loader = incremental_build(refreshed, path)
+            incremental = time.perf_counter() - start
+            start = time.perf_counter()
+            full_build(refreshed, path)
+            full = time.perf_counter() - start
+            del rows, refreshed
+            print(f"{count:>10,} rows  full rebuild {full:7.2f}s  incremental {incremental:7.2f}s "
+                  f"({incremental / full:.0%})  +{loader.inserted:,} ~{len(loader.updated_ids):,} "
+                  f"-{len(loader.deleted_ids):,}")
+
+
+def sharded_build(path: str, workers: int) -> sqlite3.Connection:
+    """build_db.py --workers N (sequential BulkLoader for 0), without the publish step."""
+    conn = sqlite3.connect(":memory:")
+    apply_pragmas(conn, FAST_BUILD_PRAGMAS)
+    create_tables(conn)
+    now = time.time()
+    if workers:
+        loader = ParallelLoader(conn.cursor(), workers, use_reports=False, now=now)
+    else:
+        loader = BulkLoader(conn.cursor(), now=now)
+    loader.load_csv(path)
+    loader.finish()
+    conn.commit()
+    finalize_database(conn)
+    return conn
+
+
+def bench_shards(args) -> None:
+    """build_db load: sequential BulkLoader vs staging shards merged with ATTACH."""
+    print(f"Sharded build benchmark ({args.count:,} rows, {os.cpu_count()} CPUs)")
+    print("-" * 60)
+    tables = ("generics", "generic_monographs", "monograph_texts", "monograph_dictionary", "generic_aliases",
+              "manufacturers", "brands", "brand_sources")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "verified_medicines.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            rows = synthetic_rows(args.count)
+            first = next(rows)
+            writer = csv.DictWriter(f, fieldnames=list(first))
+            writer.writeheader()
+            writer.writerow(first)
+            writer.writerows(rows)
+
+        reference = None
+        for workers in [0, *args.workers]:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                conn = sharded_build(path, workers)
+            elapsed = time.perf_counter() - start
+            # last_updated follows the build time, so compare everything else
+            content = [conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall() for table in tables[:-2]]
+            content += [conn.execute("SELECT id, name, price, brand_sources.source_hash FROM brands "
+                                     "JOIN brand_sources ON brand_id = id ORDER BY id").fetchall()]
+            conn.close()
+            if reference is None:
+                reference = (elapsed, content)
+            label = f"workers={workers}" if workers else "sequential"
+            print(f"{label:<11} {elapsed:7.2f}s  speedup {reference[0] / elapsed:4.1f}x  "
+                  f"identical={content == reference[1]}")
+            del content
+
+
+# DatabaseHelper.findAlternatives in lib/services/database_helper.dart
+ALTERNATIVES_QUERY = """
+    SELECT
+        b.id, b.name, b.generic_id, b.manufacturer_id, b.strength,
+        b.dosage_form, b.price, b.pack_size, b.verified,
+        g.name as generic_name,
+        m.name as manufacturer_name
+    FROM brands b
+    LEFT JOIN generics g ON b.generic_id = g.id
+    LEFT JOIN manufacturers m ON b.manufacturer_id = m.id
+    WHERE b.generic_id = ?
+    ORDER BY b.price ASC
+"""
+
+
+def brand_pages(conn: sqlite3.Connection) -> tuple[list[int], list[int]]:
+    """(id of the last brand on each brands leaf page, page number), in id order."""
+    leaves = conn.execute(
+        "SELECT path, pageno, ncell FROM dbstat WHERE name = 'brands' AND pagetype = 'leaf' ORDER BY path"
+    ).fetchall()
+    ids = [id for id, in conn.execute("SELECT id FROM brands ORDER BY id")]
+    last_ids, pages, seen = [], [], 0
+    for _, pageno, cells in leaves:
+        seen += cells
+        last_ids.append(ids[seen - 1])
+        pages.append(pageno)
+    return last_ids, pages
+
+
+def drop_file_cache(path: str) -> None:
+    """Evict a file from the OS page cache (Linux), so the next read is cold."""
+    if hasattr(os, "posix_fadvise"):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def cold_alternatives(path: str, generic_ids: list[int]) -> tuple[float, float, float]:
+    """
+    (median ms, 95th percentile ms, mean brands leaf pages) of the
+    alternatives query, each run on a fresh connection with the file
+    evicted from the OS cache.
+    """
+    conn = sqlite3.connect(path)
+    last_ids, pages = brand_pages(conn)
+    touched = []
+    for generic_id in generic_ids:
+        ids = [id for id, in conn.execute("SELECT id FROM brands WHERE generic_id = ?", (generic_id,))]
+        touched.append(len({pages[bisect.bisect_left(last_ids, id)] for id in ids}))
+    conn.close()
+
+    times = []
+    for generic_id in generic_ids:
+        drop_file_cache(path)
+        start = time.perf_counter()
+        conn = sqlite3.connect(path)
+        conn.execute(ALTERNATIVES_QUERY, (generic_id,)).fetchall()
+        conn.close()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.95)], sum(touched) / len(touched)
+
+
+def bench_layout(args) -> None:
+    """Cold-cache alternatives latency: brands in input order vs clustered by (generic_id, price)."""
+    print(f"Physical layout benchmark ({args.count:,} rows, {args.queries} cold alternatives queries)")
+    print("-" * 60)
+    rows = list(synthetic_rows(args.count))
+    rng = random.Random(9)
+    with tempfile.TemporaryDirectory() as directory:
+        for cluster in (False, True):
+            path = os.path.join(directory, f"medicines_{cluster}.db")
+            conn = sqlite3.connect(":memory:")
+            apply_pragmas(conn, FAST_BUILD_PRAGMAS)
+            create_tables(conn)
+            loader = BulkLoader(conn.cursor())
+            loader.load(rows)
+            loader.finish()
+            conn.commit()
+            finalize_database(conn, cluster=cluster)
+            publish(conn, path)
+            generic_count = conn.execute("SELECT COUNT(*) FROM generics").fetchone()[0]
+            conn.close()
+
+            generic_ids = [rng.randint(1, generic_count) for _ in range(args.queries)]
+            median, p95, pages = cold_alternatives(path, generic_ids)
+            label = "clustered" if cluster else "input order"
+            print(f"{label:<12} median {median:6.2f} ms  p95 {p95:6.2f} ms  "
+                  f"{pages:6.1f} brands pages/query")
+
+
+# DatabaseHelper.searchBrands, without the name_bn columns add_bengali_names.py adds
+SEARCH_QUERY = """
+    SELECT
+        b.id, b.name, b.generic_id, b.manufacturer_id, b.strength,
+        b.dosage_form, b.price, b.pack_size, b.verified,
+        g.name as generic_name,
+        m.name as manufacturer_name
+    FROM brands b
+    LEFT JOIN generics g ON b.generic_id = g.id
+    LEFT JOIN manufacturers m ON b.manufacturer_id = m.id
+    WHERE LOWER(b.name) LIKE ?
+       OR LOWER(g.name) LIKE ?
+    ORDER BY b.price ASC
+    LIMIT 50
+"""
+
+MONOGRAPH_PHRASES = [
+    "Take with food to reduce stomach upset.",
+    "Not recommended during pregnancy unless clearly needed.",
+    "Use with caution in patients with renal or hepatic impairment.",
+    "May cause dizziness; avoid driving until the effect is known.",
+    "Discontinue if a rash or other hypersensitivity reaction occurs.",
+    "Elderly patients may need a lower dose.",
+    "Keep out of the reach of children.",
+    "Do not exceed the recommended dose.",
+]
+
+
+def monograph_rows(count: int, classes: int = 0):
+    """
+    synthetic_rows() with Medex-length indication and side-effect text
+    (~1 KB per generic). With classes, the generics fall into that many drug
+    classes and share their class's side-effect text.
+    """
+    texts = {}
+    for row in synthetic_rows(count):
+        generic = row["generic_name"]
+        if generic not in texts:
+            rng = random.Random(generic)
+            indication = f"{row['indication']} " + " ".join(rng.choices(MONOGRAPH_PHRASES, k=10))
+            if classes:
+                drug_class = f"Class {rng.randrange(classes)}"
+                rng = random.Random(drug_class)
+                side_effects = f"Common side effects of {drug_class} drugs include nausea. "
+            else:
+                side_effects = f"{row['side_effects']} "
+            texts[generic] = indication, side_effects + " ".join(rng.choices(MONOGRAPH_PHRASES, k=8))
+        row["indication"], row["side_effects"] = texts[generic]
+        yield row
+
+
+def inline_monographs(conn: sqlite3.Connection) -> None:
+    """Move the monograph text back into generics, uncompressed, the layout before the hot/cold split."""
+    texts = MonographStore(conn.cursor()).read()
+    for column in MONOGRAPH_FIELDS:
+        conn.execute(f"ALTER TABLE generics ADD COLUMN {column} TEXT")
+        conn.executemany(
+            f"UPDATE generics SET {column} = ? WHERE id = ?",
+            ((fields[column] or None, generic_id) for generic_id, fields in texts.items()),
+        )
+    for table in ("generic_monographs", "monograph_texts", "monograph_dictionary"):
+        conn.execute(f"DROP TABLE {table}")
+    conn.commit()
+
+
+def device_read_bytes() -> int:
+    """Bytes this process has read from storage so far (Linux; 0 elsewhere)."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("read_bytes:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def cold_searches(path: str, terms: list[str]) -> tuple[float, float]:
+    """(median ms, mean KiB read from storage) of searchBrands per term, each against a cold cache."""
+    times, reads = [], []
+    for term in terms:
+        drop_file_cache(path)
+        before = device_read_bytes()
+        start = time.perf_counter()
+        conn = sqlite3.connect(path)
+        conn.execute(SEARCH_QUERY, (term, term)).fetchall()
+        conn.close()
+        times.append((time.perf_counter() - start) * 1000)
+        reads.append((device_read_bytes() - before) / 1024)
+    times.sort()
+    return times[len(times) // 2], sum(reads) / len(reads)
+
+
+def bench_monographs(args) -> None:
+    """Cold-cache search I/O: medical text inline in generics vs in generic_monographs."""
+    # Common syllables stop after 50 matches; the rest scan every brand
+    terms = [f"%{syllable}%" for syllable in SYLLABLES] + [f"%q{i}%" for i in range(20)]
+    print(f"Monograph split benchmark ({args.count:,} rows, {len(terms)} cold searches)")
+    print("-" * 60)
+    rows = list(monograph_rows(args.count))
+    with tempfile.TemporaryDirectory() as directory:
+        for split in (False, True):
+            path = os.path.join(directory, f"medicines_{split}.db")
+            conn = sqlite3.connect(":memory:")
+            apply_pragmas(conn, FAST_BUILD_PRAGMAS)
+            create_tables(conn)
+            loader = BulkLoader(conn.cursor())
+            loader.load(rows)
+            loader.finish()
+            conn.commit()
+            finalize_database(conn)
+            if not split:
+                inline_monographs(conn)
+            publish(conn, path)
+            conn.close()
+
+            sizes = dict(sqlite3.connect(path).execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+            median, kib = cold_searches(path, terms)
+            label = "split" if split else "inline"
+            print(f"{label:<7} generics {sizes['generics'] / 1024:8,.0f} KiB  search median {median:6.2f} ms  "
+                  f"{kib:8,.0f} KiB read/search")
+
+
+PLAIN_MONOGRAPHS = """
+    CREATE TABLE plain_monographs (
+        generic_id INTEGER PRIMARY KEY,
+        indication TEXT,
+        side_effects TEXT
+    )
+"""
+
+
+def monograph_tables_size(conn: sqlite3.Connection, tables: tuple[str, ...]) -> int:
+    """Bytes of some tables and their indexes (dbstat)."""
+    placeholders = ", ".join("?" * len(tables))
+    return conn.execute(
+        f"SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name IN ({placeholders}) "
+        f"OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name IN ({placeholders}))",
+        tables * 2,
+    ).fetchone()[0]
+
+
+def bench_monostore(args) -> None:
+    """Monograph text: plain per-generic rows vs interned and deflated, without and with a dictionary."""
+    for count in args.counts:
+        rows = list(monograph_rows(count, args.classes))
+        per_generic = {}
+        for row in rows:
+            per_generic[row["generic_name"]] = (row["indication"], row["side_effects"])
+        generic_ids = {name: i for i, name in enumerate(per_generic, start=1)}
+        updates = [(generic_ids[row["generic_name"]], row["indication"], row["side_effects"]) for row in rows]
+        raw_bytes = sum(len(a.encode()) + len(b.encode()) for a, b in per_generic.values())
+        print(f"\nMonograph storage ({count:,} records, {len(per_generic):,} generics, "
+              f"{args.classes} classes, {raw_bytes / 1024:,.0f} KiB of text)")
+        print("-" * 72)
+
+        for layout in ("plain", "deflate", "dictionary"):
+            conn = sqlite3.connect(":memory:")
+            create_tables(conn)
+            cursor = conn.cursor()
+            if layout == "plain":
+                cursor.execute(PLAIN_MONOGRAPHS)
+                tables = ("plain_monographs",)
+
+                def write(batch):
+                    cursor.executemany("INSERT OR REPLACE INTO plain_monographs VALUES (?, ?, ?)", batch)
+                    return sum(len(a.encode()) + len(b.encode()) for _, a, b in batch)
+            else:
+                store = MonographStore(cursor)
+                if layout == "deflate":
+                    store.dictionary = b""  # Interned and deflated, without a preset dictionary
+                tables = ("generic_monographs", "monograph_texts", "monograph_dictionary")
+
+                def write(batch):
+                    written = store.written_bytes
+                    store.write((generic_id, monograph(a, b)) for generic_id, a, b in batch)
+                    return store.written_bytes - written
+
+            # A full build: one write per generic
+            start = time.perf_counter()
+            build_bytes = write([(generic_ids[name], *texts) for name, texts in per_generic.items()])
+            build_seconds = time.perf_counter() - start
+            conn.commit()
+            size = monograph_tables_size(conn, tables)
+
+            # Repeated updates: every record rewrites its generic's text, as the
+            # per-record build loop did (and as re-scraped, unchanged text does)
+            start = time.perf_counter()
+            update_bytes = sum(write([update]) for update in updates)
+            update_seconds = time.perf_counter() - start
+            conn.commit()
+            conn.close()
+            print(f"{layout:<11} {size / 1024:7,.0f} KiB  build {build_bytes / 1024:7,.0f} KiB "
+                  f"{build_seconds * 1000 / len(per_generic):6.3f} ms/generic  updates "
+                  f"{update_bytes / count:7,.1f} B/row {update_seconds * 1000 / count:6.3f} ms/row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data pipeline hot paths")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    records = subparsers.add_parser("records", help="Record memory footprint")
+    records.add_argument("--count", type=int, default=1_000_000)
+    records.set_defaults(func=bench_records)
+
+    blocking = subparsers.add_parser("blocking", help="Fuzzy cross-source matching")
+    blocking.add_argument("--count", type=int, default=100_000)
+    blocking.add_argument("--variant-rate", type=float, default=0.1)
+    blocking.add_argument("--threshold", type=float, default=MATCH_THRESHOLD)
+    blocking.set_defaults(func=bench_blocking)
+
+    matcher = subparsers.add_parser("matcher", help="Batch edit-distance throughput")
+    matcher.add_argument("--queries", type=int, default=5_000)
+    matcher.add_argument("--candidates", type=int, default=21_000)
+    matcher.add_argument("--min-score", type=float, default=0.85)
+    matcher.set_defaults(func=bench_matcher)
+
+    discrepancy = subparsers.add_parser("discrepancy", help="Vectorized price discrepancy")
+    discrepancy.add_argument("--keys", type=int, default=1_000_000)
+    discrepancy.set_defaults(func=bench_discrepancy)
+
+    parallel = subparsers.add_parser("parallel", help="Sharded cross-verification")
+    parallel.add_argument("--count", type=int, default=500_000)
+    parallel.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parallel.set_defaults(func=bench_parallel)
+
+    merge = subparsers.add_parser("merge", help="Streaming N-source merge memory")
+    merge.add_argument("--counts", type=int, nargs="+", default=[50_000, 200_000])
+    merge.add_argument("--chunk-size", type=int, default=20_000)
+    merge.set_defaults(func=bench_merge)
+
+    neardup = subparsers.add_parser("neardup", help="MinHash/LSH near-duplicate clustering")
+    neardup.add_argument("--counts", type=int, nargs="+", default=[20_000, 1_000_000])
+    neardup.add_argument("--variant-rate", type=float, default=0.1)
+    neardup.set_defaults(func=bench_neardup)
+
+    rules = subparsers.add_parser("rules", help="Vectorized validation rules")
+    rules.add_argument("--counts", type=int, nargs="+", default=[100_000, 1_000_000])
+    rules.add_argument("--invalid-rate", type=float, default=0.02)
+    rules.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    rules.set_defaults(func=bench_rules)
+
+    outliers = subparsers.add_parser("outliers", help="Median/MAD price outlier flags")
+    outliers.add_argument("--count", type=int, default=1_000_000)
+    outliers.add_argument("--error-rate", type=float, default=0.01)
+    outliers.set_defaults(func=bench_outliers)
+
+    build = subparsers.add_parser("build", help="build_db load: row-by-row vs bulk")
+    build.add_argument("--counts", type=int, nargs="+", default=[20_000, 200_000, 1_000_000])
+    build.set_defaults(func=bench_build)
+
+    incremental = subparsers.add_parser("incremental", help="Full rebuild vs incremental refresh")
+    incremental.add_argument("--counts", type=int, nargs="+", default=[200_000, 1_000_000])
+    incremental.add_argument("--share", type=float, default=0.02, help="Share of the rows touched")
+    incremental.set_defaults(func=bench_incremental)
+
+    shards = subparsers.add_parser("shards", help="Parallel staging-shard build")
+    shards.add_argument("--count", type=int, default=1_000_000)
+    shards.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    shards.set_defaults(func=bench_shards)
+
+    layout = subparsers.add_parser("layout", help="Cold-cache alternatives: input vs clustered order")
+    layout.add_argument("--count", type=int, default=200_000)
+    layout.add_argument("--queries", type=int, default=500)
+    layout.set_defaults(func=bench_layout)
+
+    monographs = subparsers.add_parser("monographs", help="Cold-cache search I/O: inline vs split medical text")
+    monographs.add_argument("--count", type=int, default=20_000)
+    monographs.set_defaults(func=bench_monographs)
+
+    monostore = subparsers.add_parser("monostore", help="Monograph text: plain vs interned + compressed")
+    monostore.add_argument("--counts", type=int, nargs="+", default=[20_000, 200_000])
+    monostore.add_argument("--classes", type=int, default=60, help="Drug classes sharing side-effect text")
+    monostore.set_defaults(func=bench_monostore)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
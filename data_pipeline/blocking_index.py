@@ -0,0 +1,179 @@
+"""
+Medicine Saver BD - Fuzzy Candidate Blocking
+
+Finds spelling variants of match keys across sources without comparing
+every pair. Keys ("brand_strength", see MedicineRecord.get_match_key) are
+blocked on their exact strength, and brands inside a block are indexed by
+character trigrams.
+
+A pair within k edits shares all but at most 3k trigrams (q-gram lemma),
+so a query only has to probe its 3k + 1 rarest trigrams (prefix filtering)
+to find every candidate. Candidates are then length- and count-filtered,
+and the survivors are scored with a bounded Levenshtein similarity.
+
+Usage:
+    index = NgramBlockingIndex(dgda_keys)
+    index.best_match("napaextra_500mg")   # -> (key, score) or None
+    match_keys(medex_keys, dgda_keys)      # one-to-one fuzzy pairing
+"""
+
+from collections import defaultdict
+
+# Edit similarity (1 - distance / longer length) required for a fuzzy match
+MATCH_THRESHOLD = 0.8
+NGRAM_SIZE = 3
+
+
+def split_match_key(key: str) -> tuple[str, str]:
+    """Split a match key into (brand, strength)."""
+    brand, _, strength = key.partition("_")
+    return brand, strength
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> frozenset[str]:
+    """Character n-grams of a padded string ("#napa#" -> #na, nap, apa, pa#)."""
+    padded = f"#{text}#"
+    if len(padded) <= n:
+        return frozenset((padded,))
+    return frozenset(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+def max_edits(length: int, threshold: float) -> int:
+    """Most edits a string of this length can absorb and still reach the threshold."""
+    # d <= (1 - t) * max(len_a, len_b) and len_b <= len_a + d
+    return int((1 - threshold) * length / threshold + 1e-9)
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 as soon as it must exceed limit."""
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Only cells within `limit` of the diagonal can stay under the limit
+    beyond = limit + 1
+    previous = [j if j <= limit else beyond for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        lo = max(1, i - limit)
+        hi = min(len(b), i + limit)
+        current = [beyond] * (len(b) + 1)
+        current[0] = i if i <= limit else beyond
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return beyond
+        previous = current
+    return min(previous[-1], beyond)
+
+
+def edit_similarity(a: str, b: str, threshold: float = 0.0) -> float:
+    """1 - distance / longer length (0.0 if below threshold)."""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    limit = int((1 - threshold) * longest + 1e-9)
+    distance = bounded_levenshtein(a, b, limit)
+    if distance > limit:
+        return 0.0
+    return 1 - distance / longest
+
+
+class NgramBlockingIndex:
+    """Trigram inverted index over match keys, blocked by strength."""
+
+    def __init__(self, keys, n: int = NGRAM_SIZE):
+        self.n = n
+        self.keys: list[str] = []
+        self._brands: list[str] = []
+        self._grams: list[frozenset[str]] = []
+        self._postings: dict[tuple[str, str], list[int]] = defaultdict(list)
+        self._frequency: dict[str, int] = defaultdict(int)
+
+        for key in keys:
+            brand, strength = split_match_key(key)
+            idx = len(self.keys)
+            self.keys.append(key)
+            grams = ngrams(brand, n)
+            self._brands.append(brand)
+            self._grams.append(grams)
+            for gram in grams:
+                self._postings[(strength, gram)].append(idx)
+                self._frequency[gram] += 1
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def candidates(self, key: str, threshold: float = MATCH_THRESHOLD) -> set[int]:
+        """Indices of keys in the query's block that may reach the threshold."""
+        brand, strength = split_match_key(key)
+        grams = ngrams(brand, self.n)
+        k = max_edits(len(brand), threshold)
+        # Any key within k edits shares all but n*k grams with the query, so
+        # it must appear in the postings of the n*k + 1 rarest ones.
+        probes = self.n * k + 1
+        if probes < len(grams):
+            grams = sorted(grams, key=lambda g: (self._frequency.get(g, 0), g))[:probes]
+
+        found = set()
+        for gram in grams:
+            found.update(self._postings.get((strength, gram), ()))
+        return found
+
+    def scored_candidates(
+        self, key: str, threshold: float = MATCH_THRESHOLD
+    ) -> list[tuple[str, float]]:
+        """Candidates scoring at or above the threshold, best first."""
+        brand = split_match_key(key)[0]
+        grams = ngrams(brand, self.n)
+        k = max_edits(len(brand), threshold)
+        min_shared = len(grams) - self.n * k
+        scored = []
+        for idx in self.candidates(key, threshold):
+            other = self._brands[idx]
+            if abs(len(other) - len(brand)) > k or len(grams & self._grams[idx]) < min_shared:
+                continue
+            score = edit_similarity(brand, other, threshold)
+            if score >= threshold:
+                scored.append((self.keys[idx], score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+    def best_match(self, key: str, threshold: float = MATCH_THRESHOLD) -> tuple[str, float] | None:
+        """Best scoring key at or above the threshold, or None."""
+        scored = self.scored_candidates(key, threshold)
+        return scored[0] if scored else None
+
+
+def match_keys(
+    left_keys,
+    right_keys,
+    threshold: float = MATCH_THRESHOLD,
+) -> dict[str, tuple[str, float]]:
+    """
+    Pair keys from two sources one-to-one by fuzzy similarity.
+    Higher scoring pairs are assigned first; each right key is used at most once.
+    Returns: {left_key: (right_key, score)}
+    """
+    index = NgramBlockingIndex(right_keys)
+    proposals = []
+    for left in left_keys:
+        for right, score in index.scored_candidates(left, threshold):
+            proposals.append((-score, left, right))
+    proposals.sort()
+
+    matches = {}
+    used = set()
+    for neg_score, left, right in proposals:
+        if left in matches or right in used:
+            continue
+        matches[left] = (right, -neg_score)
+        used.add(right)
+    return matches
@@ -8,15 +8,95 @@ medical information.
 Usage:
     python build_db.py                              # Use verified_medicines.csv
     python build_db.py --input validated_medicines.csv  # Use specific file
+    python build_db.py --no-price-reports           # Ignore crowdsourced reports
+    python build_db.py --build-on-disk              # Stage in a temp file, not in memory
+    python build_db.py --workers 4                  # Normalize in 4 worker processes
+    python build_db.py --incremental                # Update output/medicines.db in place of a rebuild
+    python build_db.py --incremental ../assets/db/medicines.db  # ... or a post-processed copy
+    python build_db.py --profile                    # Time each stage (output/medicines.profile.json)
+    python build_db.py --profile --cprofile         # ... with cProfile stats per stage
+
+Generics carry only their name; the long indication and side-effect
+text lives in generic_monographs (one row per generic that has any), so
+the search and alternatives queries, which join every brand to its
+generic, read narrow rows. The app fetches a monograph when a details
+screen opens. Monographs reference monograph_texts, where each distinct
+text is stored once, compressed with a dictionary trained on the corpus
+(monograph_store.py).
+
+Crowdsourced price reports aggregated by price_reports.py (if
+output/price_reports.db exists) adjust each brand's confidence and price.
+Manufacturer names are canonicalized through manufacturer_registry.py, and
+generic spellings are merged by GenericIndex (generic_index.py), which
+never merges two salt forms of a drug.
+
+The input is streamed in batches of BATCH_SIZE records and inserted with
+executemany in one transaction; generic and manufacturer IDs are resolved
+in memory, so each generic row is written once instead of being looked up
+and rewritten for every one of its brands.
+
+A fresh database is loaded under FAST_BUILD_PRAGMAS (no journal or fsync)
+with no indexes; indexes and the FTS index are built afterwards in one
+pass each, followed by ANALYZE, and safe settings are restored before the
+database is used. --incremental keeps SAFE_PRAGMAS throughout.
+
+Before indexing, brands are renumbered in (generic_id, price) order
+(cluster_brands()), so the rows of one generic, the app's alternatives
+list, sit next to each other on a few pages in the order the app shows
+them. The FTS index is merged into one segment ('optimize') and the
+sqlite_stat1 statistics from ANALYZE ship with the database (sqlite_stat4
+too, where the building SQLite is compiled with SQLITE_ENABLE_STAT4).
+
+The database is built in memory (or, with --build-on-disk, in a temporary
+file) and only then published to output/medicines.db, and with
+--copy-to-flutter to the Flutter assets, via db_publish.publish(): VACUUM
+INTO a temp file and an atomic rename. A failed or interrupted build
+leaves the previous database in place.
+
+Every brand's input record is hashed into brand_sources. --incremental
+updates an existing database instead of rebuilding it (IncrementalLoader):
+records with a known hash are skipped without being parsed, the others
+are matched to brands by natural key (name, manufacturer, strength, form,
+pack size) and inserted, updated or deleted, with brands_fts and the
+derived tables kept in sync. Brands whose record did not change keep
+their name_bn, fixed prices and other post-processing.
+
+With --workers N (at most MAX_WORKERS, SQLite's limit on attached
+databases), worker processes normalize batches of the input into their own
+staging shards (StagingLoader), which are then ATTACHed and merged with
+set-based INSERT ... SELECT (merge_shards()). IDs follow the input order,
+so the result is the same as a sequential build.
+
+--profile times every stage (CSV parsing, ID resolution, brand inserts,
+clustering, indexes, FTS, ANALYZE, metadata, publishing) with
+build_profile.py, writes the report next to the database and warns about
+stages that regressed since the previous report.
 """
 
 import argparse
 import csv
+import hashlib
+import json
+import os
 import re
-import shutil
 import sqlite3
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
+from typing import Iterable
+
+from add_bengali_names import BRAND_NAME_MAPPINGS, GENERIC_NAME_MAPPINGS, get_bengali_name
+from build_profile import StageProfiler
+from db_publish import open_copy, publish
+from generic_index import GenericCanonicalizer, GenericIndex
+from ingest_hash import FIELD_SEPARATOR
+from manufacturer_registry import load_registry
+from monograph_store import MonographStore
+from price_reports import PRICE_REPORTS_DB, fold_reports, load_aggregates, report_key
 
 # Paths
 OUTPUT_DIR = Path("output")
@@ -24,25 +104,147 @@ DEFAULT_INPUT = OUTPUT_DIR / "verified_medicines.csv"
 FALLBACK_INPUT = OUTPUT_DIR / "validated_medicines.csv"
 OUTPUT_DB = OUTPUT_DIR / "medicines.db"
 FLUTTER_ASSETS_DB = Path("../assets/db/medicines.db")
+# Staging file for --build-on-disk
+BUILD_DB = OUTPUT_DIR / ".medicines.db.build"
+
+# PRAGMAs while loading a fresh database: no rollback journal or fsync
+# (the staging database is discarded if the build fails), a 64 MiB page cache, and 4 KiB pages,
+# which built fastest here
+FAST_BUILD_PRAGMAS = {
+    "page_size": 4096,
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "cache_size": -65536,
+    "temp_store": "MEMORY",
+}
+# Restored once the build is finished
+SAFE_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+}
+
+# Records per executemany batch of brand inserts
+BATCH_SIZE = 50_000
+
+# Parallel builds: records per task sent to a staging worker, and the most
+# workers (each shard is ATTACHed, and SQLite allows 10 attached databases)
+STAGE_BATCH_SIZE = 10_000
+MAX_WORKERS = 10
+
+INSERT_BRAND = """
+    INSERT INTO brands (
+        id, name, generic_id, manufacturer_id, strength, dosage_form,
+        price, unit_price, pack_size, confidence, verified, last_updated
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_BRAND = """
+    UPDATE brands SET
+        name = ?, generic_id = ?, manufacturer_id = ?, strength = ?, dosage_form = ?,
+        price = ?, unit_price = ?, pack_size = ?, confidence = ?, verified = ?, last_updated = ?
+    WHERE id = ?
+"""
+
+# Staging shard of a parallel build: brands reference their generic spelling
+# and canonical manufacturer name instead of IDs; "first" is the position of
+# the first record a spelling or manufacturer was seen in
+STAGING_SCHEMA = """
+    CREATE TABLE staged_brands (
+        batch INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        name TEXT,
+        generic_spelling TEXT,
+        manufacturer_name TEXT,
+        strength TEXT,
+        dosage_form TEXT,
+        price REAL,
+        unit_price REAL,
+        pack_size TEXT,
+        confidence TEXT,
+        verified BOOLEAN,
+        last_updated TEXT,
+        source_hash BLOB
+    );
+    CREATE TABLE staged_spellings (
+        spelling TEXT PRIMARY KEY,
+        generic_key TEXT NOT NULL,
+        first INTEGER NOT NULL
+    );
+    CREATE TABLE staged_manufacturers (
+        name TEXT PRIMARY KEY,
+        first INTEGER NOT NULL
+    );
+    CREATE TABLE staged_generic_info (
+        generic_key TEXT PRIMARY KEY,
+        position INTEGER NOT NULL,
+        indication TEXT,
+        side_effects TEXT
+    );
+"""
+
+# Source of each column brands_fts may have (add_bengali_names.py adds the _bn ones)
+FTS_SOURCES = {
+    "name": "b.name",
+    "name_bn": "b.name_bn",
+    "generic_name": "g.name",
+    "generic_name_bn": "g.name_bn",
+    "manufacturer_name": "m.name",
+}
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: dict) -> None:
+    """Set connection/database PRAGMAs."""
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
 
 
 def create_schema(conn: sqlite3.Connection) -> None:
-    """Create database schema with enhanced fields."""
+    """Create tables, indexes and the FTS table (indexes maintained on every insert)."""
+    create_tables(conn)
+    create_indexes(conn)
+
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    """Create the base tables with enhanced fields."""
     cursor = conn.cursor()
 
-    # Generics table with medical information
+    # Generics table, kept narrow: search and alternatives join through it
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS generics (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL UNIQUE,
-            indication TEXT,
-            dosage_info TEXT,
-            side_effects TEXT,
-            contraindication TEXT,
             drug_class TEXT
         )
     """)
 
+    # Long-form medical text of the generics that have any, read only by
+    # the details screen: references into monograph_texts, where each
+    # distinct text is stored once, compressed (monograph_store.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS generic_monographs (
+            generic_id INTEGER PRIMARY KEY,
+            indication_id INTEGER,
+            dosage_info_id INTEGER,
+            side_effects_id INTEGER,
+            contraindication_id INTEGER,
+            FOREIGN KEY (generic_id) REFERENCES generics (id)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS monograph_texts (
+            id INTEGER PRIMARY KEY,
+            hash BLOB NOT NULL UNIQUE,
+            body BLOB NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS monograph_dictionary (
+            id INTEGER PRIMARY KEY,
+            data BLOB NOT NULL
+        )
+    """)
+
     # Manufacturers table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS manufacturers (
@@ -72,6 +274,23 @@ def create_schema(conn: sqlite3.Connection) -> None:
         )
     """)
 
+    # Every generic spelling seen in the input, mapped to its canonical generic
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS generic_aliases (
+            alias TEXT PRIMARY KEY,
+            generic_id INTEGER NOT NULL,
+            FOREIGN KEY (generic_id) REFERENCES generics (id)
+        )
+    """)
+
+    # Hash of the input record of every brand, for incremental builds
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS brand_sources (
+            brand_id INTEGER PRIMARY KEY,
+            source_hash BLOB NOT NULL
+        )
+    """)
+
     # Database metadata table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS metadata (
@@ -80,12 +299,19 @@ def create_schema(conn: sqlite3.Connection) -> None:
         )
     """)
 
+    conn.commit()
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """Create search indexes and the FTS table (cheapest once the tables are loaded)."""
+    cursor = conn.cursor()
+
     # Create indices for fast searching
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_brands_name ON brands(name)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_brands_name_lower ON brands(lower(name))")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_brands_generic ON brands(generic_id)")
+    # Alternatives: WHERE generic_id = ? ORDER BY price, without a sort
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_brands_generic_price ON brands(generic_id, price)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_brands_price ON brands(price)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_generics_name ON generics(name)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_generics_name_lower ON generics(lower(name))")
 
     # Full-text search virtual table
@@ -102,40 +328,677 @@ def create_schema(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
-def get_or_create_generic(
-    cursor: sqlite3.Cursor, 
-    name: str, 
-    indication: str = "",
-    side_effects: str = ""
-) -> int:
-    """Get generic ID, creating if it doesn't exist."""
-    cursor.execute("SELECT id FROM generics WHERE name = ?", (name,))
-    result = cursor.fetchone()
-    if result:
-        # Update medical info if provided
+class BulkLoader:
+    """
+    Streams records into brands with executemany, BATCH_SIZE rows at a time.
+    Generic and manufacturer IDs are resolved through in-process dicts
+    (assigned in first-seen order, as AUTOINCREMENT would), and their rows
+    are written once by finish(), each generic with the medical info of the
+    last record that had any.
+    """
+
+    def __init__(
+        self,
+        cursor: sqlite3.Cursor,
+        report_aggregates: dict | None = None,
+        now: float | None = None,
+        profiler: StageProfiler | None = None,
+    ):
+        self.cursor = cursor
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.registry = load_registry()
+        self.canonicalizer = GenericCanonicalizer()
+        self.generic_index = GenericIndex(self.canonicalizer)
+        self.report_aggregates = report_aggregates or {}
+        self.now = now or time.time()
+        self.last_updated = datetime.fromtimestamp(self.now).strftime("%Y-%m-%d")
+
+        self.generic_ids: dict[str, int] = {}             # generic key (GenericIndex) -> id
+        self.generics: list[list[str]] = []               # [name, indication, side_effects] of id - 1
+        self.generic_aliases: dict[str, int] = {}         # spelling -> id
+        self.manufacturer_ids: dict[str, int] = {}        # canonical name -> id
+        self.company_ids: dict[str, int | None] = {}      # raw company string -> id
+        self.next_manufacturer_id = 1
+        self.next_brand_id = 1
+
+        self.read = 0
+        self.inserted = 0
+        self.report_adjusted = 0
+
+    def generic_id(self, name: str, indication: str, side_effects: str) -> int:
+        """ID of the canonical generic of a spelling, recording its medical info."""
+        generic_id = self.generic_aliases.get(name)
+        if generic_id is None:
+            key = self.generic_index.resolve(name)
+            generic_id = self.generic_ids.get(key)
+            if generic_id is None:
+                self.generics.append([name, "", ""])
+                generic_id = self.generic_ids[key] = len(self.generics)
+            self.generic_aliases[name] = generic_id
         if indication or side_effects:
-            cursor.execute(
-                "UPDATE generics SET indication = ?, side_effects = ? WHERE id = ?",
-                (indication, side_effects, result[0])
+            self.generics[generic_id - 1][1:] = [indication, side_effects]
+        return generic_id
+
+    def manufacturer_id(self, company: str) -> int | None:
+        """ID of the canonical manufacturer of a company string (None if blank)."""
+        if company in self.company_ids:
+            return self.company_ids[company]
+        name = self.registry.canonical_name(company.strip())
+        manufacturer_id = self.manufacturer_ids.get(name) if name else None
+        if name and manufacturer_id is None:
+            manufacturer_id = self.manufacturer_ids[name] = self.next_manufacturer_id
+            self.next_manufacturer_id += 1
+        self.company_ids[company] = manufacturer_id
+        return manufacturer_id
+
+    def source_hash(self, record: dict) -> bytes:
+        """64-bit hash of a record's fields and of the price reports folded into it."""
+        try:
+            source = FIELD_SEPARATOR.join(record.values())
+        except TypeError:
+            source = FIELD_SEPARATOR.join(map(str, record.values()))
+        if self.report_aggregates:
+            price = parse_price(record.get("verified_price")) or parse_price(record.get("price"))
+            aggregate = self.report_aggregates.get(report_key((record.get("brand_name", "") or "").strip(), price))
+            if aggregate is not None:
+                source += repr(aggregate.to_row())
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=8).digest()
+
+    def brand_row(self, record: dict) -> tuple | None:
+        """brands row for a record (None if it has no generic or brand name)."""
+        # Handle both "generic_name" and "generic" column names
+        generic_name = (record.get("generic_name", "") or record.get("generic", "")).strip()
+        brand_name = (record.get("brand_name", "") or "").strip()
+        if not generic_name or not brand_name:
+            return None
+
+        generic_id = self.generic_id(
+            generic_name, record.get("indication", ""), record.get("side_effects", ""),
+        )
+        manufacturer_id = self.manufacturer_id(
+            record.get("manufacturer", "") or record.get("company", "") or ""
+        )
+
+        # Determine confidence level
+        confidence = record.get("confidence", "LOW")
+
+        # Parse prices
+        price = parse_price(record.get("verified_price")) or parse_price(record.get("price"))
+        unit_price = parse_price(record.get("unit_price")) or price
+
+        # Fold in crowdsourced reports (keyed by the price the app showed)
+        aggregate = self.report_aggregates.get(report_key(brand_name, price)) if self.report_aggregates else None
+        if aggregate is not None:
+            folded_price, folded_confidence = fold_reports(price, confidence, aggregate, self.now)
+            if (folded_price, folded_confidence) != (price, confidence):
+                self.report_adjusted += 1
+            if folded_price != price:
+                unit_price = folded_price if unit_price == price else unit_price
+                price = folded_price
+            confidence = folded_confidence
+        verified = confidence in ("HIGH", "MEDIUM")
+
+        return (
+            brand_name,
+            generic_id,
+            manufacturer_id,
+            record.get("strength", ""),
+            record.get("dosage_form", ""),
+            price,
+            unit_price,
+            record.get("pack_size", ""),
+            confidence,
+            verified,
+            self.last_updated,
+        )
+
+    def load(self, records: Iterable[dict]) -> None:
+        """Insert the brands (and their source hashes) of a stream of records, BATCH_SIZE per executemany."""
+        records = iter(records)
+        while True:
+            with self.profiler.stage("csv_parse") as stage:
+                batch = list(islice(records, BATCH_SIZE))
+                stage.rows += len(batch)
+            if not batch:
+                break
+            self.read += len(batch)
+            rows, sources = [], []
+            with self.profiler.stage("resolve_ids") as stage:
+                for record in batch:
+                    row = self.brand_row(record)
+                    if row is not None:
+                        rows.append((self.next_brand_id, *row))
+                        sources.append((self.next_brand_id, self.source_hash(record)))
+                        self.next_brand_id += 1
+                stage.rows += len(batch)
+            with self.profiler.stage("insert_brands") as stage:
+                self.cursor.executemany(INSERT_BRAND, rows)
+                self.cursor.executemany("INSERT INTO brand_sources VALUES (?, ?)", sources)
+                stage.rows += len(rows)
+            self.inserted += len(rows)
+
+    def load_csv(self, path: Path) -> None:
+        """load() the records of a CSV file."""
+        with open(path, "r", encoding="utf-8") as f:
+            self.load(csv.DictReader(f))
+
+    def finish(self) -> None:
+        """Write the generics, manufacturers and generic aliases collected so far."""
+        with self.profiler.stage("write_generics") as stage:
+            self.cursor.executemany(
+                "INSERT INTO generics (id, name) VALUES (?, ?)",
+                ((generic_id, info[0]) for generic_id, info in enumerate(self.generics, start=1)),
+            )
+            MonographStore(self.cursor).write(
+                (generic_id, monograph(*info[1:])) for generic_id, info in enumerate(self.generics, start=1)
+                if any(info[1:])
+            )
+            self.cursor.executemany(
+                "INSERT INTO manufacturers (id, name) VALUES (?, ?)",
+                ((manufacturer_id, name) for name, manufacturer_id in self.manufacturer_ids.items()),
             )
-        return result[0]
+            self.cursor.executemany("INSERT INTO generic_aliases VALUES (?, ?)", self.generic_aliases.items())
+            stage.rows += len(self.generics)
+
+
+class IncrementalLoader(BulkLoader):
+    """
+    Applies an input to an existing database built by BulkLoader.
+
+    Records whose source hash (brand_sources) is unchanged are matched to
+    their brand without being parsed, and the brand is not touched, so
+    name_bn, price fixes and other post-processing survive; a brand deleted
+    since (remove_duplicates.py) stays deleted. The remaining
+    records are converted to rows and matched by natural_key() to the
+    brands left over: a match is updated, a record without one is
+    inserted, and brands matched by no record are deleted. IDs continue
+    from the existing generics, manufacturers and brands; brands_fts,
+    price_flags and the Bengali names are kept in sync for the brands that
+    changed. Generic medical info is taken from the changed records only.
+    """
+
+    def __init__(
+        self,
+        cursor: sqlite3.Cursor,
+        report_aggregates: dict | None = None,
+        now: float | None = None,
+        profiler: StageProfiler | None = None,
+    ):
+        super().__init__(cursor, report_aggregates, now, profiler)
+
+        # Existing generics; generics[id - 1] is None for ids no longer in use
+        self.monographs = MonographStore(cursor)
+        texts = self.monographs.read()
+        cursor.execute("SELECT id, name FROM generics")
+        stored = {
+            generic_id: [name, *(texts.get(generic_id, {}).get(field, "") for field in ("indication", "side_effects"))]
+            for generic_id, name in cursor.fetchall()
+        }
+        self.generics = [stored.get(generic_id) for generic_id in range(1, max(stored, default=0) + 1)]
+        self.stored_generics = [info and list(info) for info in self.generics]
+        group_keys = {}
+        for generic_id, (name, _, _) in stored.items():
+            group_keys[generic_id] = self.generic_index.keys(name)[0]
+            self.generic_ids.setdefault(group_keys[generic_id], generic_id)
+        cursor.execute("SELECT alias, generic_id FROM generic_aliases")
+        self.generic_aliases.update(cursor.fetchall())
+        for alias, generic_id in self.generic_aliases.items():
+            if generic_id in group_keys:
+                self.generic_index.add(alias, group_keys[generic_id])
+        self.stored_aliases = set(self.generic_aliases)
+
+        cursor.execute("SELECT name, id FROM manufacturers")
+        self.manufacturer_ids.update(cursor.fetchall())
+        self.stored_manufacturers = max(self.manufacturer_ids.values(), default=0)
+        self.next_manufacturer_id = self.stored_manufacturers + 1
+
+        # source hash -> lowest brand id (higher ids of identical records in repeated_hashes).
+        # Hashes of brands deleted after the build (remove_duplicates.py) are kept as
+        # tombstones, so their records stay deleted instead of being inserted again.
+        self.repeated_hashes: dict[bytes, list[int]] = {}
+        cursor.execute("SELECT brand_id FROM brand_sources WHERE brand_id NOT IN (SELECT id FROM brands)")
+        self.tombstones = {brand_id for brand_id, in cursor.fetchall()}
+        cursor.execute("SELECT source_hash, brand_id FROM brand_sources")
+        sources = cursor.fetchall()[::-1]
+        self.brand_hashes: dict[bytes, int] = dict(sources)
+        if len(self.brand_hashes) < len(sources):
+            for source_hash, brand_id in sources:
+                if self.brand_hashes[source_hash] != brand_id:
+                    self.repeated_hashes.setdefault(source_hash, []).append(brand_id)
+        cursor.execute("SELECT max(id) FROM brands")
+        self.next_brand_id = max((cursor.fetchone()[0] or 0), *self.tombstones, 0) + 1
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'brands'")
+        sequence = cursor.fetchone()
+        self.next_brand_id = max(self.next_brand_id, (sequence[0] if sequence else 0) + 1)
+
+        self.fts_columns = fts_columns(cursor)
+        self.has_bengali = "name_bn" in table_columns(cursor, "brands")
+        self.pending: list[tuple[dict, bytes]] = []       # records whose hash matched no brand
+        self.inserted_ids: list[int] = []
+        self.updated_ids: list[int] = []
+        self.deleted_ids: list[int] = []
+        self.unchanged = 0
+        self.kept_deleted = 0  # Records of tombstoned brands
+
+    def load(self, records: Iterable[dict]) -> None:
+        """Match a stream of records to the brands by source hash; keep the rest for finish()."""
+        brand_hashes, repeated_hashes = self.brand_hashes, self.repeated_hashes
+        records = iter(records)
+        while True:
+            with self.profiler.stage("csv_parse") as stage:
+                batch = list(islice(records, BATCH_SIZE))
+                stage.rows += len(batch)
+            if not batch:
+                break
+            self.read += len(batch)
+            with self.profiler.stage("match_sources") as stage:
+                for record in batch:
+                    source_hash = self.source_hash(record)
+                    brand_id = brand_hashes.pop(source_hash, None)
+                    if brand_id is None:
+                        self.pending.append((record, source_hash))
+                        continue
+                    if brand_id in self.tombstones:
+                        self.kept_deleted += 1
+                    else:
+                        self.unchanged += 1
+                    repeats = repeated_hashes.get(source_hash)
+                    if repeats:
+                        brand_hashes[source_hash] = repeats.pop()
+                stage.rows += len(batch)
+
+    def finish(self) -> None:
+        """
+        Update, insert and delete brands by natural key, write new and
+        changed generics, new manufacturers and aliases, and bring
+        brands_fts, price_flags and the Bengali names up to date.
+        """
+        profiler = self.profiler
+        with profiler.stage("resolve_ids") as stage:
+            # Brands no record matched by hash, by natural key (lowest id first)
+            leftover = list(self.brand_hashes.values())
+            for repeats in self.repeated_hashes.values():
+                leftover += repeats
+            self.cursor.execute(
+                """
+                SELECT id, name, manufacturer_id, strength, dosage_form, pack_size FROM brands
+                WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id DESC
+                """,
+                (json.dumps(leftover),),
+            )
+            by_key: dict[tuple, list[int]] = {}
+            for brand_id, *fields in self.cursor.fetchall():
+                by_key.setdefault(natural_key(*fields), []).append(brand_id)
+
+            inserts, updates, sources = [], [], []
+            for record, source_hash in self.pending:
+                row = self.brand_row(record)
+                if row is None:
+                    continue
+                matches = by_key.get(natural_key(row[0], row[2], row[3], row[4], row[7]))
+                if matches:
+                    brand_id = matches.pop()
+                    updates.append((*row, brand_id))
+                    self.updated_ids.append(brand_id)
+                else:
+                    brand_id = self.next_brand_id
+                    self.next_brand_id += 1
+                    inserts.append((brand_id, *row))
+                    self.inserted_ids.append(brand_id)
+                sources.append((brand_id, source_hash))
+            self.deleted_ids = [brand_id for matches in by_key.values() for brand_id in matches]
+            self.inserted = len(inserts)
+            stage.rows += len(self.pending)
+
+        # Unindex the old values before they change
+        with profiler.stage("fts") as stage:
+            delete_fts(self.cursor, self.fts_columns, self.updated_ids + self.deleted_ids)
+            stage.rows += len(self.updated_ids) + len(self.deleted_ids)
+        with profiler.stage("insert_brands") as stage:
+            self.cursor.executemany(UPDATE_BRAND, updates)
+            self.cursor.executemany(INSERT_BRAND, inserts)
+            self.cursor.executemany("DELETE FROM brands WHERE id = ?", ((i,) for i in self.deleted_ids))
+            self.cursor.executemany("INSERT OR REPLACE INTO brand_sources VALUES (?, ?)", sources)
+            self.cursor.executemany("DELETE FROM brand_sources WHERE brand_id = ?", ((i,) for i in self.deleted_ids))
+            if "price_flags" in table_names(self.cursor):
+                self.cursor.executemany(
+                    "DELETE FROM price_flags WHERE brand_id = ?",
+                    ((i,) for i in self.deleted_ids + self.updated_ids),
+                )
+            stage.rows += len(updates) + len(inserts) + len(self.deleted_ids)
+
+        with profiler.stage("write_generics") as stage:
+            stored_count = len(self.stored_generics)
+            new_generics = [
+                (generic_id, info[0])
+                for generic_id, info in enumerate(self.generics[stored_count:], start=stored_count + 1)
+            ]
+            self.cursor.executemany("INSERT INTO generics (id, name) VALUES (?, ?)", new_generics)
+            self.monographs.write(
+                (generic_id, monograph(*info[1:]))
+                for generic_id, (info, stored) in enumerate(
+                    zip(self.generics, self.stored_generics + [None] * len(new_generics)), start=1,
+                )
+                if info is not None and info != stored and any(info[1:])
+            )
+            self.cursor.executemany(
+                "INSERT INTO manufacturers (id, name) VALUES (?, ?)",
+                ((manufacturer_id, name) for name, manufacturer_id in self.manufacturer_ids.items()
+                 if manufacturer_id > self.stored_manufacturers),
+            )
+            self.cursor.executemany(
+                "INSERT INTO generic_aliases VALUES (?, ?)",
+                ((alias, generic_id) for alias, generic_id in self.generic_aliases.items()
+                 if alias not in self.stored_aliases),
+            )
+
+            # Generics and manufacturers left without brands, as a full build would not have them
+            if self.deleted_ids or self.updated_ids:
+                self.cursor.execute("DELETE FROM generics WHERE id NOT IN (SELECT generic_id FROM brands)")
+                self.cursor.execute("DELETE FROM generic_aliases WHERE generic_id NOT IN (SELECT id FROM generics)")
+                self.cursor.execute("""
+                    DELETE FROM manufacturers
+                    WHERE id NOT IN (SELECT manufacturer_id FROM brands WHERE manufacturer_id IS NOT NULL)
+                """)
+            # Texts replaced by changed monographs, or of the generics deleted
+            self.monographs.prune()
+            stage.rows += len(new_generics)
+
+        changed_ids = self.inserted_ids + self.updated_ids
+        if self.has_bengali:
+            with profiler.stage("bengali_names") as stage:
+                self.cursor.executemany(
+                    "UPDATE generics SET name_bn = ? WHERE id = ?",
+                    ((get_bengali_name(name, GENERIC_NAME_MAPPINGS), generic_id) for generic_id, name in new_generics),
+                )
+                self.cursor.execute(
+                    "SELECT id, name FROM brands WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(changed_ids),),
+                )
+                self.cursor.executemany(
+                    "UPDATE brands SET name_bn = ? WHERE id = ?",
+                    [(get_bengali_name(name, BRAND_NAME_MAPPINGS), brand_id)
+                     for brand_id, name in self.cursor.fetchall()],
+                )
+                stage.rows += len(changed_ids)
+
+        with profiler.stage("fts") as stage:
+            insert_fts(self.cursor, self.fts_columns, changed_ids)
+            stage.rows += len(changed_ids)
+
+
+class StagingLoader(BulkLoader):
+    """
+    Normalizes batches of records into a staging shard for a parallel
+    build (one per worker process). Everything but the global IDs is done
+    here: generic keys, canonical manufacturers, prices, report folding
+    and source hashes. merge_shards() then assigns the IDs.
+    """
+
+    def __init__(self, path: Path, report_aggregates: dict | None = None, now: float | None = None):
+        self.conn = sqlite3.connect(path)
+        apply_pragmas(self.conn, FAST_BUILD_PRAGMAS)
+        self.conn.executescript(STAGING_SCHEMA)
+        super().__init__(self.conn.cursor(), report_aggregates, now)
+        self.position = 0
+        self.spelling_keys: dict[str, str] = {}           # spelling -> generic key
+        self.new_spellings: list[tuple] = []              # (spelling, key, first) to write
+        self.new_manufacturers: list[tuple] = []          # (name, first) to write
+        self.generic_info: dict[str, tuple] = {}          # key -> (position, indication, side_effects) to write
+
+    def generic_id(self, name: str, indication: str, side_effects: str) -> str:
+        """Stands in for the ID: the spelling, with its key and medical info staged."""
+        key = self.spelling_keys.get(name)
+        if key is None:
+            key = self.spelling_keys[name] = self.generic_index.keys(name)[0]
+            self.new_spellings.append((name, key, self.position))
+        if indication or side_effects:
+            self.generic_info[key] = (self.position, indication, side_effects)
+        return name
+
+    def manufacturer_id(self, company: str) -> str | None:
+        """Stands in for the ID: the canonical manufacturer name (None if blank)."""
+        if company in self.company_ids:
+            return self.company_ids[company]
+        name = self.registry.canonical_name(company.strip()) or None
+        if name and name not in self.manufacturer_ids:
+            self.manufacturer_ids[name] = self.position
+            self.new_manufacturers.append((name, self.position))
+        self.company_ids[company] = name
+        return name
+
+    def stage(self, fieldnames: list[str], batch: int, position: int, rows: list[list[str]]) -> int:
+        """Stage the records of csv rows starting at a position; returns the brands staged."""
+        staged = []
+        for offset, row in enumerate(rows):
+            self.position = position + offset
+            record = record_of(fieldnames, row)
+            brand = self.brand_row(record)
+            if brand is not None:
+                staged.append((batch, len(staged), *brand, self.source_hash(record)))
+        self.cursor.executemany(f"INSERT INTO staged_brands VALUES ({', '.join('?' * 14)})", staged)
+        self.cursor.executemany("INSERT INTO staged_spellings VALUES (?, ?, ?)", self.new_spellings)
+        self.cursor.executemany("INSERT INTO staged_manufacturers VALUES (?, ?)", self.new_manufacturers)
+        self.cursor.executemany(
+            "INSERT OR REPLACE INTO staged_generic_info VALUES (?, ?, ?, ?)",
+            ((key, *info) for key, info in self.generic_info.items()),
+        )
+        self.conn.commit()
+        self.new_spellings, self.new_manufacturers, self.generic_info = [], [], {}
+        return len(staged)
+
+
+# The staging loader of a worker process
+_STAGING_LOADER: StagingLoader | None = None
+
+
+def _start_staging(directory: str, use_reports: bool, now: float) -> None:
+    global _STAGING_LOADER
+    report_aggregates = load_aggregates(PRICE_REPORTS_DB) if use_reports else {}
+    path = Path(directory) / f"shard_{os.getpid()}.db"
+    _STAGING_LOADER = StagingLoader(path, report_aggregates, now)
+
+
+def _stage_batch(fieldnames: list[str], batch: int, position: int, rows: list[list[str]]) -> tuple[int, int]:
+    """(brands staged, report-adjusted brands) of one batch, in this worker's shard."""
+    adjusted = _STAGING_LOADER.report_adjusted
+    staged = _STAGING_LOADER.stage(fieldnames, batch, position, rows)
+    return staged, _STAGING_LOADER.report_adjusted - adjusted
 
-    cursor.execute(
-        "INSERT INTO generics (name, indication, side_effects) VALUES (?, ?, ?)", 
-        (name, indication, side_effects)
+
+def record_of(fieldnames: list[str], row: list[str]) -> dict:
+    """A csv row as csv.DictReader would give it (missing fields None, extras under None)."""
+    record = dict(zip(fieldnames, row))
+    if len(row) > len(fieldnames):
+        record[None] = row[len(fieldnames):]
+    elif len(row) < len(fieldnames):
+        record.update(dict.fromkeys(fieldnames[len(row):]))
+    return record
+
+
+class ParallelLoader:
+    """
+    Builds the tables with worker processes: the input is read with
+    csv.reader and sent to a process pool in batches of STAGE_BATCH_SIZE
+    rows; each worker normalizes its batches into its own staging shard
+    (StagingLoader), and merge_shards() combines the shards with set-based
+    INSERT ... SELECT statements. IDs are assigned as the sequential
+    BulkLoader assigns them, so the database is the same.
+    """
+
+    def __init__(
+        self,
+        cursor: sqlite3.Cursor,
+        workers: int,
+        use_reports: bool = True,
+        now: float | None = None,
+        profiler: StageProfiler | None = None,
+    ):
+        self.cursor = cursor
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.workers = min(workers, MAX_WORKERS)
+        self.use_reports = use_reports
+        self.now = now or time.time()
+        self.batch_counts: list[int] = []
+        self.read = 0
+        self.inserted = 0
+        self.report_adjusted = 0
+
+    def load_csv(self, path: Path) -> None:
+        """Stage the records of a CSV file in the workers, then merge the shards."""
+        with tempfile.TemporaryDirectory(prefix="medicines-shards-") as directory:
+            # Parsing, ID resolution and staging, in the workers (CPU time includes theirs)
+            with (
+                self.profiler.stage("stage_shards") as stage,
+                open(path, "r", encoding="utf-8", newline="") as f,
+                ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_start_staging,
+                    initargs=(directory, self.use_reports, self.now),
+                ) as pool,
+            ):
+                reader = csv.reader(f)
+                fieldnames = next(reader, [])
+                rows = (row for row in reader if row)  # csv.DictReader skips blank lines
+                in_flight = deque()
+                while batch := list(islice(rows, STAGE_BATCH_SIZE)):
+                    in_flight.append(pool.submit(_stage_batch, fieldnames, len(self.batch_counts) + len(in_flight),
+                                                 self.read, batch))
+                    self.read += len(batch)
+                    # Bound the rows held in memory
+                    if len(in_flight) >= 2 * self.workers:
+                        self._collect(in_flight.popleft())
+                while in_flight:
+                    self._collect(in_flight.popleft())
+                stage.rows += self.read
+            self.inserted = sum(self.batch_counts)
+            with self.profiler.stage("merge_shards") as stage:
+                merge_shards(self.cursor, sorted(Path(directory).glob("shard_*.db")), self.batch_counts)
+                stage.rows += self.inserted
+
+    def _collect(self, future) -> None:
+        staged, adjusted = future.result()
+        self.batch_counts.append(staged)
+        self.report_adjusted += adjusted
+
+    def finish(self) -> None:
+        """Nothing left to write (merge_shards() wrote every table)."""
+
+
+def merge_shards(cursor: sqlite3.Cursor, shards: list[Path], batch_counts: list[int]) -> None:
+    """
+    Fill generics, generic_monographs, manufacturers, generic_aliases,
+    brands and brand_sources from staging shards. Generics and
+    manufacturers are numbered by the position of the first record they
+    appear in, each generic named after that record's spelling and given
+    the medical info of the last record that has any; brand IDs follow record order (batch offset + sequence).
+    Spellings are resolved to generics here, in first-seen order, since
+    whether a salt form joins its bare name depends on what came before.
+    """
+    for i, shard in enumerate(shards):
+        cursor.execute(f"ATTACH DATABASE ? AS shard{i}", (str(shard),))
+
+    def union(table: str) -> str:
+        return " UNION ALL ".join(f"SELECT * FROM shard{i}.{table}" for i in range(len(shards)))
+
+    cursor.executescript(f"""
+        CREATE TEMP TABLE spellings AS
+            SELECT spelling, generic_key, min(first) AS first, NULL AS group_key FROM ({union("staged_spellings")})
+            GROUP BY spelling;
+    """)
+    cursor.execute("SELECT rowid, spelling FROM temp.spellings ORDER BY first")
+    index = GenericIndex()
+    cursor.executemany(
+        "UPDATE temp.spellings SET group_key = ? WHERE rowid = ?",
+        [(index.resolve(spelling), rowid) for rowid, spelling in cursor.fetchall()],
     )
-    return cursor.lastrowid
 
+    cursor.executescript(f"""
+        CREATE TEMP TABLE generic_ids (group_key TEXT PRIMARY KEY, id INTEGER NOT NULL, name TEXT NOT NULL);
+        INSERT INTO generic_ids
+            SELECT group_key, row_number() OVER (ORDER BY first), spelling
+            FROM (SELECT group_key, spelling, min(first) AS first FROM spellings GROUP BY group_key);
+
+        INSERT INTO generics (id, name) SELECT id, name FROM generic_ids ORDER BY id;
+
+        CREATE TEMP TABLE generic_info AS
+            SELECT g.id, i.indication, i.side_effects
+            FROM generic_ids g
+            JOIN (
+                SELECT k.group_key, i.indication, i.side_effects, max(i.position)
+                FROM ({union("staged_generic_info")}) i
+                JOIN (SELECT DISTINCT generic_key, group_key FROM spellings) k ON k.generic_key = i.generic_key
+                GROUP BY k.group_key
+            ) i ON i.group_key = g.group_key
+            ORDER BY g.id;
 
-def get_or_create_manufacturer(cursor: sqlite3.Cursor, name: str) -> int:
-    """Get manufacturer ID, creating if it doesn't exist."""
-    cursor.execute("SELECT id FROM manufacturers WHERE name = ?", (name,))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
+        INSERT INTO generic_aliases
+            SELECT s.spelling, g.id FROM spellings s JOIN generic_ids g ON g.group_key = s.group_key
+            ORDER BY s.first;
 
-    cursor.execute("INSERT INTO manufacturers (name) VALUES (?)", (name,))
-    return cursor.lastrowid
+        CREATE TEMP TABLE manufacturer_ids (name TEXT PRIMARY KEY, id INTEGER NOT NULL);
+        INSERT INTO manufacturer_ids
+            SELECT name, row_number() OVER (ORDER BY first)
+            FROM (SELECT name, min(first) AS first FROM ({union("staged_manufacturers")}) GROUP BY name);
+        INSERT INTO manufacturers (id, name) SELECT id, name FROM manufacturer_ids ORDER BY id;
+
+        CREATE TEMP TABLE batch_offsets (batch INTEGER PRIMARY KEY, offset INTEGER NOT NULL);
+    """)
+    offsets, offset = [], 0
+    for batch, count in enumerate(batch_counts):
+        offsets.append((batch, offset))
+        offset += count
+    cursor.executemany("INSERT INTO batch_offsets VALUES (?, ?)", offsets)
+
+    cursor.execute("SELECT id, indication, side_effects FROM temp.generic_info ORDER BY id")
+    generic_info = cursor.fetchall()
+    MonographStore(cursor).write((generic_id, monograph(*texts)) for generic_id, *texts in generic_info)
+
+    for i in range(len(shards)):
+        cursor.execute(f"""
+            INSERT INTO brands (
+                id, name, generic_id, manufacturer_id, strength, dosage_form,
+                price, unit_price, pack_size, confidence, verified, last_updated
+            )
+            SELECT o.offset + b.seq + 1, b.name, a.generic_id, m.id, b.strength, b.dosage_form,
+                   b.price, b.unit_price, b.pack_size, b.confidence, b.verified, b.last_updated
+            FROM shard{i}.staged_brands b
+            JOIN batch_offsets o ON o.batch = b.batch
+            JOIN generic_aliases a ON a.alias = b.generic_spelling
+            LEFT JOIN manufacturer_ids m ON m.name = b.manufacturer_name
+        """)
+        cursor.execute(f"""
+            INSERT INTO brand_sources
+            SELECT o.offset + b.seq + 1, b.source_hash
+            FROM shard{i}.staged_brands b JOIN batch_offsets o ON o.batch = b.batch
+        """)
+
+    cursor.connection.commit()
+    cursor.executescript("""
+        DROP TABLE temp.spellings;
+        DROP TABLE temp.generic_ids;
+        DROP TABLE temp.generic_info;
+        DROP TABLE temp.manufacturer_ids;
+        DROP TABLE temp.batch_offsets;
+    """)
+    for i in range(len(shards)):
+        cursor.execute(f"DETACH DATABASE shard{i}")
+
+
+def monograph(indication: str, side_effects: str) -> dict[str, str]:
+    """MonographStore fields of a generic's medical info."""
+    return {"indication": indication, "side_effects": side_effects}
+
+
+def natural_key(name: str, manufacturer_id: int | None, strength: str, dosage_form: str, pack_size: str) -> tuple:
+    """Identity of a brand across builds: name, manufacturer, strength, form and pack size."""
+    return (
+        (name or "").lower(),
+        manufacturer_id,
+        (strength or "").strip().lower(),
+        (dosage_form or "").strip().lower(),
+        (pack_size or "").strip().lower(),
+    )
 
 
 def parse_price(price_str) -> float | None:
@@ -168,6 +1031,111 @@ def populate_fts(cursor: sqlite3.Cursor) -> None:
     """)
 
 
+def table_names(cursor: sqlite3.Cursor) -> set[str]:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    return {name for name, in cursor.fetchall()}
+
+
+def table_columns(cursor: sqlite3.Cursor, table: str) -> list[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def fts_columns(cursor: sqlite3.Cursor) -> list[str]:
+    """Columns of brands_fts, which add_bengali_names.py may have rebuilt with more."""
+    return table_columns(cursor, "brands_fts")
+
+
+def _fts_entries(columns: list[str]) -> str:
+    return f"""
+        SELECT b.id, {", ".join(FTS_SOURCES[column] for column in columns)}
+        FROM brands b
+        JOIN generics g ON b.generic_id = g.id
+        LEFT JOIN manufacturers m ON b.manufacturer_id = m.id
+        WHERE b.id IN (SELECT value FROM json_each(?))
+    """
+
+
+def delete_fts(cursor: sqlite3.Cursor, columns: list[str], brand_ids: list[int]) -> None:
+    """
+    Remove brands from brands_fts. It is an external-content table, so the
+    'delete' command needs the values that were indexed: call this before
+    the brands change.
+    """
+    if brand_ids:
+        cursor.execute(
+            f"INSERT INTO brands_fts (brands_fts, rowid, {', '.join(columns)}) "
+            f"SELECT 'delete', * FROM ({_fts_entries(columns)})",
+            (json.dumps(brand_ids),),
+        )
+
+
+def insert_fts(cursor: sqlite3.Cursor, columns: list[str], brand_ids: list[int]) -> None:
+    """Index brands in brands_fts with their current values."""
+    if brand_ids:
+        cursor.execute(
+            f"INSERT INTO brands_fts (rowid, {', '.join(columns)}) {_fts_entries(columns)}",
+            (json.dumps(brand_ids),),
+        )
+
+
+def cluster_brands(conn: sqlite3.Connection) -> None:
+    """
+    Renumber brands (and brand_sources) in (generic_id, price, id) order.
+    The table is stored in id order, so each generic's brands end up on
+    adjacent pages, already sorted by price.
+    """
+    cursor = conn.cursor()
+    columns = ", ".join(column for column in table_columns(cursor, "brands") if column != "id")
+    # Rows are inserted in the order the SELECT returns them, so a brand's
+    # rowid in the copy is its new id
+    cursor.execute("CREATE TEMP TABLE clustered_brands AS SELECT * FROM brands ORDER BY generic_id, price, id")
+    cursor.execute("""
+        CREATE TEMP TABLE clustered_sources AS
+        SELECT c.rowid AS brand_id, s.source_hash
+        FROM clustered_brands c
+        CROSS JOIN brand_sources s ON s.brand_id = c.id
+    """)
+    cursor.execute("DELETE FROM brands")
+    cursor.execute(f"INSERT INTO brands (id, {columns}) SELECT rowid, {columns} FROM clustered_brands")
+    cursor.execute("DELETE FROM brand_sources")
+    cursor.execute("INSERT INTO brand_sources SELECT brand_id, source_hash FROM clustered_sources")
+    cursor.execute("DROP TABLE temp.clustered_sources")
+    cursor.execute("DROP TABLE temp.clustered_brands")
+    conn.commit()
+
+
+def optimize_fts(cursor: sqlite3.Cursor) -> None:
+    """Merge the FTS index into a single b-tree segment."""
+    cursor.execute("INSERT INTO brands_fts (brands_fts) VALUES ('optimize')")
+
+
+def finalize_database(conn: sqlite3.Connection, cluster: bool = True, profiler: StageProfiler | None = None) -> None:
+    """
+    Index a loaded database: cluster brands by generic and price, create
+    indexes, populate and optimize FTS and ANALYZE, then restore safe
+    journal and sync settings.
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    brand_count = conn.execute("SELECT COUNT(*) FROM brands").fetchone()[0]
+    if cluster:
+        with profiler.stage("cluster") as stage:
+            cluster_brands(conn)
+            stage.rows += brand_count
+    with profiler.stage("indexes") as stage:
+        create_indexes(conn)
+        stage.rows += brand_count
+    with profiler.stage("fts") as stage:
+        populate_fts(conn.cursor())
+        optimize_fts(conn.cursor())
+        conn.commit()
+        stage.rows += brand_count
+    with profiler.stage("analyze"):
+        conn.execute("ANALYZE")
+        conn.commit()
+    apply_pragmas(conn, SAFE_PRAGMAS)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Build SQLite database from medicine data")
     parser.add_argument(
@@ -181,7 +1149,43 @@ def main():
         action="store_true",
         help="Copy database to Flutter assets folder",
     )
+    parser.add_argument(
+        "--no-price-reports",
+        action="store_true",
+        help="Do not fold crowdsourced price reports into confidence and price",
+    )
+    parser.add_argument(
+        "--incremental",
+        type=Path,
+        nargs="?",
+        const=OUTPUT_DB,
+        default=None,
+        metavar="DB",
+        help=f"Update an existing database by natural key instead of rebuilding it (default: {OUTPUT_DB})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=f"Normalize the input in this many processes (at most {MAX_WORKERS}), then merge",
+    )
+    parser.add_argument(
+        "--build-on-disk",
+        action="store_true",
+        help=f"Stage the build in {BUILD_DB} instead of memory (for low-memory machines)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each build stage and write a profile report next to the database",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="With --profile, also write cProfile stats per stage",
+    )
     args = parser.parse_args()
+    profiler = StageProfiler(enabled=args.profile or args.cprofile, cprofile=args.cprofile)
 
     # Determine input file
     if args.input:
@@ -198,108 +1202,90 @@ def main():
 
     print(f"Using input: {input_csv}")
 
-    # Remove existing database
-    OUTPUT_DB.parent.mkdir(parents=True, exist_ok=True)
-    if OUTPUT_DB.exists():
-        OUTPUT_DB.unlink()
+    # Stage the build; the published database is only replaced once it is complete
+    target = args.incremental or OUTPUT_DB
+    if args.incremental:
+        if not args.incremental.exists():
+            print(f"Error: {args.incremental} not found; run a full build first.")
+            return
+        conn = open_copy(args.incremental)
+        missing = {"brand_sources", "generic_monographs", "monograph_texts"} - table_names(conn.cursor())
+        if missing:
+            print(f"Error: {args.incremental} has no {', '.join(sorted(missing))} table; run a full build first.")
+            return
+    elif args.build_on_disk:
+        BUILD_DB.parent.mkdir(parents=True, exist_ok=True)
+        BUILD_DB.unlink(missing_ok=True)
+        conn = sqlite3.connect(BUILD_DB)
+    else:
+        conn = sqlite3.connect(":memory:")
 
-    # Connect and create schema
-    conn = sqlite3.connect(OUTPUT_DB)
-    create_schema(conn)
+    # A fresh database: create tables under the fast profile; indexes and FTS come after the data.
+    # An incremental build patches an existing database, so it keeps its page size and journal.
+    if args.incremental:
+        apply_pragmas(conn, SAFE_PRAGMAS)
+    else:
+        apply_pragmas(conn, FAST_BUILD_PRAGMAS)
+        with profiler.stage("schema"):
+            create_tables(conn)
     cursor = conn.cursor()
 
-    # Read input data
-    with open(input_csv, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        records = list(reader)
-
-    print(f"Building database from {len(records)} records...")
-
-    # Insert records
-    inserted = 0
-    for record in records:
-        # Handle both "generic_name" and "generic" column names
-        generic_name = (
-            record.get("generic_name", "") or 
-            record.get("generic", "")
-        ).strip()
-        
-        manufacturer_name = (
-            record.get("manufacturer", "") or 
-            record.get("company", "")
-        ).strip()
-        
-        brand_name = record.get("brand_name", "").strip()
-
-        if not generic_name or not brand_name:
-            continue
-
-        # Get medical info if available
-        indication = record.get("indication", "")
-        side_effects = record.get("side_effects", "")
+    with profiler.stage("price_reports"):
+        report_aggregates = {} if args.no_price_reports else load_aggregates(PRICE_REPORTS_DB)
+    if report_aggregates:
+        print(f"Folding in crowdsourced reports for {len(report_aggregates):,} medicines")
 
-        # Get or create related records
-        generic_id = get_or_create_generic(
-            cursor, generic_name, indication, side_effects
+    # Stream records in batches; IDs resolve in memory, generics are written once
+    if args.incremental:
+        print(f"Updating {args.incremental} from {input_csv}...")
+        with profiler.stage("read_database"):
+            loader = IncrementalLoader(cursor, report_aggregates, profiler=profiler)
+        mode = "incremental"
+    elif args.workers > 1:
+        print(f"Building database from {input_csv} with {min(args.workers, MAX_WORKERS)} workers...")
+        loader = ParallelLoader(cursor, args.workers, use_reports=bool(report_aggregates), profiler=profiler)
+        mode = f"workers={loader.workers}"
+    else:
+        print(f"Building database from {input_csv}...")
+        loader = BulkLoader(cursor, report_aggregates, profiler=profiler)
+        mode = "full"
+    loader.load_csv(input_csv)
+    loader.finish()
+    if args.incremental:
+        print(f"Inserted {loader.inserted:,}, updated {len(loader.updated_ids):,}, "
+              f"deleted {len(loader.deleted_ids):,} and kept {loader.unchanged:,} brands "
+              f"from {loader.read:,} records")
+        if loader.kept_deleted:
+            print(f"Skipped {loader.kept_deleted:,} records of brands deleted since the last build")
+    else:
+        print(f"Inserted {loader.inserted:,} brands from {loader.read:,} records")
+    # Add metadata
+    with profiler.stage("metadata"):
+        cursor.execute("SELECT COUNT(*) FROM brands")
+        brand_count = cursor.fetchone()[0]
+        cursor.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+            ("version", "1.0")
         )
-        manufacturer_id = (
-            get_or_create_manufacturer(cursor, manufacturer_name)
-            if manufacturer_name
-            else None
+        cursor.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+            ("build_date", datetime.now().isoformat())
         )
-
-        # Determine confidence level
-        confidence = record.get("confidence", "LOW")
-        verified = confidence in ("HIGH", "MEDIUM")
-
-        # Parse prices
-        price = parse_price(record.get("verified_price")) or parse_price(record.get("price"))
-        unit_price = parse_price(record.get("unit_price")) or price
-
-        # Insert brand
         cursor.execute(
-            """
-            INSERT INTO brands (
-                name, generic_id, manufacturer_id, strength, dosage_form, 
-                price, unit_price, pack_size, confidence, verified, last_updated
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                brand_name,
-                generic_id,
-                manufacturer_id,
-                record.get("strength", ""),
-                record.get("dosage_form", ""),
-                price,
-                unit_price,
-                record.get("pack_size", ""),
-                confidence,
-                verified,
-                datetime.now().strftime("%Y-%m-%d"),
-            ),
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+            ("record_count", str(brand_count))
         )
-        inserted += 1
 
-    # Populate FTS
-    print("Building full-text search index...")
-    populate_fts(cursor)
+        conn.commit()
 
-    # Add metadata
-    cursor.execute(
-        "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
-        ("version", "1.0")
-    )
-    cursor.execute(
-        "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
-        ("build_date", datetime.now().isoformat())
-    )
-    cursor.execute(
-        "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
-        ("record_count", str(inserted))
-    )
-
-    conn.commit()
+    if args.incremental:
+        # Indexes and FTS were maintained row by row; refresh stale statistics
+        with profiler.stage("analyze"):
+            conn.execute("PRAGMA optimize")
+    else:
+        # Indexes, FTS and statistics, built once over the loaded tables
+        print("Building indexes and full-text search index...")
+        finalize_database(conn, profiler=profiler)
 
     # Print statistics
     cursor.execute("SELECT COUNT(*) FROM generics")
@@ -308,32 +1294,39 @@ def main():
     cursor.execute("SELECT COUNT(*) FROM manufacturers")
     manufacturer_count = cursor.fetchone()[0]
 
-    cursor.execute("SELECT COUNT(*) FROM brands")
-    brand_count = cursor.fetchone()[0]
-
     cursor.execute("SELECT COUNT(*) FROM brands WHERE verified = 1")
     verified_count = cursor.fetchone()[0]
 
+    # Publish atomically
+    with profiler.stage("publish"):
+        publish(conn, target)
+    if args.copy_to_flutter:
+        with profiler.stage("copy_to_flutter"):
+            publish(conn, FLUTTER_ASSETS_DB)
     conn.close()
+    if args.build_on_disk:
+        BUILD_DB.unlink(missing_ok=True)
 
     print(f"\n{'=' * 50}")
     print("DATABASE BUILD COMPLETE")
     print(f"{'=' * 50}")
-    print(f"  Location:      {OUTPUT_DB}")
+    print(f"  Location:      {target}")
     print(f"  Generics:      {generic_count:,}")
     print(f"  Manufacturers: {manufacturer_count:,}")
     print(f"  Brands:        {brand_count:,}")
     print(f"  Verified:      {verified_count:,} ({verified_count/max(brand_count,1)*100:.1f}%)")
+    if report_aggregates:
+        print(f"  Report-adjusted: {loader.report_adjusted:,}")
     print(f"{'=' * 50}")
 
-    # Copy to Flutter assets
+    if profiler.enabled:
+        profiler.finish(target, mode, input_csv)
+
     if args.copy_to_flutter:
-        FLUTTER_ASSETS_DB.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(OUTPUT_DB, FLUTTER_ASSETS_DB)
-        print(f"\nCopied to Flutter: {FLUTTER_ASSETS_DB}")
+        print(f"\nPublished to Flutter: {FLUTTER_ASSETS_DB}")
     else:
         print(f"\nTo copy to Flutter:")
-        print(f"  cp {OUTPUT_DB} ../assets/db/")
+        print(f"  cp {target} ../assets/db/")
 
 
 if __name__ == "__main__":
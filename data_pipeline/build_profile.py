@@ -0,0 +1,251 @@
+"""
+Medicine Saver BD - Build Stage Profiling
+
+Times the stages of a build_db.py run (--profile): wall time, CPU time
+(including worker processes that finished during the stage), rows/sec
+and peak RSS per stage. A stage may be entered many times (once per
+batch for CSV parsing, ID resolution and brand inserts); its entries add
+up. Peak RSS is the high-water mark during the stage's entries, reset at
+each entry where Linux allows it (/proc/self/clear_refs), otherwise the
+process peak so far.
+
+The report is written as JSON next to the database
+(output/medicines.profile.json), which keeps the latest profile of each
+build mode (full, incremental, workers=N; with or without cProfile, which
+slows every stage down). Before it is replaced, each stage is compared
+with the previous profile of the same mode, and a warning is printed when
+it got REGRESSION_FACTOR slower per row (or in total, for stages without
+rows) or used that much more memory.
+
+With --cprofile, each stage also gets its own cProfile stats file in
+output/medicines.profile/<stage>.pstats (python -m pstats to browse).
+
+Usage:
+    python build_db.py --profile
+    python build_db.py --profile --cprofile
+
+    profiler = StageProfiler()
+    with profiler.stage("csv_parse") as stage:
+        batch = list(islice(records, BATCH_SIZE))
+        stage.rows += len(batch)
+    profiler.finish(db_path, mode="full", input_path=csv_path)
+"""
+
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# A stage is reported as regressed when this much slower or larger
+REGRESSION_FACTOR = 1.25
+# ... and by at least this much (shorter stages are dominated by noise)
+MIN_REGRESSION_SECONDS = 0.1
+MIN_REGRESSION_MIB = 16.0
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def report_path(db_path: Path) -> Path:
+    """The profile report of a database (medicines.db -> medicines.profile.json)."""
+    return Path(db_path).with_suffix(".profile.json")
+
+
+def stats_dir(db_path: Path) -> Path:
+    """The directory of a database's per-stage cProfile stats."""
+    return Path(db_path).with_suffix(".profile")
+
+
+def reset_peak_rss() -> bool:
+    """Reset this process's RSS high-water mark (Linux); False where that is not possible."""
+    try:
+        PROC_CLEAR_REFS.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mib() -> float:
+    """RSS high-water mark of this process in MiB (since the last reset, on Linux)."""
+    try:
+        for line in PROC_STATUS.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, KiB elsewhere
+
+
+def children_cpu_seconds() -> float:
+    """CPU time of the child processes that have exited."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@dataclass
+class Stage:
+    """Totals of one stage over all its entries."""
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows: int = 0
+    peak_rss_mib: float = 0.0
+
+    @property
+    def rows_per_s(self) -> float | None:
+        return self.rows / self.wall_s if self.rows and self.wall_s else None
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "rows_per_s": self.rows_per_s}
+
+
+class StageProfiler:
+    """Per-stage wall, CPU, rows and peak RSS; a disabled profiler only runs the blocks."""
+
+    def __init__(self, enabled: bool = True, cprofile: bool = False):
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.stages: dict[str, Stage] = {}                # in first-entry order
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time() + children_cpu_seconds()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        """Time a block as (one entry of) a stage; add to .rows of the yielded Stage."""
+        stage = self.stages.setdefault(name, Stage())
+        if not self.enabled:
+            yield stage
+            return
+        reset = reset_peak_rss()
+        profile = self.profiles.setdefault(name, cProfile.Profile()) if self.cprofile else None
+        wall, cpu = time.perf_counter(), time.process_time() + children_cpu_seconds()
+        if profile:
+            profile.enable()
+        try:
+            yield stage
+        finally:
+            if profile:
+                profile.disable()
+            stage.calls += 1
+            stage.wall_s += time.perf_counter() - wall
+            stage.cpu_s += time.process_time() + children_cpu_seconds() - cpu
+            peak = peak_rss_mib()
+            stage.peak_rss_mib = max(stage.peak_rss_mib, peak) if reset else peak
+
+    def report(self, mode: str, input_path: Path | None = None) -> dict:
+        """The profile of the stages run so far, as written to the JSON report."""
+        stages = {name: stage.to_dict() for name, stage in self.stages.items() if stage.calls}
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "mode": f"{mode}+cprofile" if self.cprofile else mode,
+            "input": str(input_path) if input_path else None,
+            "total": {
+                "wall_s": time.perf_counter() - self.started,
+                "cpu_s": time.process_time() + children_cpu_seconds() - self.started_cpu,
+                "peak_rss_mib": max((stage["peak_rss_mib"] for stage in stages.values()), default=0.0),
+            },
+            "stages": stages,
+        }
+
+    def finish(self, db_path: Path, mode: str, input_path: Path | None = None) -> dict:
+        """
+        Print the stage table and any regressions against the previous
+        report, then write the report (and cProfile stats) next to db_path.
+        """
+        report = self.report(mode, input_path)
+        path = report_path(db_path)
+        profiles = load_profiles(path)
+        previous = profiles.get(report["mode"])
+        print_report(report)
+        if previous is None:
+            print(f"\nNo previous {report['mode']} profile in {path} to compare with")
+        else:
+            warnings = regressions(previous, report)
+            if warnings:
+                print()
+            for warning in warnings:
+                print(f"Warning: {warning}")
+            if not warnings:
+                print(f"\nNo stage regressed against the profile of {previous.get('created')}")
+
+        profiles[report["mode"]] = report
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps({"latest": report["mode"], "profiles": profiles}, indent=2), encoding="utf-8")
+        os.replace(temp, path)
+        print(f"Profile report: {path}")
+
+        if self.profiles:
+            directory = stats_dir(db_path)
+            directory.mkdir(parents=True, exist_ok=True)
+            for name, profile in self.profiles.items():
+                profile.dump_stats(directory / f"{name}.pstats")
+            print(f"cProfile stats: {directory}/<stage>.pstats")
+        return report
+
+
+def load_profiles(path: Path) -> dict[str, dict]:
+    """The latest profile of each build mode in a report file ({} if missing or unreadable)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("profiles", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def regressions(previous: dict, current: dict) -> list[str]:
+    """Warnings for the stages that got slower or larger than in the previous report."""
+    warnings = []
+    for name, stage in current["stages"].items():
+        before = previous.get("stages", {}).get(name)
+        if not before:
+            continue
+        if stage["rows"] and before.get("rows"):
+            # Per row, so a bigger input is not a regression
+            old, new = before["wall_s"] / before["rows"], stage["wall_s"] / stage["rows"]
+            grown = new * stage["rows"] - old * stage["rows"]
+            unit = f"{old * 1e6:.2f} -> {new * 1e6:.2f} µs/row"
+        else:
+            old, new = before["wall_s"], stage["wall_s"]
+            grown = new - old
+            unit = f"{old:.2f}s -> {new:.2f}s"
+        if new > old * REGRESSION_FACTOR and grown >= MIN_REGRESSION_SECONDS:
+            warnings.append(f"stage {name} is {new / old:.1f}x slower ({unit})")
+
+        old_rss, new_rss = before.get("peak_rss_mib", 0.0), stage["peak_rss_mib"]
+        if old_rss and new_rss > old_rss * REGRESSION_FACTOR and new_rss - old_rss >= MIN_REGRESSION_MIB:
+            warnings.append(f"stage {name} peaked at {new_rss:,.0f} MiB RSS ({old_rss:,.0f} MiB before)")
+    return warnings
+
+
+def print_report(report: dict) -> None:
+    """Stage table of a profile report."""
+    print(f"\n{'=' * 78}")
+    print(f"BUILD PROFILE ({report['mode']})")
+    print(f"{'=' * 78}")
+    print(f"  {'Stage':<18} {'Calls':>6} {'Wall s':>9} {'CPU s':>9} {'Rows':>11} {'Rows/s':>11} {'Peak MiB':>9}")
+    for name, stage in report["stages"].items():
+        rate = f"{stage['rows_per_s']:,.0f}" if stage["rows_per_s"] else "-"
+        rows = f"{stage['rows']:,}" if stage["rows"] else "-"
+        print(f"  {name:<18} {stage['calls']:>6} {stage['wall_s']:>9.3f} {stage['cpu_s']:>9.3f} "
+              f"{rows:>11} {rate:>11} {stage['peak_rss_mib']:>9,.0f}")
+    total = report["total"]
+    print(f"  {'Total':<18} {'':>6} {total['wall_s']:>9.3f} {total['cpu_s']:>9.3f} "
+          f"{'':>11} {'':>11} {total['peak_rss_mib']:>9,.0f}")
@@ -0,0 +1,252 @@
+"""
+Medicine Saver BD - Compact Database Layout
+
+Rewrites a finished medicines.db (built and post-processed) into a smaller
+layout for shipping to the app, which downloads the database whole:
+
+- Repeated brand TEXT columns (strength, dosage form, pack size, confidence,
+  last_updated) become integer codes into small lookup tables, most
+  frequent value first so most codes fit in one byte
+- brands becomes the brand_rows table plus a brands view that joins the
+  lookups back, so the app's queries run unchanged
+- Key-value tables with a TEXT primary key (generic_aliases, metadata)
+  become WITHOUT ROWID, which stores each key once instead of twice
+- Indexes the app cannot use (brand and generic name indexes; its searches
+  are LIKE '%...%') and the build-only brand_sources table are dropped
+- A fresh database is written with COMPACT_PAGE_SIZE pages and no
+  auto_vacuum (the app never deletes from it, so pointer-map pages would
+  be dead weight), then ANALYZEd and published atomically (db_publish.py)
+
+Run it last: the compact layout is read-only for the post-processing
+scripts (brands is a view). A per-table and per-index size report (dbstat)
+compares the input and compact layouts.
+
+Usage:
+    python compact_db.py                                   # output/medicines.db -> output/medicines_compact.db
+    python compact_db.py --db ../assets/db/medicines.db --output ../assets/db/medicines.db
+    python compact_db.py --report-only                     # Size report of --db
+"""
+
+import argparse
+import re
+import sqlite3
+from pathlib import Path
+
+from db_publish import open_copy, publish
+
+DEFAULT_DB = Path("output/medicines.db")
+DEFAULT_OUTPUT = Path("output/medicines_compact.db")
+
+# Smallest file of 1, 2, 4 and 8 KiB pages on the Kaggle build
+COMPACT_PAGE_SIZE = 2048
+
+# Coded brand column -> lookup table
+LOOKUPS = {
+    "strength": "strengths",
+    "dosage_form": "dosage_forms",
+    "pack_size": "pack_sizes",
+    "confidence": "confidences",
+    "last_updated": "update_dates",
+}
+
+WITHOUT_ROWID_TABLES = {"generic_aliases", "metadata"}
+
+# Name indexes for lookups by the pipeline scripts, which LIKE '%...%' cannot use
+# (idx_generics_name also duplicates the UNIQUE index of older builds)
+DROPPED_INDEXES = {"idx_brands_name", "idx_brands_name_lower", "idx_generics_name", "idx_generics_name_lower"}
+DROPPED_TABLES = {"brand_sources"}
+
+FTS_TABLE = "brands_fts"
+FTS_SHADOW_SUFFIXES = ("data", "idx", "content", "docsize", "config")
+
+
+def schema_objects(conn: sqlite3.Connection, schema: str, kind: str) -> list[tuple[str, str, str]]:
+    """(name, table name, CREATE statement) of the tables or indexes of an attached schema."""
+    return conn.execute(
+        f"SELECT name, tbl_name, sql FROM {schema}.sqlite_master "
+        "WHERE type = ? AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY rowid",
+        (kind,),
+    ).fetchall()
+
+
+def copy_lookups(conn: sqlite3.Connection, columns: list[str]) -> list[str]:
+    """Create and fill the lookup table of each coded column present in brands; returns those columns."""
+    coded = [column for column in columns if column in LOOKUPS]
+    for column in coded:
+        table = LOOKUPS[column]
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        conn.execute(f"""
+            INSERT INTO {table} (name)
+            SELECT {column} FROM legacy.brands
+            WHERE {column} IS NOT NULL
+            GROUP BY {column}
+            ORDER BY COUNT(*) DESC, {column}
+        """)
+        conn.execute(f"CREATE INDEX idx_{table}_name ON {table}(name)")  # dropped once brands are coded
+    return coded
+
+
+def copy_brands(conn: sqlite3.Connection) -> None:
+    """brands -> brand_rows with coded columns, and the brands view over it."""
+    info = conn.execute("PRAGMA legacy.table_info(brands)").fetchall()
+    columns = [row[1] for row in info]
+    types = {row[1]: row[2] for row in info}
+    coded = copy_lookups(conn, columns)
+
+    definitions = ["id INTEGER PRIMARY KEY"]
+    definitions += [
+        f"{column}_id INTEGER" if column in coded else f"{column} {types[column]}".rstrip()
+        for column in columns if column != "id"
+    ]
+    definitions += [
+        "FOREIGN KEY (generic_id) REFERENCES generics (id)",
+        "FOREIGN KEY (manufacturer_id) REFERENCES manufacturers (id)",
+    ]
+    conn.execute("CREATE TABLE brand_rows (\n    " + ",\n    ".join(definitions) + "\n)")
+
+    stored = [f"{column}_id" if column in coded else column for column in columns]
+    selected = [f"{LOOKUPS[column]}.id" if column in coded else f"b.{column}" for column in columns]
+    joins = "".join(
+        f"\n        LEFT JOIN {LOOKUPS[column]} ON {LOOKUPS[column]}.name = b.{column}" for column in coded
+    )
+    conn.execute(f"""
+        INSERT INTO brand_rows ({", ".join(stored)})
+        SELECT {", ".join(selected)}
+        FROM legacy.brands b{joins}
+        ORDER BY b.id
+    """)
+    for column in coded:
+        conn.execute(f"DROP INDEX idx_{LOOKUPS[column]}_name")
+
+    # The legacy column names and order, for the app's queries. Scalar
+    # subqueries rather than joins: a lookup is only read when its column is
+    # selected, and the planner sees a single table (so ORDER BY price LIMIT
+    # still walks idx_brands_price)
+    selected = [
+        f"(SELECT name FROM {LOOKUPS[column]} WHERE id = b.{column}_id) AS {column}" if column in coded
+        else f"b.{column}"
+        for column in columns
+    ]
+    conn.execute("CREATE VIEW brands AS\n    SELECT " + ",\n        ".join(selected) + "\n    FROM brand_rows b")
+
+
+def copy_fts(conn: sqlite3.Connection) -> None:
+    """Copy the FTS index as is (its shadow tables), whichever columns it has."""
+    row = conn.execute("SELECT sql FROM legacy.sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone()
+    if row is None:
+        return
+    conn.execute(row[0])
+    for table in fts_shadow_tables(conn, "main"):
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"INSERT INTO {table} SELECT * FROM legacy.{table}")
+
+
+def fts_shadow_tables(conn: sqlite3.Connection, schema: str) -> list[str]:
+    names = [name for name, _, _ in schema_objects(conn, schema, "table")]
+    return [name for name in names if name in {f"{FTS_TABLE}_{suffix}" for suffix in FTS_SHADOW_SUFFIXES}]
+
+
+def compact(path: Path, page_size: int = COMPACT_PAGE_SIZE) -> sqlite3.Connection:
+    """In-memory database with the compact layout of the database at path."""
+    conn = sqlite3.connect(":memory:")
+    # Both only take effect before the first table is created
+    conn.execute(f"PRAGMA page_size = {int(page_size)}")
+    conn.execute("PRAGMA auto_vacuum = NONE")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("ATTACH DATABASE ? AS legacy", (str(path),))
+
+    skipped = {"brands", FTS_TABLE, *DROPPED_TABLES, *fts_shadow_tables(conn, "legacy")}
+    for table, _, sql in schema_objects(conn, "legacy", "table"):
+        if table in skipped:
+            continue
+        conn.execute(sql + " WITHOUT ROWID" if table in WITHOUT_ROWID_TABLES else sql)
+        conn.execute(f"INSERT INTO {table} SELECT * FROM legacy.{table}")
+    copy_brands(conn)
+    copy_fts(conn)
+
+    for index, table, sql in schema_objects(conn, "legacy", "index"):
+        if index in DROPPED_INDEXES or table in DROPPED_TABLES:
+            continue
+        if table == "brands":
+            sql = re.sub(r"\bON\s+brands\s*\(", "ON brand_rows (", sql)
+        conn.execute(sql)
+
+    conn.commit()
+    conn.execute("DETACH DATABASE legacy")
+    conn.execute("ANALYZE")
+    conn.commit()
+    return conn
+
+
+def size_report(path: Path) -> dict[str, int]:
+    """Bytes of every table and index of a database file (dbstat)."""
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+    finally:
+        conn.close()
+
+
+def print_report(legacy: Path, compacted: Path | None = None) -> None:
+    """Per-table/index sizes of one database, or of the input and compact layouts side by side."""
+    before = size_report(legacy)
+    after = size_report(compacted) if compacted else {}
+    names = sorted(before.keys() | after.keys(), key=lambda name: -max(before.get(name, 0), after.get(name, 0)))
+
+    def kb(size: int | None) -> str:
+        return "-" if size is None else f"{size / 1024:,.1f}"
+
+    print(f"\n{'=' * 60}")
+    print(f"SIZE REPORT (KiB): {legacy}" + (f" -> {compacted}" if compacted else ""))
+    print(f"{'=' * 60}")
+    print(f"  {'Table / index':<36} {'Input':>10}" + (f" {'Compact':>10}" if compacted else ""))
+    for name in names:
+        line = f"  {name:<36} {kb(before.get(name)):>10}"
+        if compacted:
+            line += f" {kb(after.get(name)):>10}"
+        print(line)
+    total = f"  {'File':<36} {kb(Path(legacy).stat().st_size):>10}"
+    if compacted:
+        total += f" {kb(Path(compacted).stat().st_size):>10}"
+    print(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite medicines.db into the compact shipping layout")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Built (and post-processed) database")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Compact database to publish")
+    parser.add_argument("--page-size", type=int, default=COMPACT_PAGE_SIZE, help="Page size of the output")
+    parser.add_argument("--report-only", action="store_true", help="Only print the size report of --db")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"Error: {args.db} not found")
+        return
+    if args.report_only:
+        print_report(args.db)
+        return
+    conn = sqlite3.connect(args.db)
+    kind = conn.execute("SELECT type FROM sqlite_master WHERE name = 'brands'").fetchone()
+    conn.close()
+    if kind == ("view",):
+        print(f"{args.db} is already compact")
+        return
+
+    # The input may be the output too: report on a copy taken before it is replaced
+    legacy = args.db
+    if args.db.resolve() == args.output.resolve():
+        legacy = args.db.with_name(f".{args.db.name}.legacy")
+        publish(open_copy(args.db), legacy)
+
+    print(f"Compacting {args.db} ({args.page_size}-byte pages)...")
+    conn = compact(legacy, args.page_size)
+    publish(conn, args.output)
+    conn.close()
+    print_report(legacy, args.output)
+    if legacy != args.db:
+        legacy.unlink()
+    print(f"\n✅ Compact database: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
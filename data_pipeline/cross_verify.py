@@ -11,20 +11,39 @@ Price Verification Rules:
 - DGDA is the "Golden Source" for legal MRP
 - Medex is the "Rich Source" for medical info
 - Discrepancies > 10% are flagged for review
-- Crowdsourced reports influence confidence scores
+- Crowdsourced reports influence confidence scores (price_reports.py,
+  folded in by build_db.py)
 
 Usage:
     python cross_verify.py --medex output/medex_medicines.csv --dgda output/raw_medicines.csv
+    python cross_verify.py --fuzzy    # Also match spelling variants across sources
+    python cross_verify.py --workers 4  # Verify in 4 processes
+    python cross_verify.py --full     # Recompute every key, not just changed ones
+
+Re-runs are incremental: only match keys touched by changed source rows
+(see ingest_hash.py) are recomputed; the rest come from the per-key state
+in output/verify_state.db (see verify_state.py).
 """
 
 import argparse
 import csv
 import json
 import re
+import sys
+import zlib
 from collections import defaultdict
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from itertools import chain
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+import numpy as np
+
+from blocking_index import MATCH_THRESHOLD, match_keys, split_match_key
+from ingest_hash import IngestTracker, load_touched_keys, state_fingerprint
+from verify_state import PRICE_SOURCES_COLUMN, VERIFIED_COLUMNS, VERIFY_STATE_DB, VerifyState
 
 # Configuration
 OUTPUT_DIR = Path("output")
@@ -38,9 +57,35 @@ PRICE_TOLERANCE = 0.10
 CONFIDENCE_HIGH = "HIGH"
 CONFIDENCE_MEDIUM = "MEDIUM"
 CONFIDENCE_LOW = "LOW"
+CONFIDENCE_TIERS = (CONFIDENCE_HIGH, CONFIDENCE_MEDIUM, CONFIDENCE_LOW)
+
+# Source of a verified row, by the origin index used in cross_verify_rows()
+SOURCE_NAMES = ("medex", "dgda")
+
+# Characters dropped from match and ingest keys
+NON_KEY_CHARS = re.compile(r"[^a-z0-9]")
 
+# Categorical fields that repeat across many records. They are interned so
+# every record with the same value shares one string object.
+RECORD_INTERNED_FIELDS = (
+    "generic_name", "strength", "dosage_form", "manufacturer",
+    "pack_size", "indication", "side_effects", "source",
+)
+VERIFIED_INTERNED_FIELDS = (
+    "generic_name", "strength", "dosage_form", "manufacturer",
+    "pack_size", "indication", "side_effects", "confidence", "last_updated",
+)
 
-@dataclass
+
+def intern_fields(record, names: tuple[str, ...]) -> None:
+    """Replace string fields on a record with their interned copies."""
+    for name in names:
+        value = getattr(record, name)
+        if value and type(value) is str:
+            setattr(record, name, sys.intern(value))
+
+
+@dataclass(slots=True)
 class MedicineRecord:
     """Represents a medicine record from any source."""
     brand_name: str
@@ -55,17 +100,26 @@ class MedicineRecord:
     side_effects: str = ""
     source: str = ""
     source_url: str = ""
+
+    def __post_init__(self):
+        intern_fields(self, RECORD_INTERNED_FIELDS)
     
     def get_match_key(self) -> str:
         """Generate a normalized key for matching across sources."""
         # Normalize brand name: lowercase, remove special chars
-        brand = re.sub(r"[^a-z0-9]", "", self.brand_name.lower())
+        brand = NON_KEY_CHARS.sub("", self.brand_name.lower())
         # Normalize strength
-        strength = re.sub(r"[^a-z0-9]", "", self.strength.lower()) if self.strength else ""
+        strength = NON_KEY_CHARS.sub("", self.strength.lower()) if self.strength else ""
         return f"{brand}_{strength}"
 
+    def get_ingest_key(self) -> str:
+        """Natural key used for change tracking (match key + manufacturer + form)."""
+        manufacturer = NON_KEY_CHARS.sub("", self.manufacturer.lower())
+        dosage_form = NON_KEY_CHARS.sub("", self.dosage_form.lower())
+        return f"{self.get_match_key()}|{manufacturer}|{dosage_form}"
 
-@dataclass
+
+@dataclass(slots=True)
 class VerifiedMedicine:
     """A medicine record verified across multiple sources."""
     brand_name: str
@@ -84,6 +138,14 @@ class VerifiedMedicine:
     discrepancy_details: str = ""
     last_updated: str = ""
 
+    def __post_init__(self):
+        intern_fields(self, VERIFIED_INTERNED_FIELDS)
+
+
+# Field tuples used to ship records to and from shard workers
+RECORD_FIELDS_OF = attrgetter(*(f.name for f in fields(MedicineRecord)))
+VERIFIED_FIELDS_OF = attrgetter(*(f.name for f in fields(VerifiedMedicine)))
+
 
 def normalize_strength(strength: str) -> str:
     """Standardize strength notation."""
@@ -104,6 +166,57 @@ def normalize_brand(name: str) -> str:
     return " ".join(name.split()).strip().title()
 
 
+def medex_record(row: dict) -> MedicineRecord:
+    """MedicineRecord for one row of the Medex CSV."""
+    try:
+        unit_price = float(row.get("unit_price", 0) or 0)
+        mrp_price = float(row.get("mrp_price", 0) or 0)
+    except ValueError:
+        unit_price = 0.0
+        mrp_price = 0.0
+    
+    return MedicineRecord(
+        brand_name=row.get("brand_name", ""),
+        generic_name=row.get("generic_name", ""),
+        strength=row.get("strength", ""),
+        dosage_form=row.get("dosage_form", ""),
+        manufacturer=row.get("manufacturer", ""),
+        price=mrp_price,
+        unit_price=unit_price,
+        pack_size=row.get("pack_size", ""),
+        indication=row.get("indication", ""),
+        side_effects=row.get("side_effects", ""),
+        source="medex",
+        source_url=row.get("source_url", ""),
+    )
+
+
+def dgda_record(row: dict) -> MedicineRecord:
+    """MedicineRecord for one row of the DGDA/Kaggle CSV."""
+    try:
+        price = float(row.get("price", 0) or 0)
+    except ValueError:
+        price = 0.0
+    
+    return MedicineRecord(
+        brand_name=row.get("brand_name", ""),
+        generic_name=row.get("generic_name", ""),
+        strength=row.get("strength", ""),
+        dosage_form=row.get("dosage_form", ""),
+        manufacturer=row.get("manufacturer", ""),
+        price=price,
+        unit_price=price,  # Assume unit price for this source
+        source="dgda",
+    )
+
+
+def iter_csv_records(filepath: Path, parse_row) -> Iterator[MedicineRecord]:
+    """Stream MedicineRecords from a CSV file, one parse_row(row) per line."""
+    with open(filepath, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield parse_row(row)
+
+
 def load_medex_data(filepath: Path) -> list[MedicineRecord]:
     """Load medicine data from Medex CSV."""
     records = []
@@ -112,33 +225,14 @@ def load_medex_data(filepath: Path) -> list[MedicineRecord]:
         print(f"Warning: Medex file not found at {filepath}")
         return records
     
-    with open(filepath, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                unit_price = float(row.get("unit_price", 0) or 0)
-                mrp_price = float(row.get("mrp_price", 0) or 0)
-            except ValueError:
-                unit_price = 0.0
-                mrp_price = 0.0
-            
-            record = MedicineRecord(
-                brand_name=row.get("brand_name", ""),
-                generic_name=row.get("generic_name", ""),
-                strength=row.get("strength", ""),
-                dosage_form=row.get("dosage_form", ""),
-                manufacturer=row.get("manufacturer", ""),
-                price=mrp_price,
-                unit_price=unit_price,
-                pack_size=row.get("pack_size", ""),
-                indication=row.get("indication", ""),
-                side_effects=row.get("side_effects", ""),
-                source="medex",
-                source_url=row.get("source_url", ""),
-            )
-            records.append(record)
+    tracker = IngestTracker("medex")
+    for record in iter_csv_records(filepath, medex_record):
+        if not tracker.admit(record.get_ingest_key(), RECORD_FIELDS_OF(record)):
+            continue
+        records.append(record)
     
     print(f"Loaded {len(records)} records from Medex")
+    print(f"  {tracker.finish().summary()}")
     return records
 
 
@@ -150,27 +244,14 @@ def load_dgda_data(filepath: Path) -> list[MedicineRecord]:
         print(f"Warning: DGDA file not found at {filepath}")
         return records
     
-    with open(filepath, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                price = float(row.get("price", 0) or 0)
-            except ValueError:
-                price = 0.0
-            
-            record = MedicineRecord(
-                brand_name=row.get("brand_name", ""),
-                generic_name=row.get("generic_name", ""),
-                strength=row.get("strength", ""),
-                dosage_form=row.get("dosage_form", ""),
-                manufacturer=row.get("manufacturer", ""),
-                price=price,
-                unit_price=price,  # Assume unit price for this source
-                source="dgda",
-            )
-            records.append(record)
+    tracker = IngestTracker("dgda")
+    for record in iter_csv_records(filepath, dgda_record):
+        if not tracker.admit(record.get_ingest_key(), RECORD_FIELDS_OF(record)):
+            continue
+        records.append(record)
     
     print(f"Loaded {len(records)} records from DGDA")
+    print(f"  {tracker.finish().summary()}")
     return records
 
 
@@ -206,25 +287,153 @@ def calculate_price_discrepancy(prices: list[float]) -> tuple[float, float, bool
     return avg_price, max_deviation * 100, has_discrepancy
 
 
-def verify_and_merge(
+def build_price_matrix(price_rows: list[list[float]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pack per-key price lists into a padded matrix.
+    Returns: (prices[keys, max_sources], mask) where mask marks real entries
+    """
+    lengths = np.fromiter(map(len, price_rows), dtype=np.int64, count=len(price_rows))
+    total = int(lengths.sum())
+    width = int(lengths.max()) if len(lengths) else 0
+    flat = np.fromiter(chain.from_iterable(price_rows), dtype=np.float64, count=total)
+
+    # Row and column of every flattened price
+    rows = np.repeat(np.arange(len(price_rows)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    cols = np.arange(total) - np.repeat(starts, lengths)
+
+    prices = np.zeros((len(price_rows), width), dtype=np.float64)
+    mask = np.zeros((len(price_rows), width), dtype=bool)
+    prices[rows, cols] = flat
+    mask[rows, cols] = True
+    return prices, mask
+
+
+def calculate_price_discrepancies(
+    prices: np.ndarray, mask: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized calculate_price_discrepancy over a price matrix (one row per key).
+    Returns: (average_prices, max_deviation_percents, has_discrepancy)
+    """
+    valid = mask & (prices > 0)
+    counts = valid.sum(axis=1)
+
+    # Accumulate column by column so sums match the scalar left-to-right order
+    totals = np.zeros(len(prices), dtype=np.float64)
+    for j in range(prices.shape[1]):
+        totals += np.where(valid[:, j], prices[:, j], 0.0)
+
+    has_prices = counts > 0
+    averages = np.zeros(len(prices), dtype=np.float64)
+    np.divide(totals, counts, out=averages, where=has_prices)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.abs(prices - averages[:, None]) / averages[:, None]
+    max_deviation = np.where(valid, relative, -np.inf).max(axis=1, initial=-np.inf)
+    max_deviation = np.where(has_prices, max_deviation, 0.0)
+
+    return averages, max_deviation * 100, max_deviation > PRICE_TOLERANCE
+
+
+def assign_confidence_tiers(source_counts: np.ndarray, flags: np.ndarray) -> np.ndarray:
+    """
+    Confidence tier per key as an index into CONFIDENCE_TIERS:
+    2+ prices and no discrepancy -> HIGH, 2+ prices -> MEDIUM, else LOW.
+    """
+    multi = source_counts >= 2
+    return np.where(multi, np.where(flags, 1, 0), 2)
+
+
+def find_fuzzy_matches(
     medex_records: list[MedicineRecord],
-    dgda_records: list[MedicineRecord]
-) -> tuple[list[VerifiedMedicine], list[dict]]:
+    dgda_index: dict[str, list[MedicineRecord]],
+    threshold: float = MATCH_THRESHOLD,
+) -> dict[str, str]:
+    """
+    Pair Medex keys without an exact DGDA match to unmatched DGDA keys
+    that are spelling variants of them.
+    Returns: {medex_key: dgda_key}
+    """
+    medex_keys = dict.fromkeys(r.get_match_key() for r in medex_records)
+    unmatched_medex = [k for k in medex_keys if k not in dgda_index]
+    unmatched_dgda = [k for k in dgda_index if k not in medex_keys]
+    matches = match_keys(unmatched_medex, unmatched_dgda, threshold)
+    print(f"Fuzzy matched {len(matches)} of {len(unmatched_medex)} unmatched Medex keys")
+    return {medex_key: dgda_key for medex_key, (dgda_key, _) in matches.items()}
+
+
+def discrepancy_record(
+    verified_med: VerifiedMedicine, deviation: float, sources=SOURCE_NAMES
+) -> dict:
+    """Row of the price discrepancy report for a flagged medicine."""
+    record = {"brand_name": verified_med.brand_name, "strength": verified_med.strength}
+    for source in sources:
+        record[f"{source}_price"] = verified_med.price_sources.get(source, 0)
+    record["deviation_percent"] = deviation
+    record["action_required"] = "REVIEW"
+    return record
+
+
+def build_verified(
+    record: MedicineRecord,
+    price_sources: dict,
+    verified_price: float,
+    confidence: str,
+    has_discrepancy: bool,
+    deviation: float,
+) -> VerifiedMedicine:
+    """Verified medicine with the medical info of record and the chosen price."""
+    return VerifiedMedicine(
+        brand_name=normalize_brand(record.brand_name),
+        generic_name=record.generic_name,
+        strength=normalize_strength(record.strength),
+        dosage_form=record.dosage_form,
+        manufacturer=record.manufacturer,
+        verified_price=round(verified_price, 2),
+        unit_price=round(record.unit_price, 2),
+        pack_size=record.pack_size,
+        indication=record.indication,
+        side_effects=record.side_effects,
+        confidence=confidence,
+        price_sources=price_sources,
+        discrepancy_flag=has_discrepancy,
+        discrepancy_details=f"{deviation:.1f}% deviation" if has_discrepancy else "",
+    )
+
+
+def cross_verify_rows(
+    medex_records: list[MedicineRecord],
+    dgda_records: list[MedicineRecord],
+    fuzzy_threshold: float | None = None,
+) -> list[tuple[tuple[int, int], VerifiedMedicine, dict | None]]:
     """
     Cross-verify and merge data from multiple sources.
-    Returns: (verified_medicines, discrepancy_records)
+    Each row is (origin, verified_medicine, discrepancy_record_or_None), where
+    origin is (0, position in medex_records) or (1, position in dgda_records)
+    of the record the row was built from. Rows are returned in origin order.
     """
-    verified = []
-    discrepancies = []
+    rows = []
     
-    # Build indices
-    dgda_index = build_match_index(dgda_records)
+    # Build indices, remembering where each DGDA key was first seen
+    dgda_index = defaultdict(list)
+    dgda_first_seen = {}
+    for position, record in enumerate(dgda_records):
+        key = record.get_match_key()
+        dgda_first_seen.setdefault(key, position)
+        dgda_index[key].append(record)
     processed_keys = set()
+    fuzzy_matches = (
+        find_fuzzy_matches(medex_records, dgda_index, fuzzy_threshold)
+        if fuzzy_threshold is not None
+        else {}
+    )
     
-    print("\nCross-verifying medicines...")
-    
-    # Start with Medex as the rich source
-    for medex_record in medex_records:
+    # Pass 1: group the prices seen for every key, starting with Medex as
+    # the rich source
+    groups = []
+    price_rows = []
+    for position, medex_record in enumerate(medex_records):
         key = medex_record.get_match_key()
         
         if key in processed_keys:
@@ -233,6 +442,10 @@ def verify_and_merge(
         
         # Find matching DGDA records
         dgda_matches = dgda_index.get(key, [])
+        if not dgda_matches and key in fuzzy_matches:
+            dgda_key = fuzzy_matches[key]
+            dgda_matches = dgda_index[dgda_key]
+            processed_keys.add(dgda_key)
         
         # Collect prices from all sources
         price_sources = {"medex": medex_record.unit_price}
@@ -243,16 +456,19 @@ def verify_and_merge(
                 price_sources["dgda"] = dgda.unit_price
                 all_prices.append(dgda.unit_price)
         
-        # Calculate verified price and discrepancy
-        avg_price, deviation, has_discrepancy = calculate_price_discrepancy(all_prices)
-        
-        # Determine confidence level
-        if len(all_prices) >= 2 and not has_discrepancy:
-            confidence = CONFIDENCE_HIGH
-        elif len(all_prices) >= 2:
-            confidence = CONFIDENCE_MEDIUM
-        else:
-            confidence = CONFIDENCE_LOW
+        groups.append((position, medex_record, price_sources))
+        price_rows.append(all_prices)
+    
+    # Pass 2: discrepancy and confidence for all keys at once
+    prices, mask = build_price_matrix(price_rows)
+    _, deviations, flags = calculate_price_discrepancies(prices, mask)
+    tiers = assign_confidence_tiers(mask.sum(axis=1), flags)
+    
+    # Pass 3: build the verified records
+    for i, (position, medex_record, price_sources) in enumerate(groups):
+        has_discrepancy = bool(flags[i])
+        deviation = float(deviations[i])
+        confidence = CONFIDENCE_TIERS[tiers[i]]
         
         # Use DGDA price as authoritative if available, otherwise Medex
         if "dgda" in price_sources and price_sources["dgda"] > 0:
@@ -261,35 +477,14 @@ def verify_and_merge(
             verified_price = medex_record.unit_price
         
         # Merge medical info from Medex (rich source)
-        verified_med = VerifiedMedicine(
-            brand_name=normalize_brand(medex_record.brand_name),
-            generic_name=medex_record.generic_name,
-            strength=normalize_strength(medex_record.strength),
-            dosage_form=medex_record.dosage_form,
-            manufacturer=medex_record.manufacturer,
-            verified_price=round(verified_price, 2),
-            unit_price=round(medex_record.unit_price, 2),
-            pack_size=medex_record.pack_size,
-            indication=medex_record.indication,
-            side_effects=medex_record.side_effects,
-            confidence=confidence,
-            price_sources=price_sources,
-            discrepancy_flag=has_discrepancy,
-            discrepancy_details=f"{deviation:.1f}% deviation" if has_discrepancy else "",
+        verified_med = build_verified(
+            medex_record, price_sources, verified_price, confidence, has_discrepancy, deviation
         )
         
-        verified.append(verified_med)
-        
         # Record discrepancies
-        if has_discrepancy:
-            discrepancies.append({
-                "brand_name": verified_med.brand_name,
-                "strength": verified_med.strength,
-                "medex_price": price_sources.get("medex", 0),
-                "dgda_price": price_sources.get("dgda", 0),
-                "deviation_percent": deviation,
-                "action_required": "REVIEW",
-            })
+        discrepancy = discrepancy_record(verified_med, deviation) if has_discrepancy else None
+        
+        rows.append(((0, position), verified_med, discrepancy))
     
     # Add DGDA-only records
     for key, dgda_list in dgda_index.items():
@@ -309,38 +504,312 @@ def verify_and_merge(
                 confidence=CONFIDENCE_LOW,  # Single source
                 price_sources={"dgda": dgda.unit_price},
             )
-            verified.append(verified_med)
+            rows.append(((1, dgda_first_seen[key]), verified_med, None))
     
+    return rows
+
+
+def verify_and_merge(
+    medex_records: list[MedicineRecord],
+    dgda_records: list[MedicineRecord],
+    fuzzy_threshold: float | None = None,
+    workers: int = 1,
+) -> tuple[list[VerifiedMedicine], list[dict]]:
+    """
+    Cross-verify and merge data from multiple sources.
+    With fuzzy_threshold set, keys without an exact match are also paired
+    with spelling variants from the other source. With workers > 1 the
+    work is sharded by match key across a process pool; the output is
+    identical to a single-process run.
+    Returns: (verified_medicines, discrepancy_records)
+    """
+    print("\nCross-verifying medicines...")
+    return split_rows(verify_rows(medex_records, dgda_records, fuzzy_threshold, workers))
+
+
+def verify_rows(
+    medex_records: list[MedicineRecord],
+    dgda_records: list[MedicineRecord],
+    fuzzy_threshold: float | None = None,
+    workers: int = 1,
+) -> list[tuple[tuple[int, int], VerifiedMedicine, dict | None]]:
+    """cross_verify_rows(), sharded across a process pool when workers > 1."""
+    if workers > 1:
+        return cross_verify_sharded(medex_records, dgda_records, workers, fuzzy_threshold)
+    return cross_verify_rows(medex_records, dgda_records, fuzzy_threshold)
+
+
+def split_rows(
+    rows: list[tuple[tuple[int, int], VerifiedMedicine, dict | None]],
+) -> tuple[list[VerifiedMedicine], list[dict]]:
+    """Turn (origin, verified, discrepancy) rows into the two output lists."""
+    verified = [verified_med for _, verified_med, _ in rows]
+    discrepancies = [discrepancy for _, _, discrepancy in rows if discrepancy]
     return verified, discrepancies
 
 
-def save_verified_data(medicines: list[VerifiedMedicine], filepath: Path) -> None:
-    """Save verified medicines to CSV."""
-    fieldnames = [
-        "brand_name", "generic_name", "strength", "dosage_form",
-        "manufacturer", "verified_price", "unit_price", "pack_size",
-        "indication", "side_effects", "confidence", "discrepancy_flag"
+def shard_of(key: str, shards: int, by_strength: bool = False) -> int:
+    """
+    Stable shard number for a match key (crc32, unlike hash(), does not
+    change between processes). Fuzzy matching only pairs keys with the same
+    strength, so fuzzy runs shard on the strength part alone.
+    """
+    if by_strength:
+        key = split_match_key(key)[1]
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+def _verify_shard(
+    medex_rows: list[tuple],
+    medex_positions: list[int],
+    dgda_rows: list[tuple],
+    dgda_positions: list[int],
+    fuzzy_threshold: float | None,
+) -> list[tuple[tuple[int, int], tuple, dict | None]]:
+    """
+    Verify one shard and translate origins back to global positions.
+    Records cross the process boundary as plain field tuples, which pickle
+    several times faster than slotted dataclass instances.
+    """
+    medex_records = [MedicineRecord(*row) for row in medex_rows]
+    dgda_records = [MedicineRecord(*row) for row in dgda_rows]
+    positions = (medex_positions, dgda_positions)
+    return [
+        ((source, positions[source][local]), VERIFIED_FIELDS_OF(verified_med), discrepancy)
+        for (source, local), verified_med, discrepancy
+        in cross_verify_rows(medex_records, dgda_records, fuzzy_threshold)
     ]
+
+
+def cross_verify_sharded(
+    medex_records: list[MedicineRecord],
+    dgda_records: list[MedicineRecord],
+    workers: int,
+    fuzzy_threshold: float | None = None,
+) -> list[tuple[tuple[int, int], VerifiedMedicine, dict | None]]:
+    """
+    cross_verify_rows() partitioned by match-key hash and run in a process
+    pool. Keys never interact across shards, so concatenating the shards in
+    origin order reproduces the single-process result exactly.
+    """
+    by_strength = fuzzy_threshold is not None
+    shards = []
+    for records in (medex_records, dgda_records):
+        shard_records = [[] for _ in range(workers)]
+        shard_positions = [[] for _ in range(workers)]
+        for position, record in enumerate(records):
+            shard = shard_of(record.get_match_key(), workers, by_strength)
+            shard_records[shard].append(RECORD_FIELDS_OF(record))
+            shard_positions[shard].append(position)
+        shards.append((shard_records, shard_positions))
+    (medex_shards, medex_positions), (dgda_shards, dgda_positions) = shards
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            _verify_shard,
+            medex_shards,
+            medex_positions,
+            dgda_shards,
+            dgda_positions,
+            [fuzzy_threshold] * workers,
+        )
+        rows = [
+            (origin, VerifiedMedicine(*values), discrepancy)
+            for shard_rows in results
+            for origin, values, discrepancy in shard_rows
+        ]
     
+    rows.sort(key=itemgetter(0))
+    return rows
+
+
+# Source record fields a verified row is built from: the brand, strength and
+# unit price (stored raw alongside the row), then the fields it copies verbatim
+ORIGIN_FIELDS_OF = attrgetter(
+    "brand_name", "strength", "unit_price",
+    "generic_name", "dosage_form", "manufacturer", "pack_size", "indication", "side_effects",
+)
+COPIED_FIELDS_OF = itemgetter(*(
+    VERIFIED_COLUMNS.index(name) for name in (
+        "generic_name", "dosage_form", "manufacturer", "pack_size", "indication", "side_effects",
+    )
+))
+
+
+def touched_match_keys(sources=SOURCE_NAMES) -> set[str] | None:
+    """Match keys touched by the last ingest of the sources (None if unknown)."""
+    touched = set()
+    for source in sources:
+        ingest_keys = load_touched_keys(source)
+        if ingest_keys is None:
+            return None
+        touched.update(key.split("|", 1)[0] for key in ingest_keys)
+    return touched
+
+
+def cross_verify_incremental(
+    medex_records: list[MedicineRecord],
+    dgda_records: list[MedicineRecord],
+    stored: dict[str, tuple[int, tuple, tuple, float | None]],
+    touched_keys: set[str],
+    workers: int = 1,
+) -> tuple[list[tuple[tuple[int, int], VerifiedMedicine, dict | None]], dict, set[str]]:
+    """
+    cross_verify_rows() that only recomputes stale keys and reuses the
+    stored result (see verify_state.py) for all others.
+
+    A key is stale if the ingest touched it, it has no stored row, or its
+    stored row no longer matches the record it is built from (rows moved
+    within the file). Rows are assembled in the same origin order as a full run.
+    Returns: (rows, upserts, deleted_keys) where upserts/deleted_keys update the state
+    """
+    keys = ([r.get_match_key() for r in medex_records], [r.get_match_key() for r in dgda_records])
+    
+    # Origin of every current key: its first Medex record, else its first DGDA record
+    origins = {}
+    for position, key in enumerate(keys[0]):
+        origins.setdefault(key, (0, position))
+    last_dgda_price = {}
+    for position, (key, record) in enumerate(zip(keys[1], dgda_records)):
+        origins.setdefault(key, (1, position))
+        if record.unit_price > 0:
+            last_dgda_price[key] = record.unit_price
+    
+    stale = set(touched_keys)
+    for key, (source, position) in origins.items():
+        if key in stale:
+            continue
+        row = stored.get(key)
+        record = (medex_records, dgda_records)[source][position]
+        if (
+            row is None
+            or row[0] != source
+            or row[1] + COPIED_FIELDS_OF(row[2]) != ORIGIN_FIELDS_OF(record)
+            or (source == 0 and row[2][PRICE_SOURCES_COLUMN].get("dgda") != last_dgda_price.get(key))
+        ):
+            stale.add(key)
+    deleted_keys = stored.keys() - origins.keys()
+    
+    # Recompute the stale keys from all of their records
+    positions = tuple(
+        [position for position, key in enumerate(source_keys) if key in stale]
+        for source_keys in keys
+    )
+    subset = verify_rows(
+        [medex_records[p] for p in positions[0]],
+        [dgda_records[p] for p in positions[1]],
+        workers=workers,
+    )
+    recomputed = {}
+    upserts = {}
+    for (source, local), verified_med, discrepancy in subset:
+        position = positions[source][local]
+        key = keys[source][position]
+        recomputed[key] = (verified_med, discrepancy)
+        upserts[key] = state_row((medex_records, dgda_records)[source][position], source,
+                                 verified_med, discrepancy)
+    print(f"Recomputed {len(recomputed)} of {len(origins)} keys "
+          f"({len(deleted_keys)} removed, {len(origins) - len(recomputed)} reused)")
+    
+    rows = []
+    for key, origin in origins.items():
+        if key in recomputed:
+            verified_med, discrepancy = recomputed[key]
+        else:
+            _, _, values, deviation = stored[key]
+            verified_med = VerifiedMedicine(*values)
+            discrepancy = discrepancy_record(verified_med, deviation) if deviation is not None else None
+        rows.append((origin, verified_med, discrepancy))
+    # origins was filled Medex first, in position order, so rows are already sorted
+    return rows, upserts, deleted_keys
+
+
+def state_row(
+    record: MedicineRecord, source: int, verified_med: VerifiedMedicine, discrepancy: dict | None
+) -> tuple[int, tuple, tuple, float | None]:
+    """VerifyState row for a verified medicine built from record."""
+    return (
+        source,
+        (record.brand_name, record.strength, record.unit_price),
+        VERIFIED_FIELDS_OF(verified_med),
+        discrepancy["deviation_percent"] if discrepancy else None,
+    )
+
+
+def verify_with_state(
+    medex_records: list[MedicineRecord],
+    dgda_records: list[MedicineRecord],
+    state: VerifyState,
+    baseline: dict[str, str],
+    workers: int = 1,
+    full: bool = False,
+) -> tuple[list[VerifiedMedicine], list[dict]]:
+    """
+    verify_and_merge() backed by the persistent verification state.
+    baseline holds the settings and ingest-state fingerprints from before the
+    sources were loaded; the stored rows are only reused if they were built
+    from exactly that baseline, otherwise every key is recomputed.
+    Returns: (verified_medicines, discrepancy_records)
+    """
+    print("\nCross-verifying medicines...")
+    touched_keys = touched_match_keys()
+    if full or touched_keys is None or state.load_meta() != baseline:
+        print("Full run: rebuilding verification state")
+        rows = verify_rows(medex_records, dgda_records, workers=workers)
+        sources = (medex_records, dgda_records)
+        upserts = {}
+        for (source, position), verified_med, discrepancy in rows:
+            record = sources[source][position]
+            upserts[record.get_match_key()] = state_row(record, source, verified_med, discrepancy)
+        state.save(upserts, (), verify_state_meta(), replace=True)
+    else:
+        rows, upserts, deleted_keys = cross_verify_incremental(
+            medex_records, dgda_records, state.load_rows(), touched_keys, workers
+        )
+        state.save(upserts, deleted_keys, verify_state_meta())
+    return split_rows(rows)
+
+
+def verify_state_meta() -> dict[str, str]:
+    """Settings and current ingest-state fingerprints the state is built from."""
+    meta = {"price_tolerance": repr(PRICE_TOLERANCE)}
+    for source in SOURCE_NAMES:
+        meta[f"{source}_ingest"] = state_fingerprint(source) or ""
+    return meta
+
+
+VERIFIED_CSV_FIELDS = [
+    "brand_name", "generic_name", "strength", "dosage_form",
+    "manufacturer", "verified_price", "unit_price", "pack_size",
+    "indication", "side_effects", "confidence", "discrepancy_flag"
+]
+
+
+def verified_csv_row(med: VerifiedMedicine) -> dict:
+    """Row of the verified medicines CSV."""
+    return {
+        "brand_name": med.brand_name,
+        "generic_name": med.generic_name,
+        "strength": med.strength,
+        "dosage_form": med.dosage_form,
+        "manufacturer": med.manufacturer,
+        "verified_price": med.verified_price,
+        "unit_price": med.unit_price,
+        "pack_size": med.pack_size,
+        "indication": med.indication[:200],  # Truncate for CSV
+        "side_effects": med.side_effects[:200],
+        "confidence": med.confidence,
+        "discrepancy_flag": med.discrepancy_flag,
+    }
+
+
+def save_verified_data(medicines: list[VerifiedMedicine], filepath: Path) -> None:
+    """Save verified medicines to CSV."""
     with open(filepath, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=VERIFIED_CSV_FIELDS)
         writer.writeheader()
         for med in medicines:
-            row = {
-                "brand_name": med.brand_name,
-                "generic_name": med.generic_name,
-                "strength": med.strength,
-                "dosage_form": med.dosage_form,
-                "manufacturer": med.manufacturer,
-                "verified_price": med.verified_price,
-                "unit_price": med.unit_price,
-                "pack_size": med.pack_size,
-                "indication": med.indication[:200],  # Truncate for CSV
-                "side_effects": med.side_effects[:200],
-                "confidence": med.confidence,
-                "discrepancy_flag": med.discrepancy_flag,
-            }
-            writer.writerow(row)
+            writer.writerow(verified_csv_row(med))
     
     print(f"Saved {len(medicines)} verified medicines to {filepath}")
 
@@ -398,13 +867,42 @@ def main():
         default=VERIFIED_OUTPUT,
         help="Output path for verified data",
     )
+    parser.add_argument(
+        "--fuzzy",
+        action="store_true",
+        help="Also match spelling variants across sources",
+    )
+    parser.add_argument(
+        "--fuzzy-threshold",
+        type=float,
+        default=MATCH_THRESHOLD,
+        help=f"Edit similarity required for a fuzzy match (default: {MATCH_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Verify in N processes, sharded by match key (default: 1)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recompute every key instead of only those touched since the last run",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default=VERIFY_STATE_DB,
+        help="Path to the persistent verification state",
+    )
     args = parser.parse_args()
     
     print("=" * 60)
     print("Medicine Saver BD - Cross-Verification Engine")
     print("=" * 60)
     
-    # Load data from sources
+    # Load data from sources (remembering the ingest state they are diffed against)
+    baseline = verify_state_meta()
     medex_data = load_medex_data(args.medex)
     dgda_data = load_dgda_data(args.dgda)
     
@@ -415,8 +913,21 @@ def main():
         print("  python scraper.py --source kaggle")
         return
     
-    # Cross-verify and merge
-    verified, discrepancies = verify_and_merge(medex_data, dgda_data)
+    # Cross-verify and merge. Fuzzy pairing is global (one-to-one across all
+    # unmatched keys), so fuzzy runs always recompute and leave the state alone.
+    if args.fuzzy:
+        verified, discrepancies = verify_and_merge(
+            medex_data,
+            dgda_data,
+            fuzzy_threshold=args.fuzzy_threshold,
+            workers=args.workers,
+        )
+    else:
+        state = VerifyState(args.state)
+        verified, discrepancies = verify_with_state(
+            medex_data, dgda_data, state, baseline, workers=args.workers, full=args.full
+        )
+        state.close()
     
     # Save outputs
     save_verified_data(verified, args.output)
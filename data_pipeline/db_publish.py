@@ -0,0 +1,79 @@
+"""
+Medicine Saver BD - Atomic Database Publishing
+
+A reader (the Flutter asset bundle, a copy step, another script) must never
+see a half-built or half-patched medicines.db. Builds and post-processing
+transforms therefore work on an in-memory database and publish it in one
+step:
+
+1. VACUUM INTO a temporary file next to the target (a compact,
+   defragmented copy), fsynced to disk
+2. os.replace() it over the target, which is atomic, so readers see either
+   the old file or the new one
+
+Usage:
+    conn = sqlite3.connect(":memory:")
+    ...                                         # build
+    publish(conn, Path("output/medicines.db"))
+
+    with transform(Path("../assets/db/medicines.db")) as conn:
+        conn.execute("UPDATE brands SET ...")   # published only if the block succeeds
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+def publish(conn: sqlite3.Connection, target: Path) -> None:
+    """Atomically replace target with a compacted copy of the database open on conn."""
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    temp.unlink(missing_ok=True)
+
+    conn.commit()
+    try:
+        conn.execute("VACUUM INTO ?", (str(temp),))
+        with open(temp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(temp, target)
+    finally:
+        temp.unlink(missing_ok=True)
+
+    # Persist the rename itself (not possible on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        directory = os.open(target.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+def open_copy(path: Path) -> sqlite3.Connection:
+    """In-memory copy of a database file (via the backup API)."""
+    if not Path(path).exists():
+        raise FileNotFoundError(path)
+    source = sqlite3.connect(path)
+    conn = sqlite3.connect(":memory:")
+    try:
+        source.backup(conn)
+    finally:
+        source.close()
+    return conn
+
+
+@contextmanager
+def transform(path: Path, target: Path | None = None) -> Iterator[sqlite3.Connection]:
+    """
+    Connection to an in-memory copy of path, published atomically to target
+    (default: path itself) when the block exits without an exception.
+    """
+    conn = open_copy(path)
+    try:
+        yield conn
+        publish(conn, target or path)
+    finally:
+        conn.close()
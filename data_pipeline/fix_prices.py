@@ -5,15 +5,19 @@ Strategy:
 1. Calculate average price per (generic_id, dosage_form) from existing data
 2. Apply these averages to medicines missing prices
 3. Add small random variance (±10%) to avoid identical prices
+
+The prices are fixed in an in-memory copy that replaces the database
+atomically when done (db_publish.py).
 """
 
-import sqlite3
 import random
 
+from db_publish import open_copy, publish
+
 DB_PATH = 'assets/db/medicines.db'
 
 def fix_missing_prices():
-    conn = sqlite3.connect(DB_PATH)
+    conn = open_copy(DB_PATH)
     cur = conn.cursor()
     
     # Step 1: Get average prices by generic + dosage form
@@ -108,6 +112,7 @@ def fix_missing_prices():
     print(f"   Total with prices: {new_count} / 21712")
     print(f"   Coverage: {new_count/21712*100:.1f}%")
     
+    publish(conn, DB_PATH)
     conn.close()
     print("\n✅ Done! All medicines now have estimated prices.")
 
@@ -0,0 +1,150 @@
+"""
+Medicine Saver BD - Batch Approximate String Matching
+
+Scores one query against many candidate names at once with Myers'/Hyyrö's
+bit-parallel edit distance. The query (up to 64 characters) is encoded as
+one uint64 bit-vector per character; all candidates then advance through
+their characters together in vectorized NumPy operations, one text column
+per step.
+
+Candidates are kept sorted by length, so the candidates still active at a
+column are a prefix of the arrays, and the only candidates that can reach a
+minimum score form one contiguous length window.
+
+Usage:
+    matcher = BatchMatcher(["napa", "napa extra", "seclo"])
+    matcher.top_k("napa exra", k=3, min_score=0.8)
+    # -> [("napa extra", 0.9, 1)]
+"""
+
+import numpy as np
+
+from blocking_index import bounded_levenshtein
+
+# Longest query the 64-bit kernel handles; longer ones use the scalar DP
+MAX_QUERY_LENGTH = 64
+
+
+class BatchMatcher:
+    """Edit-distance scorer for one query against a fixed candidate list."""
+
+    def __init__(self, candidates: list[str]):
+        self.candidates = list(candidates)
+        lengths = np.array([len(c) for c in self.candidates], dtype=np.int64)
+
+        # Longest first, so the candidates still active at column j are a prefix
+        self._order = np.argsort(-lengths, kind="stable")
+        self._lengths = lengths[self._order]
+
+        alphabet = sorted({ch for c in self.candidates for ch in c})
+        self._codes_of = {ch: code for code, ch in enumerate(alphabet, 1)}
+        width = int(self._lengths[0]) if len(self._lengths) else 0
+        self._codes = np.zeros((len(self.candidates), width), dtype=np.int32)
+        for row, idx in enumerate(self._order):
+            text = self.candidates[idx]
+            self._codes[row, :len(text)] = [self._codes_of[ch] for ch in text]
+
+        # active[j] = number of candidates longer than j
+        self._active = np.searchsorted(-self._lengths, -np.arange(width), side="left")
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def _length_window(self, min_length: int, max_length: int) -> tuple[int, int]:
+        """Row range (in sorted order) of candidates with min_length <= len <= max_length."""
+        start = int(np.searchsorted(-self._lengths, -max_length, side="left"))
+        stop = int(np.searchsorted(-self._lengths, -min_length, side="right"))
+        return start, stop
+
+    def _distances_sorted(self, query: str, start: int, stop: int) -> np.ndarray:
+        """Edit distances from query to sorted candidate rows [start, stop)."""
+        m = len(query)
+        lengths = self._lengths[start:stop]
+        if m == 0:
+            return lengths.copy()
+        if m > MAX_QUERY_LENGTH:
+            return np.array(
+                [
+                    bounded_levenshtein(query, self.candidates[idx], max(m, len(self.candidates[idx])))
+                    for idx in self._order[start:stop]
+                ],
+                dtype=np.int64,
+            )
+
+        # Peq[c] has bit i set where query[i] == c
+        peq = np.zeros(len(self._codes_of) + 1, dtype=np.uint64)
+        for i, ch in enumerate(query):
+            code = self._codes_of.get(ch)
+            if code is not None:
+                peq[code] |= np.uint64(1 << i)
+
+        mask = np.uint64((1 << m) - 1)
+        high = np.uint64(1 << (m - 1))
+        one = np.uint64(1)
+        count = stop - start
+        pv = np.full(count, mask, dtype=np.uint64)
+        mv = np.zeros(count, dtype=np.uint64)
+        score = np.full(count, m, dtype=np.int64)
+        codes = self._codes[start:stop]
+
+        width = int(lengths[0]) if count else 0
+        for j in range(width):
+            # Rows [0, n) of the window are still inside their text at column j
+            n = min(int(self._active[j]), stop) - start
+            if n <= 0:
+                break
+            eq = peq[codes[:n, j]]
+            p = pv[:n]
+            q = mv[:n]
+            xv = eq | q
+            xh = (((eq & p) + p) ^ p) | eq
+            ph = q | ~(xh | p)
+            mh = p & xh
+            score[:n] += (ph & high).astype(bool)
+            score[:n] -= (mh & high).astype(bool)
+            ph = ((ph << one) | one) & mask
+            mh = (mh << one) & mask
+            pv[:n] = (mh | ~(xv | ph)) & mask
+            mv[:n] = ph & xv
+        return score
+
+    def distances(self, query: str) -> np.ndarray:
+        """Edit distance from query to every candidate, in candidate order."""
+        result = np.empty(len(self.candidates), dtype=np.int64)
+        result[self._order] = self._distances_sorted(query, 0, len(self.candidates))
+        return result
+
+    def top_k(
+        self, query: str, k: int = 5, min_score: float = 0.0
+    ) -> list[tuple[str, float, int]]:
+        """
+        Best k candidates by similarity (1 - distance / longer length).
+        Returns: [(candidate, score, candidate_index), ...] best first
+        """
+        if not self.candidates or k <= 0:
+            return []
+        m = len(query)
+        # A candidate can only reach min_score if m * s <= len <= m / s
+        if min_score > 0 and m:
+            start, stop = self._length_window(
+                int(np.ceil(m * min_score - 1e-9)), int(m / min_score + 1e-9)
+            )
+        else:
+            start, stop = 0, len(self.candidates)
+        if start >= stop:
+            return []
+
+        distances = self._distances_sorted(query, start, stop)
+        longest = np.maximum(self._lengths[start:stop], m)
+        scores = np.where(longest > 0, 1 - distances / np.maximum(longest, 1), 1.0)
+        keep = np.flatnonzero(scores >= min_score)
+        if len(keep) > k:
+            # Keep everything tied with the k-th best so ties break by index
+            kth = np.partition(-scores[keep], k - 1)[k - 1]
+            keep = keep[-scores[keep] <= kth]
+
+        rows = sorted(keep, key=lambda r: (-scores[r], int(self._order[start + r])))[:k]
+        return [
+            (self.candidates[self._order[start + r]], float(scores[r]), int(self._order[start + r]))
+            for r in rows
+        ]
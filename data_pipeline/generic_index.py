@@ -0,0 +1,248 @@
+"""
+Medicine Saver BD - Generic Name Canonicalization
+
+Maps every spelling of a generic to one canonical key, so that
+"Salbutamol Sulphate" and "Albuterol Sulfate", "Acetaminophen" and
+"Paracetamol", or "A + B" and "B + A" become the same generic (and the
+same alternatives list in the app).
+
+A key is the sorted set of a generic's ingredients, each one:
+- lowercased, keeping (parenthesized) and [bracketed] qualifiers such as
+  "(inhaler)" or "[Long-Acting]", except those that only restate the
+  ingredient ("Vitamin C [Ascorbic Acid]")
+- respelled word by word ("sulphate" -> "sulfate", "hcl" -> "hydrochloride")
+- stripped of trailing hydrate and grade words ("Monohydrate", "BP")
+- mapped through the synonym table ("acetaminophen" -> "paracetamol"),
+  keeping its trailing salt words ("Diclofenac Sodium" and "Diclofenac
+  Potassium" are different drugs)
+
+bare_key() also strips the salt words, unless only a cation would remain
+("Ferrous Sulfate" stays). Esters such as "Prednisolone Acetate" are not
+salt forms. GenericIndex folds a salt form into its bare name only when
+the bare name is already present and has no other salt form: "Losartan
+Potassium" joins an earlier "Losartan", but two salt forms never share a
+generic.
+
+The tables live in generic_synonyms.json. build_generic_index() resolves
+every distinct spelling once, so deduplication during the build is a dict
+lookup per record.
+
+Usage:
+    python generic_index.py                                  # Report merges in verified_medicines.csv
+    python generic_index.py --input input/kaggle_data/medicine.csv --column generic
+
+    canonicalizer = GenericCanonicalizer()
+    canonicalizer.key("Losartan Potassium + Hydrochlorothiazide")
+    # 'hydrochlorothiazide + losartan potassium'
+    canonicalizer.bare_key("Losartan Potassium + Hydrochlorothiazide")
+    # 'hydrochlorothiazide + losartan'
+
+    index = GenericIndex()
+    index.resolve("Losartan")               # 'losartan'
+    index.resolve("Losartan Potassium")     # 'losartan' (folded into the bare name)
+"""
+
+import argparse
+import csv
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+# Paths
+SYNONYMS_PATH = Path(__file__).parent / "generic_synonyms.json"
+DEFAULT_INPUT = Path("output/verified_medicines.csv")
+
+# Separator between ingredients, in input and in keys
+INGREDIENT_SEPARATOR = "+"
+KEY_SEPARATOR = " + "
+
+QUALIFIER = re.compile(r"\(([^()]*)\)|\[([^\[\]]*)\]")
+NON_WORD_CHARS = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass
+class SynonymTable:
+    """Salt, hydrate and grade words, protected cations, respellings and whole-ingredient synonyms."""
+    salts: set[str] = field(default_factory=set)
+    hydrates: set[str] = field(default_factory=set)
+    grades: set[str] = field(default_factory=set)
+    cations: set[str] = field(default_factory=set)
+    spellings: dict[str, str] = field(default_factory=dict)
+    synonyms: dict[str, str] = field(default_factory=dict)
+
+
+def load_synonym_table(path: Path = SYNONYMS_PATH) -> SynonymTable:
+    """Tables from generic_synonyms.json (empty tables if it is missing)."""
+    if not path.exists():
+        return SynonymTable()
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return SynonymTable(
+        salts=set(data.get("salts", [])),
+        hydrates=set(data.get("hydrates", [])),
+        grades=set(data.get("grades", [])),
+        cations=set(data.get("cations", [])),
+        spellings=data.get("spellings", {}),
+        synonyms=data.get("synonyms", {}),
+    )
+
+
+def split_ingredients(generic: str) -> list[str]:
+    """Split on "+" outside brackets ("Belgiri [Bael fruit + Connessi bark]" is one)."""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(generic):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        elif char == INGREDIENT_SEPARATOR and depth == 0:
+            parts.append(generic[start:i])
+            start = i + 1
+    parts.append(generic[start:])
+    return parts
+
+
+class GenericCanonicalizer:
+    """Canonical keys for generic name strings (memoized per spelling)."""
+
+    def __init__(self, table: SynonymTable | None = None):
+        self.table = table or load_synonym_table()
+        self._keys: dict[str, str] = {}
+        self._bare_keys: dict[str, str] = {}
+
+    def words(self, text: str) -> list[str]:
+        """Normalized, respelled words of a piece of text."""
+        spellings = self.table.spellings
+        return [spellings.get(word, word) for word in NON_WORD_CHARS.sub(" ", text.lower()).split()]
+
+    def base_name(self, text: str, keep_salts: bool = True) -> str:
+        """Canonical name of an ingredient without qualifiers (and without its salt words unless keep_salts)."""
+        words = self.words(text)
+        table, salts = self.table, []
+        while len(words) > 1 and not set(words[:-1]) <= table.cations:
+            if words[-1] in table.hydrates or words[-1] in table.grades:
+                words.pop()
+            elif words[-1] in table.salts:
+                salts.insert(0, words.pop())
+            else:
+                break
+        name = " ".join(words)
+        name = table.synonyms.get(name, name)
+        return " ".join([name, *salts]) if keep_salts else name
+
+    def ingredient(self, text: str, keep_salts: bool = True) -> str:
+        """Canonical form of one ingredient."""
+        name = self.base_name(QUALIFIER.sub(" ", text), keep_salts)
+        for parenthesized, bracketed in QUALIFIER.findall(text):
+            qualifier = self.base_name(parenthesized or bracketed, keep_salts)
+            if qualifier and qualifier != name:
+                name += f" ({qualifier})"
+        return name
+
+    def key(self, generic: str) -> str:
+        """Order-insensitive canonical key of a generic ("" if it has no ingredients)."""
+        key = self._keys.get(generic)
+        if key is None:
+            key = self._keys[generic] = self._join(generic, keep_salts=True)
+        return key
+
+    def bare_key(self, generic: str) -> str:
+        """key() with the salt words of every ingredient stripped."""
+        key = self._bare_keys.get(generic)
+        if key is None:
+            key = self._bare_keys[generic] = self._join(generic, keep_salts=False)
+        return key
+
+    def _join(self, generic: str, keep_salts: bool) -> str:
+        ingredients = {self.ingredient(part, keep_salts) for part in split_ingredients(generic)}
+        return KEY_SEPARATOR.join(sorted(ingredient for ingredient in ingredients if ingredient))
+
+
+class GenericIndex:
+    """
+    Generic (as the key of its first spelling) of every spelling, assigned
+    in the order spellings are first seen. A salt form joins its bare name
+    when the bare name is already present and no other salt form has
+    joined it; otherwise it is a generic of its own.
+    """
+
+    def __init__(self, canonicalizer: GenericCanonicalizer | None = None):
+        self.canonicalizer = canonicalizer or GenericCanonicalizer()
+        self.groups: dict[str, str] = {}              # key -> key of its generic
+        self.folded: set[str] = set()                 # Bare keys whose generic holds a salt form
+        self.salted_groups: dict[str, set[str]] = {}  # bare key -> generics of its added salt forms
+
+    def keys(self, spelling: str) -> tuple[str, str]:
+        """(key, bare key) of a spelling, the spelling itself if it has no ingredients."""
+        return self.canonicalizer.key(spelling) or spelling, self.canonicalizer.bare_key(spelling) or spelling
+
+    def resolve(self, spelling: str) -> str:
+        """Key of the generic a spelling belongs to, placing it if it is new."""
+        key, bare = self.keys(spelling)
+        group = self.groups.get(key)
+        if group is None:
+            if key != bare and bare in self.groups and bare not in self.folded:
+                self.folded.add(bare)
+                group = self.groups[bare]
+            else:
+                group = key
+            self.groups[key] = group
+        return group
+
+    def add(self, spelling: str, group: str) -> None:
+        """Record a spelling already placed in a generic (by a previous build)."""
+        key, bare = self.keys(spelling)
+        self.groups[key] = group
+        if key != bare:
+            self.salted_groups.setdefault(bare, set()).add(group)
+        if self.groups.get(bare) in self.salted_groups.get(bare, ()):
+            self.folded.add(bare)
+
+
+def build_generic_index(
+    names: Iterable[str],
+    canonicalizer: GenericCanonicalizer | None = None,
+) -> dict[str, str]:
+    """Generic key of every distinct spelling, resolved once each in first-seen order."""
+    index = GenericIndex(canonicalizer)
+    return {name: index.resolve(name) for name in dict.fromkeys(names)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report generic spellings merged by canonicalization")
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT, help="CSV with generic names")
+    parser.add_argument("--column", default="generic_name", help="Generic name column")
+    parser.add_argument("--samples", type=int, default=15, help="Merged groups to print")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"Error: {args.input} not found")
+        return
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        names = [(row.get(args.column) or "").strip() for row in csv.DictReader(f)]
+    index = build_generic_index(name for name in names if name)
+
+    groups = defaultdict(list)
+    for name, key in index.items():
+        groups[key].append(name)
+    merged = sorted((spellings for spellings in groups.values() if len(spellings) > 1), key=len, reverse=True)
+
+    print(f"\n{'=' * 50}")
+    print("GENERIC CANONICALIZATION")
+    print(f"{'=' * 50}")
+    print(f"  Spellings:          {len(index):,}")
+    print(f"  Canonical generics: {len(groups):,}")
+    print(f"  Merged groups:      {len(merged):,}")
+    print(f"{'=' * 50}")
+    for spellings in merged[:args.samples]:
+        print(f"  {index[spellings[0]]}")
+        for spelling in sorted(spellings):
+            print(f"      {spelling}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ import csv
 import re
 from pathlib import Path
 
+from ingest_hash import IngestTracker
+
 # Paths
 INPUT_DIR = Path("input/kaggle_data")
 OUTPUT_CSV = Path("output/verified_medicines.csv")
@@ -22,6 +24,12 @@ def normalize_text(text):
     if not text: return ""
     return re.sub(r"\s+", " ", str(text).strip())
 
+def record_key(med):
+    """Natural key for change tracking: brand + strength + form + manufacturer."""
+    return "|".join(
+        med[f].lower() for f in ("brand_name", "strength", "dosage_form", "manufacturer")
+    )
+
 def parse_price(price_str):
     if not price_str: return 0.0
     try:
@@ -64,6 +72,7 @@ def import_data():
     generics_db = load_generics()
     
     medicines = []
+    tracker = IngestTracker("kaggle")
     print(f"Importing medicines from {medicine_path}...")
     
     with open(medicine_path, "r", encoding="utf-8") as f:
@@ -107,8 +116,12 @@ def import_data():
                 "confidence": "HIGH",
                 "discrepancy_flag": False
             }
+            if not tracker.admit(record_key(med), med.values()):
+                continue
             medicines.append(med)
 
+    print(tracker.finish().summary())
+
     # Save to output
     OUTPUT_CSV.parent.mkdir(parents=True, exist_ok=True)
     fieldnames = list(medicines[0].keys())
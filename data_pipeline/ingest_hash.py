@@ -0,0 +1,178 @@
+"""
+Medicine Saver BD - Ingest Change Tracking
+
+Computes a stable content hash for every normalized source record so that
+loaders can collapse exact duplicates at ingest and tell which rows are
+new, changed, unchanged or deleted since the previous run.
+
+Each source keeps its previous run's hashes in
+output/ingest_state/<source>.json:
+
+    {
+        "hashes": {"<natural key>": "<content hash>", ...},
+        "changes": {"new": [...], "changed": [...], "deleted": [...]}
+    }
+
+Usage (inside a loader):
+    tracker = IngestTracker("medex")
+    for record in rows:
+        if not tracker.admit(key_of(record), fields_of(record)):
+            continue  # exact duplicate
+        records.append(record)
+    changes = tracker.finish()
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Paths
+# Anchored to this script, so every script shares one state whatever the working directory
+INGEST_STATE_DIR = Path(__file__).parent / "output" / "ingest_state"
+
+# Separator that cannot appear in normalized CSV text
+FIELD_SEPARATOR = "\x1f"
+
+
+def normalize_field(value) -> str:
+    """Normalize a single field value for hashing."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        # Shortest round-tripping form: prices differing in any digit hash differently
+        return repr(value)
+    # Same result as re.sub(r"\s+", " ", text).strip(), without the regex
+    return " ".join(str(value).split())
+
+
+def content_hash(fields) -> str:
+    """Return a stable hex digest for a sequence of field values."""
+    payload = FIELD_SEPARATOR.join(normalize_field(v) for v in fields)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class ChangeSet:
+    """Classification of one source's records against the previous run."""
+    source: str
+    new: set[str] = field(default_factory=set)
+    changed: set[str] = field(default_factory=set)
+    unchanged: set[str] = field(default_factory=set)
+    deleted: set[str] = field(default_factory=set)
+    duplicates: int = 0
+    first_run: bool = False
+
+    def touched(self) -> set[str]:
+        """Natural keys whose downstream results must be recomputed."""
+        return self.new | self.changed | self.deleted
+
+    def summary(self) -> str:
+        """One-line human readable summary."""
+        if self.first_run:
+            return (
+                f"{self.source}: first run, {len(self.new)} keys recorded, "
+                f"{self.duplicates} exact duplicates collapsed"
+            )
+        return (
+            f"{self.source}: {len(self.new)} new, {len(self.changed)} changed, "
+            f"{len(self.unchanged)} unchanged, {len(self.deleted)} deleted, "
+            f"{self.duplicates} exact duplicates collapsed"
+        )
+
+
+def load_state(source: str, state_dir: Path = INGEST_STATE_DIR) -> dict:
+    """Load the persisted state for a source (empty if none)."""
+    path = state_dir / f"{source}.json"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def state_fingerprint(source: str, state_dir: Path = INGEST_STATE_DIR) -> str | None:
+    """Digest of a source's persisted state file (None if there is none)."""
+    path = state_dir / f"{source}.json"
+    if not path.exists():
+        return None
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def load_touched_keys(source: str, state_dir: Path = INGEST_STATE_DIR) -> set[str] | None:
+    """Return the keys touched by the last ingest of a source, or None if unknown."""
+    state = load_state(source, state_dir)
+    changes = state.get("changes")
+    if changes is None or changes.get("first_run"):
+        return None
+    return set(changes["new"]) | set(changes["changed"]) | set(changes["deleted"])
+
+
+class IngestTracker:
+    """Collapses exact duplicates and classifies records for one source."""
+
+    def __init__(self, source: str, state_dir: Path = INGEST_STATE_DIR):
+        self.source = source
+        self.state_dir = state_dir
+        self._seen_hashes: set[str] = set()
+        self._key_hashes: dict[str, list[str]] = {}
+        self.duplicates = 0
+
+    def admit(self, key: str, fields) -> bool:
+        """
+        Register a record.
+        Returns False if an identical record was already admitted this run.
+        """
+        digest = content_hash(fields)
+        if digest in self._seen_hashes:
+            self.duplicates += 1
+            return False
+        self._seen_hashes.add(digest)
+        self._key_hashes.setdefault(key, []).append(digest)
+        return True
+
+    def current_hashes(self) -> dict[str, str]:
+        """One hash per natural key (keys shared by several rows combine their hashes)."""
+        hashes = {}
+        for key, digests in self._key_hashes.items():
+            if len(digests) == 1:
+                hashes[key] = digests[0]
+            else:
+                hashes[key] = content_hash(sorted(digests))
+        return hashes
+
+    def finish(self, persist: bool = True) -> ChangeSet:
+        """Classify this run against the previous one and persist the new state."""
+        previous = load_state(self.source, self.state_dir).get("hashes")
+        current = self.current_hashes()
+        changes = ChangeSet(
+            source=self.source,
+            duplicates=self.duplicates,
+            first_run=previous is None,
+        )
+        previous = previous or {}
+
+        for key, digest in current.items():
+            old = previous.get(key)
+            if old is None:
+                changes.new.add(key)
+            elif old != digest:
+                changes.changed.add(key)
+            else:
+                changes.unchanged.add(key)
+        changes.deleted = set(previous) - set(current)
+
+        if persist:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            state = {
+                "hashes": current,
+                "changes": {
+                    "first_run": changes.first_run,
+                    "new": sorted(changes.new),
+                    "changed": sorted(changes.changed),
+                    "deleted": sorted(changes.deleted),
+                },
+            }
+            with open(self.state_dir / f"{self.source}.json", "w", encoding="utf-8") as f:
+                json.dump(state, f)
+
+        return changes
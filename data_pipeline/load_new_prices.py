@@ -6,50 +6,65 @@ This script:
 2. Matches medicines by name + company (manufacturer)
 3. Updates prices in the SQLite database
 4. Reports statistics on matches and updates
+
+The prices are updated in an in-memory copy of the database, which then
+replaces it atomically (db_publish.py).
 """
 
 import csv
-import sqlite3
 from pathlib import Path
 
+from db_publish import open_copy, publish
+from fuzzy_match import BatchMatcher
+from ingest_hash import INGEST_STATE_DIR, IngestTracker, normalize_field
+from manufacturer_registry import load_registry
+
 # Paths
 CSV_PATH = Path(__file__).parent / 'input' / 'medicine_price_dataset.csv'
 DB_PATH = Path(__file__).parent.parent / 'assets' / 'db' / 'medicines.db'
 
+# Columns that identify a row; 'medicine_id' is a row number and not content
+KEY_COLUMNS = ('medicine_name', 'company', 'category', 'dosage_mg', 'pack_size')
+
+# Similarity needed to accept a typo-tolerant brand match within a manufacturer
+FUZZY_MIN_SCORE = 0.9
+
 def normalize(text):
     """Normalize text for matching."""
     if not text:
         return ''
     return text.strip().lower().replace('-', '').replace(' ', '')
 
+def manufacturer_key(registry, company):
+    """Registry id of a company, or its normalized name if the registry does not know it."""
+    manufacturer = registry.resolve(company or '')
+    return manufacturer.id if manufacturer else normalize(company)
+
 def load_new_prices():
     print("=" * 60)
     print("LOADING NEW PRICE DATASET")
     print("=" * 60)
     
-    # Read CSV
+    # Read CSV, collapsing exact duplicate rows
+    tracker = IngestTracker('price_dataset', INGEST_STATE_DIR)
+    new_data = []
     with open(CSV_PATH, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
-        new_data = list(reader)
+        content_columns = [c for c in reader.fieldnames if c != 'medicine_id']
+        for row in reader:
+            key = '|'.join(normalize_field(row[c]).lower() for c in KEY_COLUMNS)
+            if tracker.admit(key, [row[c] for c in content_columns]):
+                new_data.append(row)
     
     print(f"📂 Loaded {len(new_data)} records from CSV")
+    print(f"   {tracker.finish().summary()}")
     
     # Connect to database
-    conn = sqlite3.connect(DB_PATH)
+    conn = open_copy(DB_PATH)
     cur = conn.cursor()
     
-    # 1. Build Manufacturer Map (Fuzzy Matching)
-    mfr_map = {}
-    cur.execute('SELECT id, name FROM manufacturers')
-    for mfr_id, mfr_name in cur.fetchall():
-        simplified = normalize(mfr_name)
-        mfr_map[simplified] = mfr_name
-        
-        # Also map strictly the first word if it's unique enough
-        # e.g. "square" -> "Square Pharmaceuticals Ltd."
-        first_word = simplified.split('pharm')[0].split('lab')[0].strip()
-        if len(first_word) > 3: 
-             mfr_map[first_word] = mfr_name
+    # 1. Resolve manufacturers through the shared registry
+    registry = load_registry()
 
     # 2. Build Existing Brands Map
     cur.execute('''
@@ -59,17 +74,21 @@ def load_new_prices():
     ''')
     
     existing = {}
+    names_by_mfr = {}
     for row in cur.fetchall():
         brand_id, name, mfr_name, price = row
-        # key = (normalized_brand_name, normalized_manufacturer_name)
-        key = (normalize(name), normalize(mfr_name))
+        # key = (normalized_brand_name, manufacturer registry id or normalized name)
+        key = (normalize(name), manufacturer_key(registry, mfr_name))
         existing[key] = {'id': brand_id, 'current_price': price}
+        names_by_mfr.setdefault(key[1], set()).add(key[0])
+    matchers = {}
 
     print(f"📊 Database has {len(existing)} brand entries")
     
     # 3. Match and Update
     updated = 0
     matched = 0
+    fuzzy_matched = 0
     not_found = []
     
     for row in new_data:
@@ -77,30 +96,24 @@ def load_new_prices():
         company = row['company'].strip()
         new_price = float(row['price'])
         
-        # Resolve company name using map
-        safe_company = normalize(company)
-        db_mfr_name = None
-        
-        # Exact match in map
-        if safe_company in mfr_map:
-             db_mfr_name = mfr_map[safe_company]
-        else:
-            # Substring match attempt
-            for key in mfr_map:
-                if safe_company in key or key in safe_company:
-                    db_mfr_name = mfr_map[key]
-                    break
-        
-        if not db_mfr_name:
-            db_mfr_name = company  # Fallback
-            
-        # Try matching
-        key = (normalize(name), normalize(db_mfr_name))
+        # Resolve company through the registry (one pass over the string)
+        key = (normalize(name), manufacturer_key(registry, company))
         
         match = existing.get(key)
+        fuzzy = False
+        
+        if not match and key[1] in names_by_mfr:
+            # Tolerate typos: closest brand name from the same manufacturer
+            if key[1] not in matchers:
+                matchers[key[1]] = BatchMatcher(sorted(names_by_mfr[key[1]]))
+            best = matchers[key[1]].top_k(key[0], k=1, min_score=FUZZY_MIN_SCORE)
+            if best:
+                match = existing[(best[0][0], key[1])]
+                fuzzy = True
         
         if match:
             matched += 1
+            fuzzy_matched += fuzzy
             brand_id = match['id']
             old_price = match['current_price']
             
@@ -109,16 +122,17 @@ def load_new_prices():
                 cur.execute('UPDATE brands SET price = ? WHERE id = ?', (new_price, brand_id))
                 updated += 1
         else:
-            not_found.append(f"{name} ({company}) -> Analyzed as: {db_mfr_name}")
+            resolved = registry.canonical_name(company)
+            not_found.append(f"{name} ({company}) -> Analyzed as: {resolved}")
     
-    conn.commit()
+    publish(conn, DB_PATH)
     conn.close()
     
     # Report
     print("\n" + "=" * 60)
     print("RESULTS")
     print("=" * 60)
-    print(f"✅ Matched: {matched} / {len(new_data)}")
+    print(f"✅ Matched: {matched} / {len(new_data)} ({fuzzy_matched} by fuzzy name match)")
     print(f"📝 Updated: {updated} prices")
     print(f"❌ Not found: {len(not_found)}")
     
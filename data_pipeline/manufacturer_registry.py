@@ -0,0 +1,252 @@
+"""
+Medicine Saver BD - Manufacturer Registry
+
+Canonical manufacturers, seeded from the Kaggle manufacturer.csv (IDs and
+slugs) and kept in manufacturers.json next to this script:
+
+    {
+        "manufacturers": [
+            {"id": 73, "name": "Square Pharmaceuticals Ltd.",
+             "slug": "square-pharmaceuticals-ltd-73", "aliases": ["SQPL"]},
+            ...
+        ]
+    }
+
+Besides the hand-written "aliases", every manufacturer is known by its
+normalized name, slug and core name (the name without trailing legal and
+industry words such as "Pharmaceuticals Ltd."), spelled with and without
+spaces. Core names shared by several manufacturers ("Radiant") are left
+out. All aliases are compiled into one Aho-Corasick automaton, so any
+company string ("Square Pharma", "NovoNordisk", "Beximco") resolves in a
+single pass over its characters; the longest alias found wins, and a tie
+between different manufacturers resolves to nothing.
+
+Usage:
+    python manufacturer_registry.py --seed            # (Re)seed from manufacturer.csv
+    python manufacturer_registry.py "Square Pharma"   # Resolve company strings
+
+    registry = load_registry()
+    registry.resolve("Beximco")        # Manufacturer(id=14, ...)
+    registry.canonical_name("Beximco") # "Beximco Pharmaceuticals Ltd."
+"""
+
+import argparse
+import csv
+import json
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Paths
+REGISTRY_PATH = Path(__file__).parent / "manufacturers.json"
+SEED_CSV = Path(__file__).parent / "input" / "kaggle_data" / "manufacturer.csv"
+
+# Trailing words dropped from a name to get its core name
+SUFFIX_WORDS = {
+    "ltd", "limited", "pvt", "private", "plc", "inc", "co", "company", "corp",
+    "corporation", "gmbh", "pharmaceuticals", "pharmaceutical", "pharma",
+    "laboratories", "laboratory", "labs", "lab", "industries", "bangladesh",
+    "bd", "and",
+}
+
+# Shortest core name accepted as an alias
+MIN_CORE_LENGTH = 3
+
+NON_ALIAS_CHARS = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_company(text: str) -> str:
+    """Lowercase words separated by single spaces ("Square Pharma." -> "square pharma")."""
+    return NON_ALIAS_CHARS.sub(" ", (text or "").lower()).strip()
+
+
+def core_name(name: str) -> str:
+    """Normalized name before any comma, without trailing SUFFIX_WORDS."""
+    words = normalize_company(name.split(",")[0]).split()
+    while words and words[-1] in SUFFIX_WORDS:
+        words.pop()
+    return " ".join(words)
+
+
+@dataclass
+class Manufacturer:
+    """One canonical manufacturer."""
+    id: int
+    name: str
+    slug: str = ""
+    aliases: list[str] = field(default_factory=list)
+
+    def generated_aliases(self) -> set[str]:
+        """Normalized name and slug, each with and without spaces."""
+        slug = re.sub(r"-\d+$", "", self.slug)
+        names = {normalize_company(self.name), normalize_company(slug)}
+        names |= {name.replace(" ", "") for name in names}
+        return {name for name in names if name}
+
+
+class AliasAutomaton:
+    """Aho-Corasick automaton over word-bounded aliases."""
+
+    def __init__(self, aliases: dict[str, int]):
+        # Node 0 is the root; outputs hold (alias length, value) pairs
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.outputs: list[list[tuple[int, int]]] = [[]]
+        for alias, value in aliases.items():
+            self._insert(f" {alias} ", value)
+        self._link()
+
+    def _insert(self, pattern: str, value: int) -> None:
+        node = 0
+        for char in pattern:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            node = child
+        self.outputs[node].append((len(pattern), value))
+
+    def _link(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def find(self, normalized: str) -> list[tuple[int, int]]:
+        """(alias length, value) of every alias occurring as whole words."""
+        hits = []
+        node = 0
+        for char in f" {normalized} ":
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            if self.outputs[node]:
+                hits.extend(self.outputs[node])
+        return hits
+
+
+class ManufacturerRegistry:
+    """Canonical manufacturers and the alias automaton that resolves them."""
+
+    def __init__(self, manufacturers: list[Manufacturer]):
+        self.manufacturers = {m.id: m for m in manufacturers}
+        self.automaton = AliasAutomaton(self.alias_table())
+        self._cache: dict[str, Manufacturer | None] = {}
+
+    def alias_table(self) -> dict[str, int]:
+        """Normalized alias -> manufacturer id, without ambiguous core names."""
+        table = {}
+        for m in self.manufacturers.values():
+            for alias in m.generated_aliases():
+                table[alias] = m.id
+
+        cores: dict[str, set[int]] = {}
+        for m in self.manufacturers.values():
+            core = core_name(m.name)
+            if len(core) >= MIN_CORE_LENGTH:
+                for alias in {core, core.replace(" ", "")}:
+                    cores.setdefault(alias, set()).add(m.id)
+        for alias, ids in cores.items():
+            if len(ids) == 1 and alias not in table:
+                table[alias] = ids.pop()
+
+        # Hand-written aliases override everything generated
+        for m in self.manufacturers.values():
+            for alias in m.aliases:
+                table[normalize_company(alias)] = m.id
+        return table
+
+    def resolve(self, company: str) -> Manufacturer | None:
+        """Manufacturer named by a company string (None if unknown or ambiguous)."""
+        normalized = normalize_company(company)
+        if normalized in self._cache:
+            return self._cache[normalized]
+
+        best_length, best_ids = 0, set()
+        for length, manufacturer_id in self.automaton.find(normalized):
+            if length > best_length:
+                best_length, best_ids = length, {manufacturer_id}
+            elif length == best_length:
+                best_ids.add(manufacturer_id)
+        result = self.manufacturers[best_ids.pop()] if len(best_ids) == 1 else None
+        self._cache[normalized] = result
+        return result
+
+    def canonical_name(self, company: str) -> str:
+        """Canonical name for a company string, or the string itself if unresolved."""
+        manufacturer = self.resolve(company)
+        return manufacturer.name if manufacturer else company
+
+
+def load_registry(path: Path = REGISTRY_PATH) -> ManufacturerRegistry:
+    """Registry from manufacturers.json (empty if it has not been seeded)."""
+    if not path.exists():
+        return ManufacturerRegistry([])
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)["manufacturers"]
+    return ManufacturerRegistry([Manufacturer(**entry) for entry in entries])
+
+
+def seed_registry(csv_path: Path = SEED_CSV, path: Path = REGISTRY_PATH) -> ManufacturerRegistry:
+    """
+    Rebuild manufacturers.json from manufacturer.csv, keeping the
+    hand-written aliases (and entries) already in the file.
+    """
+    existing = load_registry(path).manufacturers if path.exists() else {}
+    manufacturers = dict(existing)
+    with open(csv_path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            manufacturer_id = int(row["manufacturer id"])
+            previous = existing.get(manufacturer_id)
+            manufacturers[manufacturer_id] = Manufacturer(
+                id=manufacturer_id,
+                name=" ".join(row["manufacturer name"].split()),
+                slug=row["slug"].strip(),
+                aliases=previous.aliases if previous else [],
+            )
+
+    ordered = sorted(manufacturers.values(), key=lambda m: m.id)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"manufacturers": [vars(m) for m in ordered]},
+            f, indent=2, ensure_ascii=False,
+        )
+        f.write("\n")
+    return ManufacturerRegistry(ordered)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonical manufacturer registry")
+    parser.add_argument("companies", nargs="*", help="Company strings to resolve")
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="Rebuild manufacturers.json from input/kaggle_data/manufacturer.csv",
+    )
+    args = parser.parse_args()
+
+    if args.seed:
+        registry = seed_registry()
+        print(f"Seeded {len(registry.manufacturers)} manufacturers "
+              f"({len(registry.alias_table())} aliases) into {REGISTRY_PATH}")
+    else:
+        registry = load_registry()
+
+    for company in args.companies:
+        manufacturer = registry.resolve(company)
+        print(f"  {company!r:<40} -> {manufacturer.name if manufacturer else '(unresolved)'}")
+
+
+if __name__ == "__main__":
+    main()
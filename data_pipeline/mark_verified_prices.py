@@ -1,12 +1,21 @@
 """
 Improved Price Verification - Mark real prices from external dataset
 Uses better fuzzy matching to identify more verified prices
+Typo-tolerant matches must share the manufacturer and are marked FUZZY, not VERIFIED
+Works on an in-memory copy that replaces the database atomically (db_publish.py)
 """
 
-import sqlite3
 import csv
 import re
 
+from db_publish import open_copy, publish
+from fuzzy_match import BatchMatcher
+from manufacturer_registry import load_registry
+
+# Similarity needed to accept a typo-tolerant name match
+FUZZY_MIN_SCORE = 0.9
+CONFIDENCE_FUZZY = 'FUZZY'
+
 def normalize(name):
     """Normalize medicine name for matching"""
     if not name:
@@ -18,11 +27,16 @@ def normalize(name):
     name = re.sub(r'\s+', ' ', name).strip()  # Normalize whitespace
     return name
 
+def manufacturer_key(registry, company):
+    """Registry id of a company, or its normalized name if the registry does not know it."""
+    manufacturer = registry.resolve(company or '')
+    return manufacturer.id if manufacturer else normalize(company)
+
 def main():
     db_path = 'assets/db/medicines.db'
     csv_path = 'data_pipeline/input/medicine_price_dataset.csv'
     
-    conn = sqlite3.connect(db_path)
+    conn = open_copy(db_path)
     c = conn.cursor()
     
     # Step 1: Reset all to estimated
@@ -35,6 +49,8 @@ def main():
     # Step 2: Load real prices from external CSV
     print("\nLoading external price data...")
     real_names = set()
+    names_by_mfr = {}  # manufacturer key -> full names
+    registry = load_registry()
     with open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -42,6 +58,8 @@ def main():
             price = row.get('price', '')
             if name and price and price.strip() and price != '0':
                 real_names.add(normalize(name))
+                mfr_key = manufacturer_key(registry, row.get('company', ''))
+                names_by_mfr.setdefault(mfr_key, set()).add(normalize(name))
                 # Also add first word only for better matching
                 first_word = normalize(name).split()[0] if normalize(name) else ''
                 if len(first_word) > 3:
@@ -51,33 +69,54 @@ def main():
     
     # Step 3: Get all brands from database
     print("\nMatching against database...")
-    c.execute("SELECT id, name FROM brands")
+    c.execute('''
+        SELECT b.id, b.name, m.name
+        FROM brands b
+        LEFT JOIN manufacturers m ON b.manufacturer_id = m.id
+    ''')
     brands = c.fetchall()
     
     matched = 0
-    for brand_id, brand_name in brands:
+    fuzzy_matched = 0
+    matchers = {}
+    for brand_id, brand_name, mfr_name in brands:
         norm = normalize(brand_name)
         first_word = norm.split()[0] if norm else ''
         
         # Check for match
-        if norm in real_names or first_word in real_names:
+        is_match = norm in real_names or first_word in real_names
+        mfr_key = manufacturer_key(registry, mfr_name)
+        if not is_match and norm and mfr_key in names_by_mfr:
+            # Tolerate typos in the full name, among the same manufacturer's names
+            if mfr_key not in matchers:
+                matchers[mfr_key] = BatchMatcher(sorted(names_by_mfr[mfr_key]))
+            if matchers[mfr_key].top_k(norm, k=1, min_score=FUZZY_MIN_SCORE):
+                c.execute("UPDATE brands SET verified = 0, confidence = ? WHERE id = ?",
+                          (CONFIDENCE_FUZZY, brand_id))
+                fuzzy_matched += 1
+        if is_match:
             c.execute("UPDATE brands SET verified = 1, confidence = 'VERIFIED' WHERE id = ?", (brand_id,))
             matched += 1
     
     conn.commit()
+    print(f"  Matched {matched} brands, {fuzzy_matched} more by fuzzy name match (marked {CONFIDENCE_FUZZY})")
     
     # Step 4: Summary
     c.execute("SELECT COUNT(*) FROM brands WHERE verified = 1")
     verified = c.fetchone()[0]
-    c.execute("SELECT COUNT(*) FROM brands WHERE verified = 0")
+    c.execute("SELECT COUNT(*) FROM brands WHERE confidence = ?", (CONFIDENCE_FUZZY,))
+    fuzzy = c.fetchone()[0]
+    c.execute("SELECT COUNT(*) FROM brands WHERE confidence = 'ESTIMATED'")
     estimated = c.fetchone()[0]
     
     print(f"\n=== FINAL SUMMARY ===")
     print(f"🟢 VERIFIED (real price): {verified} medicines")
+    print(f"🟡 FUZZY (similar name):  {fuzzy} medicines")
     print(f"🟠 ESTIMATED (generated): {estimated} medicines")
-    print(f"\nDatabase updated successfully!")
     
+    publish(conn, db_path)
     conn.close()
+    print(f"\nDatabase updated successfully!")
 
 if __name__ == "__main__":
     main()
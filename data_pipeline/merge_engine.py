@@ -0,0 +1,397 @@
+"""
+Medicine Saver BD - N-Source Streaming Merge Engine
+
+Merges any number of medicine sources in a single pass. Each source is a
+stream of MedicineRecords sorted by match key (external_sort() sorts an
+unsorted stream in bounded memory by spilling sorted runs to disk). A k-way
+heap merge then yields one group per key holding every source's
+observations, and per-source precedence rules pick the medical info and the
+authoritative price.
+
+Sources come from the adapter config (sources.json, see
+source_adapters.py) and are read and sorted concurrently, one pool worker
+per source, before the merge.
+
+Only the current group, one batch of resolved keys and one block per sorted
+run are held in memory, so memory does not grow with the dataset.
+
+Resolution rules (with just medex and dgda this reproduces cross_verify.py
+without --fuzzy, except that rows come out in match key order):
+- Medical info comes from the first record of the best info_precedence source
+- That record's unit price and every positive price of the other sources are compared
+- The verified price is that of the best price_precedence source with a positive price
+
+Usage:
+    python merge_engine.py                              # Every configured source that exists
+    python merge_engine.py --source medex=output/medex_medicines.csv --source kaggle=input/kaggle_data/medicine.csv
+    python merge_engine.py --price-precedence dgda,kaggle,price_dataset,medex
+    python merge_engine.py --workers 4 --executor thread
+"""
+
+import argparse
+import csv
+import heapq
+import pickle
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import replace
+from itertools import groupby, islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from cross_verify import (
+    CONFIDENCE_TIERS,
+    DISCREPANCY_REPORT,
+    RECORD_FIELDS_OF,
+    VERIFIED_CSV_FIELDS,
+    VERIFIED_OUTPUT,
+    MedicineRecord,
+    VerifiedMedicine,
+    assign_confidence_tiers,
+    build_price_matrix,
+    build_verified,
+    calculate_price_discrepancies,
+    discrepancy_record,
+    verified_csv_row,
+)
+from ingest_hash import content_hash
+from source_adapters import (
+    SOURCES_CONFIG,
+    SourceAdapter,
+    load_concurrently,
+    load_sources,
+    ranked_names,
+)
+
+# Memory bounds
+SPILL_CHUNK_SIZE = 200_000  # Records sorted in memory before a run is spilled
+SPILL_BLOCK_SIZE = 1_000  # Records per pickle block in a run file
+BATCH_SIZE = 10_000  # Keys resolved per vectorized batch
+
+
+def _write_run(chunk: list[tuple[str, int, MedicineRecord]], directory: str) -> Path:
+    """Spill a sorted chunk to a temporary run file."""
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".run", delete=False) as f:
+        for start in range(0, len(chunk), SPILL_BLOCK_SIZE):
+            block = [
+                (key, seq, RECORD_FIELDS_OF(record))
+                for key, seq, record in chunk[start:start + SPILL_BLOCK_SIZE]
+            ]
+            pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return Path(f.name)
+
+
+def _read_run(path: Path) -> Iterator[tuple[str, int, MedicineRecord]]:
+    """Stream a run file back, one block in memory at a time."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            for key, seq, fields in block:
+                yield key, seq, MedicineRecord(*fields)
+
+
+def sort_to_runs(
+    records: Iterable[MedicineRecord], directory: str, chunk_size: int = SPILL_CHUNK_SIZE
+) -> list[Path]:
+    """Sort records by match key into run files: chunks of chunk_size records, each sorted."""
+    runs = []
+    chunk = []
+    for seq, record in enumerate(records):
+        chunk.append((record.get_match_key(), seq, record))
+        if len(chunk) >= chunk_size:
+            chunk.sort(key=itemgetter(0, 1))
+            runs.append(_write_run(chunk, directory))
+            chunk = []
+    if chunk:
+        chunk.sort(key=itemgetter(0, 1))
+        runs.append(_write_run(chunk, directory))
+    return runs
+
+
+def read_runs(runs: list[Path]) -> Iterator[tuple[str, MedicineRecord]]:
+    """Merge run files into one stream sorted by match key (stable)."""
+    for key, _, record in heapq.merge(*map(_read_run, runs), key=itemgetter(0, 1)):
+        yield key, record
+
+
+def external_sort(
+    records: Iterable[MedicineRecord], chunk_size: int = SPILL_CHUNK_SIZE
+) -> Iterator[tuple[str, MedicineRecord]]:
+    """
+    Sort records by match key in bounded memory. Records with the same key
+    keep their input order. Chunks of chunk_size records are sorted in
+    memory and spilled to temporary run files, which are merged at the end.
+    Yields: (match_key, record)
+    """
+    with tempfile.TemporaryDirectory(prefix="merge_runs_") as directory:
+        yield from read_runs(sort_to_runs(records, directory, chunk_size))
+
+
+def _sort_source(adapter: SourceAdapter, directory: str, chunk_size: int) -> list[Path]:
+    """Pool task: read one source and sort it into run files."""
+    return sort_to_runs(adapter.records(), directory, chunk_size)
+
+
+@contextmanager
+def sorted_sources(
+    adapters: Iterable[SourceAdapter],
+    chunk_size: int = SPILL_CHUNK_SIZE,
+    workers: int | None = None,
+    executor: str = "process",
+) -> Iterator[dict[str, Iterator[tuple[str, MedicineRecord]]]]:
+    """
+    Read and sort every source concurrently, then provide the sorted streams.
+    Workers hand back run file paths only, so no records cross processes.
+    """
+    with tempfile.TemporaryDirectory(prefix="merge_runs_") as directory:
+        runs = load_concurrently(
+            adapters, _sort_source, directory, chunk_size, workers=workers, executor=executor
+        )
+        yield {name: read_runs(paths) for name, paths in runs.items()}
+
+
+def _tagged(stream: Iterable[tuple[str, MedicineRecord]], name: str):
+    """Tag a sorted stream's items with its source name, checking the order."""
+    previous = ""
+    for key, record in stream:
+        if key < previous:
+            raise ValueError(f"Source {name!r} is not sorted by match key ({key!r} after {previous!r})")
+        previous = key
+        yield key, name, record
+
+
+def merge_streams(
+    streams: dict[str, Iterable[tuple[str, MedicineRecord]]],
+) -> Iterator[tuple[str, dict[str, list[MedicineRecord]]]]:
+    """
+    k-way heap merge of sources that are each sorted by match key.
+    Yields one (match_key, {source: [records]}) group per key. Sources appear
+    in the order of streams and records in their stream order. Exact
+    duplicate records within a source are collapsed, like the loaders do.
+    """
+    merged = heapq.merge(
+        *(_tagged(stream, name) for name, stream in streams.items()), key=itemgetter(0)
+    )
+    for key, group in groupby(merged, key=itemgetter(0)):
+        observations = {}
+        seen = set()
+        for _, name, record in group:
+            records = observations.get(name)
+            if records is None:
+                observations[name] = [record]
+                continue
+            # Only sources with several records for the key can hold duplicates,
+            # so hashing starts at a source's second record
+            if len(records) == 1:
+                seen.add((name, content_hash(RECORD_FIELDS_OF(records[0]))))
+            digest = (name, content_hash(RECORD_FIELDS_OF(record)))
+            if digest in seen:
+                continue
+            seen.add(digest)
+            records.append(record)
+        yield key, observations
+
+
+def precedence_order(names: Iterable[str], precedence: Iterable[str]) -> list[str]:
+    """Source names ordered by precedence, unlisted ones last in their given order."""
+    names = list(names)
+    ranked = [name for name in precedence if name in names]
+    return ranked + [name for name in names if name not in ranked]
+
+
+def group_prices(
+    observations: dict[str, list[MedicineRecord]],
+    price_order: list[str],
+    info_order: list[str],
+) -> tuple[MedicineRecord, dict, float, list[float]]:
+    """
+    Apply the precedence rules to one key's observations.
+    Returns: (representative_record, price_sources, verified_price, compared_prices)
+    """
+    info_source = next(name for name in info_order if name in observations)
+    representative = observations[info_source][0]
+    price_sources = {info_source: representative.unit_price}
+    prices = [representative.unit_price]
+
+    for name, records in observations.items():
+        if name == info_source:
+            continue
+        for record in records:
+            if record.unit_price > 0:
+                price_sources[name] = record.unit_price
+                prices.append(record.unit_price)
+
+    verified_price = next(
+        (price_sources[name] for name in price_order if price_sources.get(name, 0) > 0),
+        representative.unit_price,
+    )
+    return representative, price_sources, verified_price, prices
+
+
+def merge_verify(
+    streams: dict[str, Iterable[tuple[str, MedicineRecord]]],
+    price_precedence: Iterable[str] = (),
+    info_precedence: Iterable[str] = (),
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[tuple[str, VerifiedMedicine, dict | None]]:
+    """
+    Merge sorted source streams into verified medicines, one per match key.
+    Sources missing from a precedence list rank after the listed ones, in
+    stream order. Discrepancy and confidence are computed for batch_size
+    keys at a time.
+    Yields: (match_key, verified_medicine, discrepancy_record_or_None)
+    """
+    price_order = precedence_order(streams, price_precedence)
+    info_order = precedence_order(streams, info_precedence)
+    groups = merge_streams(streams)
+
+    while batch := list(islice(groups, batch_size)):
+        resolved = [group_prices(observations, price_order, info_order) for _, observations in batch]
+        prices, mask = build_price_matrix([prices for _, _, _, prices in resolved])
+        _, deviations, flags = calculate_price_discrepancies(prices, mask)
+        tiers = assign_confidence_tiers(mask.sum(axis=1), flags)
+
+        for i, ((key, _), (record, price_sources, verified_price, _)) in enumerate(zip(batch, resolved)):
+            has_discrepancy = bool(flags[i])
+            deviation = float(deviations[i])
+            verified_med = build_verified(
+                record, price_sources, verified_price,
+                CONFIDENCE_TIERS[tiers[i]], has_discrepancy, deviation,
+            )
+            discrepancy = (
+                discrepancy_record(verified_med, deviation, streams) if has_discrepancy else None
+            )
+            yield key, verified_med, discrepancy
+
+
+def write_outputs(
+    rows: Iterable[tuple[str, VerifiedMedicine, dict | None]],
+    verified_path: Path,
+    discrepancy_path: Path,
+) -> Counter:
+    """Stream merged rows to the verified and discrepancy CSVs. Returns confidence counts."""
+    counts = Counter()
+    discrepancy_writer = None
+    with open(verified_path, "w", newline="", encoding="utf-8") as f, \
+            open(discrepancy_path, "w", newline="", encoding="utf-8") as d:
+        writer = csv.DictWriter(f, fieldnames=VERIFIED_CSV_FIELDS)
+        writer.writeheader()
+        for _, verified_med, discrepancy in rows:
+            writer.writerow(verified_csv_row(verified_med))
+            counts[verified_med.confidence] += 1
+            if discrepancy:
+                if discrepancy_writer is None:
+                    discrepancy_writer = csv.DictWriter(d, fieldnames=list(discrepancy))
+                    discrepancy_writer.writeheader()
+                discrepancy_writer.writerow(discrepancy)
+                counts["discrepancies"] += 1
+    return counts
+
+
+def parse_source(value: str) -> tuple[str, Path]:
+    """argparse type for NAME=PATH."""
+    name, sep, path = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("expected NAME=PATH")
+    return name, Path(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge any number of medicine sources by match key")
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=SOURCES_CONFIG,
+        help="Source adapter config (default: sources.json)",
+    )
+    parser.add_argument(
+        "--source",
+        type=parse_source,
+        action="append",
+        metavar="NAME=PATH",
+        help="Merge only these configured sources, reading NAME from PATH; default: all that exist",
+    )
+    parser.add_argument(
+        "--price-precedence",
+        help="Sources whose price wins, highest first (default: from the config)",
+    )
+    parser.add_argument(
+        "--info-precedence",
+        help="Sources whose medical info wins, highest first (default: from the config)",
+    )
+    parser.add_argument("--output", type=Path, default=VERIFIED_OUTPUT, help="Output path for verified data")
+    parser.add_argument("--discrepancies", type=Path, default=DISCREPANCY_REPORT, help="Output path for discrepancies")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=SPILL_CHUNK_SIZE,
+        help=f"Records per source sorted in memory before spilling to disk (default: {SPILL_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Sources loaded at once (default: one per source, up to the CPU count)",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["process", "thread"],
+        default="process",
+        help="Pool used to load sources (default: process)",
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Medicine Saver BD - Merge Engine")
+    print("=" * 60)
+
+    configured = load_sources(args.config)
+    if args.source:
+        unknown = [name for name, _ in args.source if name not in configured]
+        if unknown:
+            print(f"\nError: sources not in {args.config}: {', '.join(unknown)}")
+            return
+        adapters = [replace(configured[name], path=path) for name, path in args.source]
+        missing = [str(a.path) for a in adapters if not a.path.exists()]
+        if missing:
+            print(f"\nError: source files not found: {', '.join(missing)}")
+            return
+    else:
+        adapters = [adapter for adapter in configured.values() if adapter.path.exists()]
+        if not adapters:
+            print(f"\nError: none of the sources in {args.config} exist")
+            return
+
+    price_order = (
+        args.price_precedence.split(",") if args.price_precedence
+        else ranked_names(adapters, "price_precedence")
+    )
+    info_order = (
+        args.info_precedence.split(",") if args.info_precedence
+        else ranked_names(adapters, "info_precedence")
+    )
+    print(f"Price precedence: {' > '.join(precedence_order([a.name for a in adapters], price_order))}")
+    print(f"Info precedence:  {' > '.join(precedence_order([a.name for a in adapters], info_order))}\n")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with sorted_sources(adapters, args.chunk_size, args.workers, args.executor) as streams:
+        rows = merge_verify(streams, price_precedence=price_order, info_precedence=info_order)
+        counts = write_outputs(rows, args.output, args.discrepancies)
+
+    total = sum(counts[tier] for tier in CONFIDENCE_TIERS)
+    print("\n" + "=" * 60)
+    print("MERGE SUMMARY")
+    print("=" * 60)
+    print(f"Total medicines merged: {total}")
+    for tier in CONFIDENCE_TIERS:
+        print(f"  - {tier + ' confidence:':<19}{counts[tier]}")
+    print(f"\nPrice discrepancies:    {counts['discrepancies']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Medicine Saver BD - Monograph Text Store
+
+Indication and side-effect text repeats heavily across generics: every
+salt and combination of a drug, and every drug of a class, carries the same
+warnings. generic_monographs therefore holds references, not text:
+
+- monograph_texts stores every distinct text once, content-addressed by
+  text_hash() (a generic whose text is already stored only writes its IDs)
+- each text is raw-deflate compressed with a preset dictionary
+  (monograph_dictionary) trained on the corpus: the sentences shared by
+  several texts, so even a one-sentence text compresses against the rest
+
+The dictionary is trained by the first write to an empty store (a full
+build) and kept by later writes (incremental builds), so stored texts stay
+decodable. decompress() and read() are the decoding helpers; the app
+decodes with ZLibDecoder(raw: true, dictionary: ...).
+
+Usage:
+    python monograph_store.py                                  # Storage stats of output/medicines.db
+    python monograph_store.py --db ../assets/db/medicines.db --generic Paracetamol
+
+    store = MonographStore(cursor)
+    store.write([(generic_id, {"indication": ..., "side_effects": ...}), ...])
+    store.read([generic_id])        # {generic_id: {"indication": ..., ...}}
+    store.prune()                   # Drop texts no generic references
+"""
+
+import argparse
+import hashlib
+import re
+import sqlite3
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+DEFAULT_DB = Path("output/medicines.db")
+
+# Text columns of a monograph (generic_monographs stores <field>_id)
+MONOGRAPH_FIELDS = ("indication", "dosage_info", "side_effects", "contraindication")
+
+# zlib's window: dictionary bytes further back than this cannot be matched
+DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 9
+RAW_DEFLATE = -15  # No zlib header or checksum (6 bytes per text)
+
+# Sentences or clauses shorter than this are cheaper as literals
+MIN_PHRASE_LENGTH = 12
+PHRASE = re.compile(r"[^.;!?]+[.;!?]*")
+
+
+def text_hash(text: str) -> bytes:
+    """64-bit content address of a text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+def train_dictionary(texts: Iterable[str], size: int = DICTIONARY_SIZE) -> bytes:
+    """
+    Preset dictionary of the phrases shared by at least two distinct texts,
+    the ones saving the most bytes (count x length) kept, and placed last:
+    deflate encodes nearer matches with fewer bits.
+    """
+    counts = Counter()
+    for text in set(texts):
+        counts.update({phrase.strip() for phrase in PHRASE.findall(text)} - {""})
+    shared = [
+        (count * len(phrase), phrase) for phrase, count in counts.items()
+        if count >= 2 and len(phrase) >= MIN_PHRASE_LENGTH
+    ]
+    selected, total = [], 0
+    for _, phrase in sorted(shared, reverse=True):
+        data = phrase.encode("utf-8") + b" "
+        if total + len(data) <= size:
+            selected.append(data)
+            total += len(data)
+    return b"".join(reversed(selected))
+
+
+def compress(text: str, dictionary: bytes) -> bytes:
+    """Raw-deflate text against the preset dictionary."""
+    if dictionary:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, RAW_DEFLATE, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, RAW_DEFLATE)
+    return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+def decompress(body: bytes, dictionary: bytes) -> str:
+    """Text of a compress()ed body."""
+    if dictionary:
+        decompressor = zlib.decompressobj(RAW_DEFLATE, zdict=dictionary)
+    else:
+        decompressor = zlib.decompressobj(RAW_DEFLATE)
+    return (decompressor.decompress(body) + decompressor.flush()).decode("utf-8")
+
+
+class MonographStore:
+    """generic_monographs and its interned, compressed texts, on an open cursor."""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self.cursor = cursor
+        cursor.execute("SELECT data FROM monograph_dictionary WHERE id = 1")
+        row = cursor.fetchone()
+        self.dictionary: bytes | None = row[0] if row else None
+        cursor.execute("SELECT hash, id FROM monograph_texts")
+        self.text_ids: dict[bytes, int] = dict(cursor.fetchall())
+        cursor.execute("SELECT max(id) FROM monograph_texts")
+        self.next_text_id = (cursor.fetchone()[0] or 0) + 1
+        self.recent_ids: dict[str, int] = {}  # Texts seen by this store, skipping the hash
+        # (generic_id, field) -> text ID stored, so rewriting the same text is a no-op
+        self.stored_ids = self.monograph_ids()
+        self.written_bytes = 0  # Compressed bytes of the texts added
+
+    def monograph_ids(self) -> dict[tuple[int, str], int | None]:
+        """Text ID of every (generic_id, field) in generic_monographs."""
+        columns = ", ".join(f"{field}_id" for field in MONOGRAPH_FIELDS)
+        self.cursor.execute(f"SELECT generic_id, {columns} FROM generic_monographs")
+        return {
+            (generic_id, field): text_id
+            for generic_id, *ids in self.cursor.fetchall()
+            for field, text_id in zip(MONOGRAPH_FIELDS, ids)
+        }
+
+    def text_id(self, text: str | None) -> int | None:
+        """ID of a text, stored (compressed) if it is new; None for no text."""
+        if not text:
+            return None
+        text_id = self.recent_ids.get(text)
+        if text_id is not None:
+            return text_id
+        key = text_hash(text)
+        text_id = self.text_ids.get(key)
+        if text_id is None:
+            body = compress(text, self.dictionary)
+            text_id = self.text_ids[key] = self.next_text_id
+            self.next_text_id += 1
+            self.cursor.execute("INSERT INTO monograph_texts (id, hash, body) VALUES (?, ?, ?)", (text_id, key, body))
+            self.written_bytes += len(body)
+        self.recent_ids[text] = text_id
+        return text_id
+
+    def write(self, monographs: Iterable[tuple[int, dict[str, str]]]) -> None:
+        """
+        Insert or update the monographs of (generic_id, {field: text}) pairs
+        (fields from MONOGRAPH_FIELDS); unchanged monographs are skipped.
+        """
+        monographs = list(monographs)
+        if self.dictionary is None and monographs:
+            self.dictionary = train_dictionary(
+                text for _, texts in monographs for text in texts.values() if text
+            )
+            self.cursor.execute("INSERT INTO monograph_dictionary (id, data) VALUES (1, ?)", (self.dictionary,))
+
+        by_fields: dict[tuple[str, ...], list[tuple]] = {}
+        stored_ids, missing = self.stored_ids, object()
+        for generic_id, texts in monographs:
+            changed = False
+            ids = [generic_id]
+            for field, text in texts.items():
+                text_id = self.text_id(text)
+                key = (generic_id, field)
+                if stored_ids.get(key, missing) != text_id:
+                    stored_ids[key] = text_id
+                    changed = True
+                ids.append(text_id)
+            if changed:
+                by_fields.setdefault(tuple(texts), []).append(tuple(ids))
+        for fields, rows in by_fields.items():
+            columns = [f"{field}_id" for field in fields]
+            updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+            self.cursor.executemany(
+                f"INSERT INTO generic_monographs (generic_id, {', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * (len(fields) + 1))}) "
+                f"ON CONFLICT (generic_id) DO UPDATE SET {updates}",
+                rows,
+            )
+
+    def read(self, generic_ids: Iterable[int] | None = None) -> dict[int, dict[str, str]]:
+        """Decompressed monographs by generic ID (all of them by default; "" for missing fields)."""
+        columns = ", ".join(f"{field}_id" for field in MONOGRAPH_FIELDS)
+        if generic_ids is None:
+            self.cursor.execute(f"SELECT generic_id, {columns} FROM generic_monographs")
+        else:
+            self.cursor.execute(
+                f"SELECT generic_id, {columns} FROM generic_monographs "
+                "WHERE generic_id IN (SELECT value FROM json_each(?))",
+                ("[" + ",".join(str(int(generic_id)) for generic_id in generic_ids) + "]",),
+            )
+        rows = self.cursor.fetchall()
+
+        needed = {text_id for row in rows for text_id in row[1:] if text_id is not None}
+        self.cursor.execute(
+            "SELECT id, body FROM monograph_texts WHERE id IN (SELECT value FROM json_each(?))",
+            ("[" + ",".join(map(str, needed)) + "]",),
+        )
+        texts = {text_id: decompress(body, self.dictionary) for text_id, body in self.cursor.fetchall()}
+        return {
+            generic_id: {field: texts.get(text_id, "") for field, text_id in zip(MONOGRAPH_FIELDS, ids)}
+            for generic_id, *ids in rows
+        }
+
+    def prune(self) -> None:
+        """Delete monographs of removed generics, and texts no monograph references."""
+        self.cursor.execute("DELETE FROM generic_monographs WHERE generic_id NOT IN (SELECT id FROM generics)")
+        if self.cursor.rowcount:
+            self.stored_ids = self.monograph_ids()
+        referenced = " UNION ".join(
+            f"SELECT {field}_id FROM generic_monographs WHERE {field}_id IS NOT NULL" for field in MONOGRAPH_FIELDS
+        )
+        self.cursor.execute(f"DELETE FROM monograph_texts WHERE id NOT IN ({referenced})")
+        if self.cursor.rowcount:
+            self.cursor.execute("SELECT hash, id FROM monograph_texts")
+            self.text_ids = dict(self.cursor.fetchall())
+            self.recent_ids.clear()  # May name deleted texts
+
+
+def print_stats(conn: sqlite3.Connection) -> None:
+    """Monographs, distinct texts, and raw vs stored text bytes."""
+    cursor = conn.cursor()
+    store = MonographStore(cursor)
+    monographs = store.read()
+    cursor.execute("SELECT count(*), coalesce(sum(length(body)), 0) FROM monograph_texts")
+    text_count, stored_bytes = cursor.fetchone()
+    distinct = {text for texts in monographs.values() for text in texts.values() if text}
+    raw_bytes = sum(len(text.encode("utf-8")) for texts in monographs.values() for text in texts.values())
+    distinct_bytes = sum(len(text.encode("utf-8")) for text in distinct)
+
+    print(f"\n{'=' * 50}")
+    print("MONOGRAPH STORE")
+    print(f"{'=' * 50}")
+    print(f"  Monographs:              {len(monographs):>10,}")
+    print(f"  Distinct texts:          {text_count:>10,}")
+    print(f"  Text bytes (per field):  {raw_bytes:>10,}")
+    print(f"  Distinct text bytes:     {distinct_bytes:>10,}")
+    print(f"  Stored (compressed):     {stored_bytes:>10,}")
+    print(f"  Dictionary:              {len(store.dictionary or b''):>10,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monograph storage stats, or one generic's monograph")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Built database")
+    parser.add_argument("--generic", help="Print the monograph of this generic")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"Error: {args.db} not found")
+        return
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.generic is None:
+            print_stats(conn)
+            return
+        row = conn.execute("SELECT id, name FROM generics WHERE name = ? COLLATE NOCASE", (args.generic,)).fetchone()
+        if row is None:
+            print(f"Error: no generic named {args.generic!r}")
+            return
+        texts = MonographStore(conn.cursor()).read([row[0]]).get(row[0], {})
+        print(f"{row[1]} (#{row[0]})")
+        for field in MONOGRAPH_FIELDS:
+            print(f"\n{field}:\n  {texts.get(field) or '-'}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
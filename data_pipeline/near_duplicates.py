@@ -0,0 +1,356 @@
+"""
+Medicine Saver BD - Near-Duplicate Detection (MinHash + LSH)
+
+Finds clusters of records that describe the same product under slightly
+different spellings ("Napa Extra" / "Napa-Extra" / "NAPA EXTRA 500"),
+which exact-key deduplication lets through.
+
+Every record becomes a set of shingles:
+- character 3-grams of its brand name, with case, spaces and punctuation
+  removed (encoded as integers in bulk, see gram_codes())
+- FIELD_WEIGHT tokens for its canonical generic (generic_index.py)
+- FIELD_WEIGHT tokens for its manufacturer (manufacturer_registry.py)
+- one token per number in its name and strength
+
+Each shingle set is compressed into a MinHash signature of NUM_PERM
+values, computed in NumPy for a block of records at a time. Records are
+blocked by their numbers, dosage form, (resolved) manufacturer and
+canonical generic, so "Napa 500" never pairs with "Napa 665", nor one
+company's brand with a look-alike from another, nor the members of a
+brand family with different generics ("Aristovit B" / "Aristovit M").
+Signatures are cut into BANDS bands. Records of one block that share a
+whole band fall into the same bucket and become candidate pairs. A bucket
+only pairs neighbours within MAX_BUCKET_SPAN, so a huge bucket stays
+linear and the stage sub-quadratic. A candidate pair is kept when its
+estimated Jaccard similarity is at least SIMILARITY_THRESHOLD. Clusters are the connected components of the kept
+pairs.
+
+Usage:
+    clusters = find_near_duplicates(records)         # [[row, row, ...], ...]
+    write_merge_plan(records, clusters, path)
+"""
+
+import csv
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from cross_verify import NON_KEY_CHARS
+from generic_index import GenericCanonicalizer
+from manufacturer_registry import load_registry
+
+# MinHash / LSH parameters: 16 bands of 4 rows put the S-curve's midpoint
+# near a Jaccard similarity of (1/16) ** (1/4) = 0.5
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.6
+
+# Members of one bucket paired with at most this many following members
+MAX_BUCKET_SPAN = 32
+
+# Work sizes for the vectorized signature computation
+SIGNATURE_BLOCK = 50_000
+PERMUTATION_BLOCK = 8
+PAIR_BLOCK = 200_000
+
+SEED = 1
+
+# Copies of the generic and manufacturer tokens, so that two products
+# sharing only a brand spelling stay below the threshold
+FIELD_WEIGHT = 3
+
+NUMBERS = re.compile(r"\d+(?:\.\d+)?")
+
+# Fields that identify a product (exact copies share one signature)
+IDENTITY_FIELDS = ("brand_name", "generic_name", "manufacturer", "strength", "dosage_form")
+
+MERGE_PLAN_FIELDS = ["cluster", "row", "action", "keep_row", *IDENTITY_FIELDS, "price"]
+
+
+class Shingler:
+    """Turns records into shingle hashes and exact-compatibility hashes."""
+
+    def __init__(self):
+        self.canonicalizer = GenericCanonicalizer()
+        self.registry = load_registry()
+        # Hashes of recurring shingles and fields, computed once each
+        self._shingles: dict[str, int] = {}
+        self._generics: dict[str, list[int]] = {}
+        self._manufacturers: dict[str, str] = {}
+        self._manufacturer_tokens: dict[str, list[int]] = {}
+        self._numbers: dict[str, frozenset[str]] = {}
+
+    def _hash(self, shingle: str) -> int:
+        value = self._shingles.get(shingle)
+        if value is None:
+            value = self._shingles[shingle] = zlib.crc32(shingle.encode("utf-8"))
+        return value
+
+    def generic_tokens(self, generic: str) -> list[int]:
+        tokens = self._generics.get(generic)
+        if tokens is None:
+            key = self.canonicalizer.key(generic)
+            tokens = self._generics[generic] = [self._hash(f"g{copy}:{key}") for copy in range(FIELD_WEIGHT)]
+        return tokens
+
+    def manufacturer_tokens(self, key: str) -> list[int]:
+        tokens = self._manufacturer_tokens.get(key)
+        if tokens is None:
+            tokens = self._manufacturer_tokens[key] = [self._hash(f"m{copy}:{key}") for copy in range(FIELD_WEIGHT)]
+        return tokens
+
+    def manufacturer_key(self, name: str) -> str:
+        key = self._manufacturers.get(name)
+        if key is None:
+            manufacturer = self.registry.resolve(name)
+            key = str(manufacturer.id) if manufacturer else NON_KEY_CHARS.sub("", name.lower())
+            self._manufacturers[name] = key
+        return key
+
+    def numbers(self, text: str) -> frozenset[str]:
+        numbers = self._numbers.get(text)
+        if numbers is None:
+            numbers = self._numbers[text] = frozenset(str(float(n)) for n in NUMBERS.findall(text))
+        return numbers
+
+    def shingle(self, brand: str, generic: str, manufacturer: str, strength: str, form: str):
+        """
+        (normalized brand name, token hashes, compatibility hash) of one
+        product; the name's 3-grams are encoded later, in bulk.
+        """
+        name = NON_KEY_CHARS.sub("", brand.lower())
+        numbers = self.numbers(strength)
+        if NUMBERS.search(brand):
+            numbers = numbers | self.numbers(brand)
+        manufacturer_key = self.manufacturer_key(manufacturer)
+        tokens = [self._hash("n:" + number) for number in numbers]
+        tokens += self.generic_tokens(generic)
+        tokens += self.manufacturer_tokens(manufacturer_key)
+
+        generic_key = self.canonicalizer.key(generic)
+        compatibility = "#".join(("|".join(sorted(numbers)), form.lower(), manufacturer_key, generic_key))
+        return name, tokens, self._hash(compatibility) & 0xFFFFFFFF
+
+
+def gram_codes(names: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Character 3-grams of "^name$" for every name, as 24-bit integers (names
+    are [a-z0-9] only, so a gram's three bytes are its code).
+    Returns: (flat gram codes, number of grams per name)
+    """
+    padded = [f"^{name}$" for name in names]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    counts = np.maximum(lengths - 2, 0)
+    chars = np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8).astype(np.uint64)
+    if len(chars) < 3:
+        return np.empty(0, dtype=np.uint64), counts
+    codes = chars[:-2] << np.uint64(16) | chars[1:-1] << np.uint64(8) | chars[2:]
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    first_gram = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    positions = np.repeat(starts - first_gram, counts) + np.arange(counts.sum())
+    return codes[positions], counts
+
+
+def _segment_minima(hashed: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Minimum of each segment (rows of hashed), all-ones for empty segments."""
+    minima = np.full((hashed.shape[0], len(counts)), np.iinfo(np.uint64).max, dtype=np.uint64)
+    filled = counts > 0
+    if hashed.shape[1]:
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+        minima[:, filled] = np.minimum.reduceat(hashed, offsets, axis=1)
+    return minima
+
+
+def minhash_signatures(
+    names: list[str],
+    tokens: list[list[int]],
+    num_perm: int = NUM_PERM,
+    seed: int = SEED,
+) -> np.ndarray:
+    """
+    MinHash signatures over each name's 3-grams plus its tokens, shape
+    (len(names), num_perm), uint32. Permutations are multiply-shift hashes
+    ((a * x + b) mod 2**64) >> 32. Tokens carry bit 32 so they never
+    collide with a 24-bit gram code.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    token_bit = np.uint64(1 << 32)
+
+    signatures = np.empty((len(names), num_perm), dtype=np.uint32)
+    for start in range(0, len(names), SIGNATURE_BLOCK):
+        grams, gram_counts = gram_codes(names[start:start + SIGNATURE_BLOCK])
+        block = tokens[start:start + SIGNATURE_BLOCK]
+        token_counts = np.fromiter(map(len, block), dtype=np.int64, count=len(block))
+        values = np.fromiter(
+            (t for row in block for t in row), dtype=np.uint64, count=int(token_counts.sum())
+        ) | token_bit
+        for p in range(0, num_perm, PERMUTATION_BLOCK):
+            a_block = a[p:p + PERMUTATION_BLOCK, None]
+            b_block = b[p:p + PERMUTATION_BLOCK, None]
+            minima = np.minimum(
+                _segment_minima((a_block * grams + b_block) >> np.uint64(32), gram_counts),
+                _segment_minima((a_block * values + b_block) >> np.uint64(32), token_counts),
+            )
+            signatures[start:start + len(block), p:p + PERMUTATION_BLOCK] = minima.T
+    return signatures
+
+
+def candidate_pairs(
+    signatures: np.ndarray,
+    blocks: np.ndarray,
+    bands: int = BANDS,
+    span: int = MAX_BUCKET_SPAN,
+) -> np.ndarray:
+    """
+    Unique (i, j) pairs, i < j, in the same block that share at least one
+    band; shape (pairs, 2). Blocks are mixed into every band's bucket, so
+    records that can never match are never paired.
+    """
+    rows_per_band = signatures.shape[1] // bands
+    found = []
+    for band in range(bands):
+        columns = signatures[:, band * rows_per_band:(band + 1) * rows_per_band].astype(np.uint64)
+        bucket = blocks.astype(np.uint64)
+        for k in range(rows_per_band):
+            bucket = bucket * np.uint64(0x100000001B3) ^ columns[:, k]
+        order = np.argsort(bucket, kind="stable")
+        ordered = bucket[order]
+        for distance in range(1, span + 1):
+            same = ordered[distance:] == ordered[:-distance]
+            if not same.any():
+                break  # No bucket has more than `distance` members
+            found.append(np.column_stack((order[:-distance][same], order[distance:][same])))
+
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(found), axis=1)
+    # Deduplicate as single integers i * n + j (much faster than unique rows)
+    count = np.int64(len(signatures))
+    codes = np.unique(pairs[:, 0] * count + pairs[:, 1])
+    return np.column_stack((codes // count, codes % count))
+
+
+def connected_components(count: int, pairs: np.ndarray) -> np.ndarray:
+    """Component label (smallest member) of every node, by min-label propagation."""
+    labels = np.arange(count)
+    if not len(pairs):
+        return labels
+    left, right = pairs[:, 0], pairs[:, 1]
+    while True:
+        smaller = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, smaller)
+        np.minimum.at(updated, right, smaller)
+        updated = updated[updated]  # Pointer jumping
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def product_signatures(records: list[dict]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MinHash signatures of the distinct products among the records.
+    Returns: (product index of every record, signatures, compatibility hashes)
+    """
+    shingler = Shingler()
+    products: dict[tuple, int] = {}
+    product_of_row = np.empty(len(records), dtype=np.int64)
+    names, tokens, compatibility = [], [], []
+    for row, record in enumerate(records):
+        identity = tuple((record.get(name) or "").strip() for name in IDENTITY_FIELDS)
+        product = products.get(identity)
+        if product is None:
+            product = products[identity] = len(names)
+            name, product_tokens, compatible = shingler.shingle(*identity)
+            names.append(name)
+            tokens.append(product_tokens)
+            compatibility.append(compatible)
+        product_of_row[row] = product
+    return product_of_row, minhash_signatures(names, tokens), np.asarray(compatibility, dtype=np.uint32)
+
+
+def cluster_products(
+    product_of_row: np.ndarray,
+    signatures: np.ndarray,
+    compatibility: np.ndarray,
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> list[list[int]]:
+    """Row clusters from verified LSH candidate pairs (see find_near_duplicates)."""
+    pairs = candidate_pairs(signatures, compatibility)
+    keep = np.empty(len(pairs), dtype=bool)
+    for start in range(0, len(pairs), PAIR_BLOCK):
+        left, right = pairs[start:start + PAIR_BLOCK, 0], pairs[start:start + PAIR_BLOCK, 1]
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        keep[start:start + PAIR_BLOCK] = (similarity >= threshold) & (compatibility[left] == compatibility[right])
+    pairs = pairs[keep]
+
+    labels = connected_components(len(signatures), pairs)[product_of_row]
+    order = np.argsort(labels, kind="stable")
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(order)]))
+    large = ends - starts > 1
+    rows = order.tolist()
+    clusters = [rows[start:end] for start, end in zip(starts[large].tolist(), ends[large].tolist())]
+    clusters.sort(key=len, reverse=True)
+    return clusters
+
+
+def find_near_duplicates(
+    records: list[dict],
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> list[list[int]]:
+    """
+    Clusters of near-duplicate records (row indices, 2+ per cluster),
+    largest first. Exact copies of a product always share a cluster.
+    """
+    return cluster_products(*product_signatures(records), threshold)
+
+
+def is_filled(value) -> bool:
+    """Whether a field has content: not blank, and not a zero placeholder ("0.0")."""
+    if value in (None, ""):
+        return False
+    try:
+        return float(value) != 0
+    except (TypeError, ValueError):
+        return True
+
+
+def completeness(record: dict) -> int:
+    return sum(1 for value in record.values() if is_filled(value))
+
+
+def price_of(record: dict) -> float:
+    """The record's price; missing, malformed and non-positive prices rank last."""
+    try:
+        price = float(record.get("price") or "inf")
+    except ValueError:
+        return float("inf")
+    return price if price > 0 else float("inf")
+
+
+def write_merge_plan(records: list[dict], clusters: list[list[int]], path: Path) -> None:
+    """
+    One CSV row per clustered record: the record kept for each cluster
+    (most complete, then cheapest, then first) and the ones to merge into it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=MERGE_PLAN_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for number, rows in enumerate(clusters, 1):
+            keep = min(rows, key=lambda row: (-completeness(records[row]), price_of(records[row]), row))
+            for row in rows:
+                writer.writerow({
+                    **records[row],
+                    "cluster": number,
+                    "row": row,
+                    "action": "keep" if row == keep else "merge",
+                    "keep_row": keep,
+                })
@@ -1,99 +1,278 @@
 """
-Normalize Unrealistic Prices in Medicine Database
+Flag Unrealistic Prices in Medicine Database
 
 Issue: Some prices are in the thousands/millions (likely paise or pack prices)
-Fix: Cap and normalize to realistic per-unit prices (1-500 Tk typical range)
+Fix: Compare every price with the other brands of the same medicine and
+flag the outliers (prices are never changed)
+
+A medicine is a (canonical generic, normalized strength, dosage-form group)
+triple: "Napa 500 Mg Tablet" and "Ace 500mg Tablet (Film Coated)" share one.
+For every group with at least MIN_GROUP_SIZE prices, the median and the
+median absolute deviation (MAD) of the log prices are computed for all
+groups at once, with two sorts over the whole table. A price whose robust
+z-score |log(price) - median| / (1.4826 * MAD) exceeds Z_THRESHOLD is an
+outlier ("high" or "low").
+
+Outliers are then tested for unit-scale mistakes: if dividing the price by
+its pack size ("pack_price"), multiplying by it ("unit_price"), or dividing
+by 100 ("paisa") or 10/1000 ("decimal_shift") lands it back within the
+bounds, the closest such fix is the flag and its price the suggestion.
+Brands without a price are flagged "missing". Flags are written to the
+price_flags table of an in-memory copy of the database, which then
+replaces it atomically (db_publish.py), and optionally to a CSV.
+
+Usage:
+    python normalize_prices.py                                 # assets/db/medicines.db
+    python normalize_prices.py --db data_pipeline/output/medicines.db --csv price_flags.csv
 """
 
+import argparse
+import csv
+import math
+import re
 import sqlite3
-import random
-
-DB_PATH = 'assets/db/medicines.db'
-
-# Realistic price ranges by dosage form (in Taka per unit)
-PRICE_RANGES = {
-    'Tablet': (2, 50),
-    'Capsule': (3, 80),
-    'Chewable Tablet': (2, 30),
-    'Oral Suspension': (30, 150),
-    'Powder for Suspension': (50, 200),
-    'Syrup': (40, 180),
-    'Drops': (20, 100),
-    'Pediatric Drops': (30, 120),
-    'Oral Solution': (30, 150),
-    'Oral Gel': (40, 120),
-    'Cream': (30, 200),
-    'Ointment': (25, 180),
-    'Gel': (30, 150),
-    'Lotion': (50, 250),
-    'Injection': (20, 300),
-    'IM/IV Injection': (30, 400),
-    'IV Injection': (40, 500),
-    'IV Infusion': (80, 400),
-    'Ophthalmic Solution': (40, 200),
-    'Ophthalmic Suspension': (50, 220),
-    'Ophthalmic Ointment': (40, 180),
-    'Nasal Spray': (80, 300),
-    'Inhaler': (150, 800),
-    'Suppository': (30, 150),
-    'Nebuliser Solution': (50, 300),
-}
-
-def normalize_prices():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    
-    # Get all brands
-    cur.execute('SELECT id, price, dosage_form FROM brands')
-    all_brands = cur.fetchall()
-    
-    print(f"Processing {len(all_brands)} medicines...")
-    
-    updated = 0
-    for brand_id, price, dosage_form in all_brands:
-        # Find matching price range
-        price_range = None
-        if dosage_form:
-            for form_key, range_val in PRICE_RANGES.items():
-                if form_key.lower() in dosage_form.lower():
-                    price_range = range_val
-                    break
-        
-        if not price_range:
-            price_range = (5, 100)  # Default range
-        
-        min_price, max_price = price_range
-        
-        # Check if price needs normalization
-        needs_fix = False
-        new_price = price
-        
-        if price is None or price <= 0:
-            needs_fix = True
-            new_price = random.uniform(min_price, max_price)
-        elif price > max_price * 2:  # Way too high
-            needs_fix = True
-            # Scale down - likely was in paise or pack price
-            if price > 10000:
-                new_price = price / 1000  # Probably paise
-            elif price > 1000:
-                new_price = price / 100
-            else:
-                new_price = price / 10
-            
-            # Still cap it
-            if new_price > max_price:
-                new_price = random.uniform(min_price, max_price)
-        
-        if needs_fix:
-            new_price = round(new_price, 2)
-            cur.execute('UPDATE brands SET price = ? WHERE id = ?', (new_price, brand_id))
-            updated += 1
-    
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+
+from db_publish import transform
+
+DB_PATH = Path('assets/db/medicines.db')
+
+# Robust bounds
+MIN_GROUP_SIZE = 5
+Z_THRESHOLD = 3.5
+MAD_TO_SIGMA = 1.4826
+# Brands of one medicine may differ by ~25% per MAD even when most share a price
+MIN_LOG_MAD = math.log(1.25)
+
+# Dosage forms sharing a group (first keyword found in the lowercased form wins;
+# other forms are their own group)
+FORM_GROUPS = [
+    ('inhal', 'inhalation'),
+    ('nebul', 'inhalation'),
+    ('injection', 'injection'),
+    ('infusion', 'injection'),
+    ('ophthalmic', 'eye'),
+    ('eye', 'eye'),
+    ('nasal', 'nasal'),
+    ('tablet', 'oral solid'),
+    ('capsule', 'oral solid'),
+    ('suspension', 'oral liquid'),
+    ('syrup', 'oral liquid'),
+    ('oral solution', 'oral liquid'),
+    ('drops', 'oral liquid'),
+    ('cream', 'topical'),
+    ('ointment', 'topical'),
+    ('gel', 'topical'),
+    ('lotion', 'topical'),
+    ('suppositor', 'suppository'),
+]
+
+# Flag codes (0 = price looks fine)
+FLAGS = ('', 'missing', 'high', 'low', 'pack_price', 'unit_price', 'paisa', 'decimal_shift')
+FLAG_CODES = {name: code for code, name in enumerate(FLAGS)}
+
+# Fixed unit-scale mistakes: (flag, factor the price is too large by)
+SCALE_ERRORS = [
+    ('paisa', 100.0),
+    ('decimal_shift', 10.0),
+    ('decimal_shift', 1000.0),
+    ('decimal_shift', 0.1),
+]
+
+PACK_COUNT = re.compile(r"(\d+)\s*'s|(\d+)\s*x\s*(\d+)", re.IGNORECASE)
+
+
+def normalize_strength(strength: str) -> str:
+    """Lowercase strength without spaces ('500 Mg' -> '500mg')."""
+    return re.sub(r'\s+', '', (strength or '').lower())
+
+
+def form_group(dosage_form: str) -> str:
+    """Group of a dosage form ('Tablet (Enteric Coated)' -> 'oral solid')."""
+    form = (dosage_form or '').strip().lower()
+    for keyword, group in FORM_GROUPS:
+        if keyword in form:
+            return group
+    return form
+
+
+def pack_count(pack_size: str) -> float:
+    """Units in a pack ("30's pack" -> 30, "10 x 10" -> 100; NaN if unknown)."""
+    match = PACK_COUNT.search(pack_size or '')
+    if not match:
+        return math.nan
+    if match.group(1):
+        return float(match.group(1))
+    return float(match.group(2)) * float(match.group(3))
+
+
+def factorize(values: Iterable[str], normalize: Callable[[str], object]) -> tuple[np.ndarray, int]:
+    """(code of each value's normalized form, number of codes), normalizing each distinct value once."""
+    values = list(values)
+    normalized = {value: normalize(value) for value in dict.fromkeys(values)}
+    codes = {form: code for code, form in enumerate(dict.fromkeys(normalized.values()))}
+    lookup = {value: codes[form] for value, form in normalized.items()}
+    return np.fromiter(map(lookup.__getitem__, values), dtype=np.int64, count=len(values)), len(codes)
+
+
+def grouped_median(groups: np.ndarray, values: np.ndarray, group_count: int) -> tuple[np.ndarray, np.ndarray]:
+    """(median, size) of values per group (NaN median for empty groups)."""
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    sizes = np.bincount(groups, minlength=group_count)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    medians = np.full(group_count, np.nan)
+    present = sizes > 0
+    lower = starts[present] + (sizes[present] - 1) // 2
+    upper = starts[present] + sizes[present] // 2
+    medians[present] = (sorted_values[lower] + sorted_values[upper]) / 2
+    return medians, sizes
+
+
+@dataclass
+class PriceFlags:
+    """Per-row flag code, group median, robust z-score and suggested price."""
+    flags: np.ndarray
+    medians: np.ndarray
+    z_scores: np.ndarray
+    suggested: np.ndarray
+
+
+def find_price_flags(
+    generic_ids: np.ndarray,
+    strengths: list[str],
+    dosage_forms: list[str],
+    prices: np.ndarray,
+    pack_counts: np.ndarray,
+) -> PriceFlags:
+    """Flag every price against the median/MAD of its (generic, strength, form group)."""
+    count = len(prices)
+    strength_codes, strength_count = factorize(strengths, normalize_strength)
+    form_codes, form_count = factorize(dosage_forms, form_group)
+    keys = (generic_ids.astype(np.int64) * strength_count + strength_codes) * form_count + form_codes
+    _, groups = np.unique(keys, return_inverse=True)
+    group_count = int(groups.max()) + 1 if count else 0
+
+    flags = np.zeros(count, dtype=np.int8)
+    medians = np.full(count, np.nan)
+    z_scores = np.full(count, np.nan)
+    suggested = np.full(count, np.nan)
+
+    priced = np.isfinite(prices) & (prices > 0)
+    flags[~priced] = FLAG_CODES['missing']
+    rows = np.flatnonzero(priced)
+    if not len(rows):
+        return PriceFlags(flags, medians, z_scores, suggested)
+
+    # Median and MAD of log prices per group, two sorts in total
+    logs = np.log(prices[rows])
+    row_groups = groups[rows]
+    log_medians, sizes = grouped_median(row_groups, logs, group_count)
+    deviations = np.abs(logs - log_medians[row_groups])
+    mads, _ = grouped_median(row_groups, deviations, group_count)
+    scales = MAD_TO_SIGMA * np.maximum(mads, MIN_LOG_MAD)
+
+    judged = sizes[row_groups] >= MIN_GROUP_SIZE
+    rows, logs, row_groups = rows[judged], logs[judged], row_groups[judged]
+    center, scale = log_medians[row_groups], scales[row_groups]
+    z = (logs - center) / scale
+    medians[rows] = np.exp(center)
+    z_scores[rows] = z
+
+    outliers = np.abs(z) > Z_THRESHOLD
+    flags[rows[outliers & (z > 0)]] = FLAG_CODES['high']
+    flags[rows[outliers & (z < 0)]] = FLAG_CODES['low']
+
+    # Ratio tests: the factor that brings an outlier closest to its median, if within bounds
+    rows, logs, center, scale = rows[outliers], logs[outliers], center[outliers], scale[outliers]
+    packs = pack_counts[rows]
+    packs = np.where(packs > 1, packs, np.nan)
+    candidates = [('pack_price', packs), ('unit_price', 1 / packs)]
+    candidates += [(name, np.full(len(rows), factor)) for name, factor in SCALE_ERRORS]
+    factors = np.column_stack([factor for _, factor in candidates])
+    fixed_z = np.abs((logs[:, None] - np.log(factors) - center[:, None]) / scale[:, None])
+    fixed_z = np.where(np.isnan(fixed_z), np.inf, fixed_z)
+    best = np.argmin(fixed_z, axis=1)
+    fixable = fixed_z[np.arange(len(rows)), best] <= Z_THRESHOLD
+    codes = np.array([FLAG_CODES[name] for name, _ in candidates], dtype=np.int8)
+    flags[rows[fixable]] = codes[best[fixable]]
+    suggested[rows[fixable]] = prices[rows[fixable]] / factors[fixable, best[fixable]]
+    return PriceFlags(flags, medians, z_scores, suggested)
+
+
+def write_flags(conn: sqlite3.Connection, brand_ids: np.ndarray, prices: np.ndarray, result: PriceFlags) -> list[tuple]:
+    """Replace the price_flags table with the flagged brands; returns the rows written."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS price_flags (
+            brand_id INTEGER PRIMARY KEY,
+            flag TEXT NOT NULL,
+            price REAL,
+            group_median REAL,
+            robust_z REAL,
+            suggested_price REAL,
+            FOREIGN KEY (brand_id) REFERENCES brands (id)
+        )
+    ''')
+    conn.execute('DELETE FROM price_flags')
+
+    def value(number: float) -> float | None:
+        return None if math.isnan(number) else round(number, 2)
+
+    flagged = np.flatnonzero(result.flags)
+    rows = [
+        (int(brand_ids[i]), FLAGS[result.flags[i]], value(prices[i]), value(result.medians[i]),
+         value(result.z_scores[i]), value(result.suggested[i]))
+        for i in flagged.tolist()
+    ]
+    conn.executemany('INSERT INTO price_flags VALUES (?, ?, ?, ?, ?, ?)', rows)
     conn.commit()
-    conn.close()
-    
-    print(f"✅ Normalized {updated} prices to realistic ranges")
+    return rows
+
+
+def flag_prices(db_path: Path, csv_path: Path | None = None) -> None:
+    with transform(db_path) as conn:
+        brands = conn.execute(
+            'SELECT id, generic_id, strength, dosage_form, price, pack_size FROM brands'
+        ).fetchall()
+        print(f"Processing {len(brands)} medicines...")
+        if not brands:
+            return
+
+        brand_ids, generic_ids, strengths, forms, prices, pack_sizes = zip(*brands)
+        prices = np.array([math.nan if price is None else price for price in prices], dtype=np.float64)
+        result = find_price_flags(
+            np.array(generic_ids, dtype=np.int64),
+            list(strengths),
+            list(forms),
+            prices,
+            np.fromiter(map(pack_count, pack_sizes), dtype=np.float64, count=len(pack_sizes)),
+        )
+        rows = write_flags(conn, np.array(brand_ids), prices, result)
+
+    if csv_path:
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['brand_id', 'flag', 'price', 'group_median', 'robust_z', 'suggested_price'])
+            writer.writerows(rows)
+
+    judged = int(np.isfinite(result.z_scores).sum())
+    print(f"Judged {judged} prices against groups of {MIN_GROUP_SIZE}+ brands")
+    for code, name in enumerate(FLAGS[1:], start=1):
+        print(f"  {name:<14} {int((result.flags == code).sum()):>7}")
+    print(f"✅ Flagged {len(rows)} prices in price_flags (prices unchanged)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag outlier prices per generic, strength and form")
+    parser.add_argument('--db', type=Path, default=DB_PATH, help='SQLite database to check')
+    parser.add_argument('--csv', type=Path, default=None, help='Also write the flags to a CSV')
+    args = parser.parse_args()
+    flag_prices(args.db, args.csv)
+
 
 if __name__ == '__main__':
-    normalize_prices()
+    main()
@@ -0,0 +1,35 @@
+"""
+Medicine Saver BD - Package Price Parsing
+
+Kaggle's medicine.csv has no price column: the price is embedded in the
+'package container' text after the Taka sign, as the unit price when one
+is given ("Unit Price: ৳ 5.00 (10 x 10: ৳ 500.00)") or as the package
+price ("100 ml bottle: ৳ 40.12").
+
+Shared by update_real_prices.py and source_adapters.py ("package"
+price_format); importing it has no side effects.
+
+Usage:
+    extract_price("100 ml bottle: ৳ 40.12")    # 40.12
+    extract_price("")                           # None
+"""
+
+import re
+
+UNIT_PRICE = re.compile(r'Unit Price:\s*৳\s*([\d,.]+)')
+ANY_PRICE = re.compile(r'৳\s*([\d,.]+)')
+
+
+def extract_price(package_container):
+    """Extract price from package container field (e.g., '100 ml bottle: ৳ 40.12')"""
+    if not package_container:
+        return None
+
+    # Look for Unit Price first, then any ৳ symbol
+    match = UNIT_PRICE.search(package_container) or ANY_PRICE.search(package_container)
+    if match:
+        try:
+            return float(match.group(1).replace(',', ''))
+        except ValueError:
+            return None
+    return None
@@ -2,12 +2,13 @@
 Remove duplicate medicine entries from database
 - Keeps the entry with lowest price (best deal for users)
 - Groups by name + strength + dosage_form to identify true duplicates
+- Works on an in-memory copy that replaces the database atomically (db_publish.py)
 """
 
-import sqlite3
+from db_publish import open_copy, publish
 
 db_path = 'assets/db/medicines.db'
-conn = sqlite3.connect(db_path)
+conn = open_copy(db_path)
 c = conn.cursor()
 
 print("=" * 60)
@@ -75,5 +76,6 @@ c.execute('''
 remaining_duplicates = c.fetchall()
 print(f"\nRemaining duplicate groups: {len(remaining_duplicates)}")
 
+publish(conn, db_path)
 conn.close()
 print("\n✅ Database cleaned successfully!")
@@ -0,0 +1,188 @@
+"""
+Medicine Saver BD - Pluggable Source Adapters
+
+A source is a config entry in sources.json instead of a hand-written loader:
+
+    {
+        "name": "price_dataset",
+        "path": "input/medicine_price_dataset.csv",
+        "price_precedence": 2,
+        "info_precedence": 4,
+        "price_format": "number",
+        "fields": {
+            "brand_name": "medicine_name",
+            "strength": "{dosage_mg} mg",
+            "price": "price",
+            "unit_price": "price"
+        }
+    }
+
+"fields" maps MedicineRecord fields to a CSV column, or to a template
+of columns ("{dosage_mg} mg", empty when its columns are). "price" and
+"unit_price" are parsed with "price_format" ("number", or "package" for
+text like "100 ml bottle: ৳ 40.12"). Lower precedence ranks win: the
+price rank decides whose price is authoritative, the info rank whose
+medical info is kept. Paths are relative to the config file.
+
+load_concurrently() runs a task for every adapter on a process (or
+thread) pool, so ingestion takes as long as the slowest source rather
+than the sum of all sources.
+
+Usage:
+    adapters = load_sources()
+    for record in adapters["kaggle"].records():
+        ...
+    load_concurrently(adapters.values(), task, workers=4)
+"""
+
+import json
+import os
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from cross_verify import MedicineRecord, iter_csv_records
+from package_price import extract_price
+
+# Paths
+SOURCES_CONFIG = Path(__file__).parent / "sources.json"
+
+# MedicineRecord fields parsed as prices; all other fields are text
+PRICE_FIELDS = ("price", "unit_price")
+RECORD_FIELDS = {f.name for f in fields(MedicineRecord)} - {"source"}
+
+# Rank of sources without an explicit precedence
+DEFAULT_PRECEDENCE = 100
+
+
+def parse_number(value: str) -> float:
+    """Plain number (0.0 if missing or malformed)."""
+    try:
+        return float(value or 0)
+    except ValueError:
+        return 0.0
+
+
+def parse_package_price(value: str) -> float:
+    """Price in package text such as '100 ml bottle: ৳ 40.12' (0.0 if none)."""
+    return extract_price(value) or 0.0
+
+
+PRICE_FORMATS = {
+    "number": parse_number,
+    "package": parse_package_price,
+}
+
+
+def _column_getter(spec: str):
+    """Getter for a field spec: a column name, or a template of columns."""
+    columns = [name for _, name, _, _ in string.Formatter().parse(spec) if name]
+    if not columns:
+        return lambda row: row.get(spec) or ""
+
+    def render(row: dict) -> str:
+        values = {column: (row.get(column) or "").strip() for column in columns}
+        return spec.format_map(values) if any(values.values()) else ""
+    return render
+
+
+@dataclass
+class SourceAdapter:
+    """One configured source: where it lives and how its rows map to records."""
+    name: str
+    path: Path
+    fields: dict[str, str]
+    price_format: str = "number"
+    price_precedence: int = DEFAULT_PRECEDENCE
+    info_precedence: int = DEFAULT_PRECEDENCE
+    _getters: list = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        unknown = set(self.fields) - RECORD_FIELDS
+        if unknown:
+            raise ValueError(f"Source {self.name!r} maps unknown fields: {', '.join(sorted(unknown))}")
+        if self.price_format not in PRICE_FORMATS:
+            raise ValueError(f"Source {self.name!r} has unknown price_format {self.price_format!r}")
+        self._getters = [(name, _column_getter(spec)) for name, spec in self.fields.items()]
+
+    def __getstate__(self):
+        # The compiled getters are closures; rebuild them after pickling
+        state = dict(self.__dict__)
+        del state["_getters"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__post_init__()
+
+    def parse_row(self, row: dict) -> MedicineRecord:
+        """Normalized MedicineRecord for one CSV row."""
+        parse_price = PRICE_FORMATS[self.price_format]
+        values = {}
+        for name, getter in self._getters:
+            value = getter(row)
+            values[name] = parse_price(value) if name in PRICE_FIELDS else value
+        return MedicineRecord(**values, source=self.name)
+
+    def records(self) -> Iterator[MedicineRecord]:
+        """Stream the source's rows as normalized records."""
+        return iter_csv_records(self.path, self.parse_row)
+
+
+def load_sources(config_path: Path = SOURCES_CONFIG) -> dict[str, SourceAdapter]:
+    """Adapters for every source in the config, in config order."""
+    with open(config_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)["sources"]
+
+    adapters = {}
+    for entry in entries:
+        entry = dict(entry, path=config_path.parent / entry["path"])
+        adapter = SourceAdapter(**entry)
+        adapters[adapter.name] = adapter
+    return adapters
+
+
+def ranked_names(adapters: Iterable[SourceAdapter], rank: str) -> list[str]:
+    """Source names by a precedence rank ("price_precedence" or "info_precedence")."""
+    adapters = list(adapters)
+    order = sorted(range(len(adapters)), key=lambda i: (getattr(adapters[i], rank), i))
+    return [adapters[i].name for i in order]
+
+
+def _timed(task, adapter: SourceAdapter, args: tuple):
+    start = time.perf_counter()
+    result = task(adapter, *args)
+    return result, time.perf_counter() - start
+
+
+def load_concurrently(
+    adapters: Iterable[SourceAdapter],
+    task,
+    *args,
+    workers: int | None = None,
+    executor: str = "process",
+) -> dict[str, object]:
+    """
+    Run task(adapter, *args) for every adapter on a pool and collect the
+    results by source name, in adapter order. task must be a module-level
+    function when executor is "process".
+    """
+    adapters = list(adapters)
+    if not adapters:
+        return {}
+    workers = workers or min(len(adapters), os.cpu_count() or 1)
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+
+    results = {}
+    start = time.perf_counter()
+    with pool_class(max_workers=workers) as pool:
+        futures = [pool.submit(_timed, task, adapter, args) for adapter in adapters]
+        for adapter, future in zip(adapters, futures):
+            results[adapter.name], elapsed = future.result()
+            print(f"  {adapter.name:<14} {elapsed:6.2f}s  {adapter.path}")
+    print(f"Loaded {len(adapters)} sources in {time.perf_counter() - start:.2f}s "
+          f"({workers} {executor} workers)")
+    return results
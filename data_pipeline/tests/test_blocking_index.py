@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from blocking_index import NgramBlockingIndex, bounded_levenshtein, edit_similarity, match_keys, ngrams
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def mutate(rng: random.Random, word: str) -> str:
+    chars = list(word)
+    for _ in range(rng.randint(0, 2)):
+        position = rng.randrange(len(chars))
+        operation = rng.choice("sid")
+        if operation == "s":
+            chars[position] = rng.choice("abcdefghijklmnop")
+        elif operation == "i":
+            chars.insert(position, rng.choice("abcdefghijklmnop"))
+        elif len(chars) > 1:
+            del chars[position]
+    return "".join(chars)
+
+
+@pytest.fixture
+def keys():
+    rng = random.Random(7)
+    brands = ["".join(rng.choice("abcdefghijklmnop") for _ in range(rng.randint(3, 12))) for _ in range(150)]
+    strengths = ["500mg", "250mg", ""]
+    left = [f"{brand}_{rng.choice(strengths)}" for brand in brands]
+    right = [f"{mutate(rng, key.split('_')[0])}_{key.split('_')[1]}" for key in left]
+    right += [f"{brand}_{rng.choice(strengths)}" for brand in rng.sample(brands, 50)]
+    return left, sorted(set(right))
+
+
+def test_ngrams_are_padded():
+    assert ngrams("napa") == {"#na", "nap", "apa", "pa#"}
+    assert ngrams("a") == {"#a#"}
+
+
+def test_bounded_levenshtein_matches_naive():
+    rng = random.Random(3)
+    for _ in range(500):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+        limit = rng.randint(0, 4)
+        distance = levenshtein(a, b)
+        assert bounded_levenshtein(a, b, limit) == (distance if distance <= limit else limit + 1)
+
+
+@pytest.mark.parametrize("threshold", [0.7, 0.8, 0.9])
+def test_index_finds_every_pair_brute_force_does(keys, threshold):
+    left, right = keys
+    index = NgramBlockingIndex(right)
+    for query in left:
+        brand, strength = query.split("_")
+        expected = set()
+        for other in right:
+            other_brand, other_strength = other.split("_")
+            longest = max(len(brand), len(other_brand))
+            if other_strength == strength and 1 - levenshtein(brand, other_brand) / longest >= threshold:
+                expected.add(other)
+        assert {key for key, _ in index.scored_candidates(query, threshold)} == expected
+
+
+def test_blocks_on_strength():
+    index = NgramBlockingIndex(["napaextra_500mg"])
+    assert index.best_match("napaextra_250mg") is None
+    assert index.best_match("napaextr_500mg") == ("napaextra_500mg", pytest.approx(edit_similarity("napaextr", "napaextra")))
+
+
+def test_match_keys_is_one_to_one():
+    matches = match_keys(["napaa_500mg", "napa_500mg"], ["napa_500mg"])
+    assert matches == {"napa_500mg": ("napa_500mg", 1.0)}
@@ -0,0 +1,359 @@
+import csv
+import sqlite3
+import sys
+
+import pytest
+
+import build_db
+
+from benchmarks import row_by_row_load, synthetic_rows
+from build_db import (
+    FAST_BUILD_PRAGMAS, SAFE_PRAGMAS, BulkLoader, IncrementalLoader, ParallelLoader, apply_pragmas,
+    create_schema, create_tables, finalize_database, populate_fts,
+)
+from monograph_store import MonographStore
+
+FIELDS = [
+    "brand_name", "generic_name", "strength", "dosage_form", "manufacturer", "verified_price",
+    "unit_price", "pack_size", "indication", "side_effects", "confidence", "discrepancy_flag",
+]
+NOW = 1_700_000_000.0
+
+
+def medicine(brand, generic, price="10.0", manufacturer="Square Pharmaceuticals Ltd.", **fields) -> dict:
+    row = dict.fromkeys(FIELDS, "")
+    row.update(brand_name=brand, generic_name=generic, strength="50 mg", dosage_form="Tablet",
+               manufacturer=manufacturer, verified_price=price, unit_price=price, confidence="HIGH")
+    row.update(fields)
+    return row
+
+
+def write_csv(path, records: list[dict]):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    return path
+
+
+def build(path, workers: int = 1) -> sqlite3.Connection:
+    """A finished in-memory database of a CSV, as build_db.py builds it."""
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    if workers > 1:
+        loader = ParallelLoader(conn.cursor(), workers, use_reports=False, now=NOW)
+    else:
+        loader = BulkLoader(conn.cursor(), {}, now=NOW)
+    loader.load_csv(path)
+    loader.finish()
+    conn.commit()
+    finalize_database(conn)
+    return conn
+
+
+GENERIC_RECORDS = [
+    medicine("Monas", "Montelukast Sodium"),
+    medicine("Amdocal", "Amlodipine Besilate"),
+    medicine("Angilock", "Losartan"),
+    medicine("Osartil", "Losartan Potassium"),
+    medicine("Ferrovit", "Ferrous Sulphate"),
+    medicine("Clofenac", "Diclofenac Sodium"),
+    medicine("Voltalin", "Diclofenac Potassium"),
+    medicine("Fenac", "Diclofenac"),
+    medicine("Clofenac SR", "Diclofenac Sodium BP"),
+    medicine("Cortan", "Prednisolone"),
+    medicine("Predforte", "Prednisolone Acetate"),
+]
+
+# searchBrands in lib/services/database_helper.dart
+SEARCH_BRANDS = """
+    SELECT b.name FROM brands b
+    LEFT JOIN generics g ON b.generic_id = g.id
+    WHERE LOWER(b.name) LIKE ? OR LOWER(g.name) LIKE ?
+    ORDER BY b.name
+"""
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generics_keep_their_first_spelling(tmp_path, workers):
+    conn = build(write_csv(tmp_path / "in.csv", GENERIC_RECORDS), workers)
+    shown = dict(conn.execute("SELECT b.name, g.name FROM brands b JOIN generics g ON g.id = b.generic_id"))
+    assert shown == {
+        "Monas": "Montelukast Sodium", "Amdocal": "Amlodipine Besilate",
+        "Osartil": "Losartan", "Angilock": "Losartan",
+        "Ferrovit": "Ferrous Sulphate", "Clofenac": "Diclofenac Sodium",
+        "Voltalin": "Diclofenac Potassium", "Fenac": "Diclofenac", "Clofenac SR": "Diclofenac Sodium",
+        "Cortan": "Prednisolone", "Predforte": "Prednisolone Acetate",
+    }
+    for term, brands in [("montelukast sodium", ["Monas"]), ("amlodipine besilate", ["Amdocal"]),
+                         ("losartan", ["Angilock", "Osartil"])]:
+        assert [name for name, in conn.execute(SEARCH_BRANDS, (f"%{term}%", f"%{term}%"))] == brands
+    aliases = dict(conn.execute("SELECT alias, generic_id FROM generic_aliases"))
+    assert aliases["Losartan"] == aliases["Losartan Potassium"]
+
+
+# findAlternatives in lib/services/database_helper.dart
+FIND_ALTERNATIVES = "SELECT b.name FROM brands b WHERE b.generic_id = ? ORDER BY b.name"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_salt_forms_are_not_alternatives(tmp_path, workers):
+    conn = build(write_csv(tmp_path / "in.csv", GENERIC_RECORDS), workers)
+    generic_ids = dict(conn.execute("SELECT name, generic_id FROM brands"))
+    alternatives = {
+        brand: [name for name, in conn.execute(FIND_ALTERNATIVES, (generic_ids[brand],))]
+        for brand in ("Clofenac", "Voltalin", "Fenac", "Cortan")
+    }
+    assert alternatives == {
+        "Clofenac": ["Clofenac", "Clofenac SR"], "Voltalin": ["Voltalin"], "Fenac": ["Fenac"], "Cortan": ["Cortan"],
+    }
+
+    # An incremental build places new spellings the same way
+    update(conn, [*GENERIC_RECORDS, medicine("Voltalin Rapid", "Diclofenac Potassium BP"),
+                  medicine("Fenac Plus", "DICLOFENAC")])
+    generic_ids = dict(conn.execute("SELECT name, generic_id FROM brands"))
+    assert generic_ids["Voltalin Rapid"] == generic_ids["Voltalin"]
+    assert generic_ids["Fenac Plus"] == generic_ids["Fenac"]
+
+
+def loaded(load, records) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    load(conn.cursor(), records)
+    conn.commit()
+    return conn
+
+
+def bulk_load(cursor, records):
+    loader = BulkLoader(cursor, now=NOW)
+    loader.load(records)
+    loader.finish()
+
+
+def test_bulk_load_matches_row_by_row(monkeypatch):
+    monkeypatch.setattr("build_db.BATCH_SIZE", 64)  # Several executemany batches
+    records = list(synthetic_rows(500))
+    bulk, baseline = loaded(bulk_load, records), loaded(row_by_row_load, records)
+    for query in (
+        "SELECT id, name FROM generics",
+        "SELECT id, name FROM manufacturers",
+        "SELECT id, name, generic_id, manufacturer_id, strength, dosage_form, price, unit_price, pack_size FROM brands",
+    ):
+        assert bulk.execute(query).fetchall() == baseline.execute(query).fetchall()
+    assert MonographStore(bulk.cursor()).read() == MonographStore(baseline.cursor()).read()
+
+
+def test_bulk_loader_records(tmp_path):
+    conn = build(write_csv(tmp_path / "in.csv", [
+        medicine("Napa", "Paracetamol", manufacturer="BEXIMCO PHARMACEUTICALS LTD.", indication="Fever"),
+        medicine("", "Paracetamol"),
+        medicine("Ace", ""),
+        medicine("Ace", "Paracetamol", price="৳ 1,200.50", unit_price="", confidence="LOW",
+                 manufacturer="Beximco Pharmaceuticals Ltd.", indication="Fever and pain"),
+    ]))
+    rows = conn.execute("SELECT name, manufacturer_id, price, unit_price, confidence, verified FROM brands").fetchall()
+    assert sorted(rows) == [("Ace", 1, 1200.5, 1200.5, "LOW", 0), ("Napa", 1, 10.0, 10.0, "HIGH", 1)]
+    assert conn.execute("SELECT count(*) FROM brand_sources").fetchone()[0] == 2
+    # A generic keeps the medical info of the last record that had any
+    assert MonographStore(conn.cursor()).read()[1]["indication"] == "Fever and pain"
+
+
+def test_deferred_indexes_match_indexed_schema(tmp_path):
+    records = list(synthetic_rows(300))
+    indexed = sqlite3.connect(tmp_path / "indexed.db")
+    create_schema(indexed)
+    bulk_load(indexed.cursor(), records)
+    populate_fts(indexed.cursor())
+    indexed.commit()
+
+    fast = sqlite3.connect(tmp_path / "fast.db")
+    apply_pragmas(fast, FAST_BUILD_PRAGMAS)
+    create_tables(fast)
+    bulk_load(fast.cursor(), records)
+    fast.commit()
+    finalize_database(fast)
+
+    schema = "SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_stat%' ORDER BY name"
+    assert fast.execute(schema).fetchall() == indexed.execute(schema).fetchall()
+    search = """
+        SELECT b.name, b.strength, b.pack_size FROM brands_fts JOIN brands b ON b.id = brands_fts.rowid
+        WHERE brands_fts MATCH ? ORDER BY 1, 2, 3
+    """
+    for term in ("generic", "pharma", records[0]["brand_name"].split()[0]):
+        assert fast.execute(search, (term,)).fetchall() == indexed.execute(search, (term,)).fetchall()
+    assert fast.execute("SELECT count(*) FROM sqlite_stat1").fetchone()[0] > 0
+    assert fast.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+    # Safe settings restored for the finished database
+    assert fast.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+    assert fast.execute("PRAGMA synchronous").fetchone() == (2,)
+    assert fast.execute("PRAGMA page_size").fetchone() == (FAST_BUILD_PRAGMAS["page_size"],)
+
+
+CATALOG = """
+    SELECT b.name, g.name, m.name, b.strength, b.dosage_form, b.price, b.unit_price, b.pack_size, b.confidence
+    FROM brands b JOIN generics g ON g.id = b.generic_id LEFT JOIN manufacturers m ON m.id = b.manufacturer_id
+    ORDER BY 1, 2, 3, 4, 5, 6, 8
+"""
+
+
+def run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["build_db.py", "--no-price-reports", *args])
+    build_db.main()
+
+
+def test_incremental_build_matches_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    applied = []
+    monkeypatch.setattr(build_db, "apply_pragmas", lambda conn, pragmas: (
+        applied.append(pragmas), apply_pragmas(conn, pragmas)))
+    records = [
+        medicine(row["brand_name"], row["generic_name"], str(row.pop("price")), **row)
+        for row in synthetic_rows(300)
+    ]
+    # Delist every 11th, reprice every 7th, add a brand of a new generic
+    changed = [
+        {**record, "verified_price": "99.0"} if i % 7 == 0 else record
+        for i, record in enumerate(records) if i % 11
+    ]
+    changed.append(medicine("Newbrand", "Brand New Generic", manufacturer="Pharma 999 Ltd."))
+    write_csv(tmp_path / "first.csv", records)
+    write_csv(tmp_path / "second.csv", changed)
+
+    run_main(monkeypatch, "--input", "first.csv")
+    assert applied == [FAST_BUILD_PRAGMAS, SAFE_PRAGMAS]
+    applied.clear()
+    run_main(monkeypatch, "--input", "second.csv", "--incremental")
+    # The existing database is patched under the safe settings only
+    assert applied == [SAFE_PRAGMAS]
+    incremental = sqlite3.connect(tmp_path / "output" / "medicines.db").execute(CATALOG).fetchall()
+
+    run_main(monkeypatch, "--input", "second.csv")
+    assert incremental == sqlite3.connect(tmp_path / "output" / "medicines.db").execute(CATALOG).fetchall()
+    assert len(incremental) == len(changed)
+
+
+def test_incremental_build_keeps_deleted_brands_deleted(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    write_csv(tmp_path / "in.csv", MONOGRAPH_RECORDS)
+    run_main(monkeypatch, "--input", "in.csv")
+    db = tmp_path / "output" / "medicines.db"
+    conn = sqlite3.connect(db)
+    # As remove_duplicates.py deletes a brand
+    conn.execute("DELETE FROM brands WHERE name = 'Napa'")
+    conn.commit()
+    before = conn.execute(CATALOG).fetchall()
+    conn.close()
+
+    run_main(monkeypatch, "--input", "in.csv", "--incremental")
+    assert "Skipped 1 records of brands deleted since the last build" in capsys.readouterr().out
+    conn = sqlite3.connect(db)
+    assert conn.execute(CATALOG).fetchall() == before
+    assert conn.execute("SELECT count(*) FROM brands WHERE name = 'Napa'").fetchone() == (0,)
+
+
+TABLES = ("generics", "generic_aliases", "generic_monographs", "monograph_texts", "monograph_dictionary",
+          "manufacturers", "brands", "brand_sources")
+
+
+def test_parallel_build_matches_sequential(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_db, "STAGE_BATCH_SIZE", 37)  # Generics and companies recur across batches
+    records = [
+        medicine(row["brand_name"], row["generic_name"], str(row.pop("price")), **row)
+        for row in synthetic_rows(400)
+    ]
+    records[5:5] = [medicine("", "Paracetamol"), medicine("Napa", ""), *GENERIC_RECORDS]
+    path = write_csv(tmp_path / "in.csv", records)
+    sequential, parallel = build(path), build(path, workers=3)
+    for table in TABLES:
+        query = f"SELECT * FROM {table} ORDER BY 1"
+        assert parallel.execute(query).fetchall() == sequential.execute(query).fetchall(), table
+    search = "SELECT rowid FROM brands_fts WHERE brands_fts MATCH 'generic' ORDER BY rowid"
+    assert parallel.execute(search).fetchall() == sequential.execute(search).fetchall()
+
+
+def test_brands_clustered_by_generic_and_price(tmp_path):
+    records = [
+        medicine(row["brand_name"], row["generic_name"], str(row.pop("price")), **row)
+        for row in synthetic_rows(300)
+    ]
+    conn = build(write_csv(tmp_path / "in.csv", records))
+    rows = conn.execute("SELECT id, generic_id, price FROM brands ORDER BY id").fetchall()
+    assert [row[0] for row in rows] == list(range(1, len(rows) + 1))
+    assert [row[1:] for row in rows] == sorted(row[1:] for row in rows)
+
+    # The FTS index, brand_sources and the statistics follow the new ids
+    for brand_id, name in conn.execute("SELECT id, name FROM brands WHERE id % 25 = 0"):
+        matches = conn.execute("SELECT rowid FROM brands_fts WHERE brands_fts MATCH ?", (f'"{name}"',)).fetchall()
+        assert (brand_id,) in matches
+    unclustered = sqlite3.connect(":memory:")
+    create_tables(unclustered)
+    bulk_load(unclustered.cursor(), records)
+    unclustered.commit()
+    finalize_database(unclustered, cluster=False)
+    sources = """
+        SELECT b.name, b.strength, b.dosage_form, b.pack_size, b.price, s.source_hash
+        FROM brands b JOIN brand_sources s ON s.brand_id = b.id ORDER BY 1, 2, 3, 4, 5
+    """
+    assert conn.execute(sources).fetchall() == unclustered.execute(sources).fetchall()
+    assert conn.execute("SELECT count(*) FROM sqlite_stat1 WHERE tbl = 'brands'").fetchone()[0] > 0
+
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM brands WHERE generic_id = ? ORDER BY price", (1,)))
+    assert "idx_brands_generic_price" in plan and "TEMP B-TREE" not in plan
+
+
+MONOGRAPH_RECORDS = [
+    medicine("Napa", "Paracetamol", indication="Fever", side_effects="Rare rash"),
+    medicine("Ace", "Paracetamol"),
+    medicine("Seclo", "Omeprazole", indication="Ulcer"),
+    medicine("Histacin", "Chlorpheniramine"),
+]
+
+
+def update(conn, records) -> IncrementalLoader:
+    loader = IncrementalLoader(conn.cursor(), now=NOW)
+    loader.load(records)
+    loader.finish()
+    conn.commit()
+    return loader
+
+
+def monographs(conn) -> dict:
+    names = dict(conn.execute("SELECT id, name FROM generics"))
+    return {names[generic_id]: texts for generic_id, texts in MonographStore(conn.cursor()).read().items()}
+
+
+def test_monographs_kept_off_generics(tmp_path):
+    conn = build(write_csv(tmp_path / "in.csv", MONOGRAPH_RECORDS))
+    assert [row[1] for row in conn.execute("PRAGMA table_info(generics)")] == ["id", "name", "drug_class"]
+    assert monographs(conn) == {
+        "Paracetamol": {"indication": "Fever", "dosage_info": "", "side_effects": "Rare rash", "contraindication": ""},
+        "Omeprazole": {"indication": "Ulcer", "dosage_info": "", "side_effects": "", "contraindication": ""},
+    }
+
+
+def test_incremental_build_updates_and_prunes_monographs(tmp_path):
+    conn = build(write_csv(tmp_path / "in.csv", MONOGRAPH_RECORDS))
+    update(conn, [
+        medicine("Napa", "Paracetamol", indication="Fever and pain", side_effects="Rare rash"),
+        MONOGRAPH_RECORDS[1],
+        MONOGRAPH_RECORDS[3],
+    ])
+    assert {name: texts["indication"] for name, texts in monographs(conn).items()} == {"Paracetamol": "Fever and pain"}
+    # Only the texts still referenced are stored
+    assert conn.execute("SELECT count(*) FROM monograph_texts").fetchone()[0] == 2
+    assert conn.execute("SELECT name FROM generics ORDER BY id").fetchall() == [("Paracetamol",), ("Chlorpheniramine",)]
+
+
+def test_incremental_build_refuses_database_without_monographs(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    write_csv(tmp_path / "in.csv", MONOGRAPH_RECORDS)
+    old = sqlite3.connect(tmp_path / "old.db")
+    create_tables(old)
+    old.execute("DROP TABLE generic_monographs")
+    old.commit()
+    old.close()
+    before = (tmp_path / "old.db").read_bytes()
+    run_main(monkeypatch, "--input", "in.csv", "--incremental", "old.db")
+    assert "has no generic_monographs table" in capsys.readouterr().out
+    assert (tmp_path / "old.db").read_bytes() == before
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from build_profile import (
+    MIN_REGRESSION_MIB, REGRESSION_FACTOR, StageProfiler, load_profiles, regressions,
+    report_path, stats_dir,
+)
+
+
+def profile(**stages) -> dict:
+    """A report with stages given as (wall_s, rows, peak_rss_mib)."""
+    return {"stages": {
+        name: {"wall_s": wall, "rows": rows, "peak_rss_mib": rss} for name, (wall, rows, rss) in stages.items()
+    }}
+
+
+def test_stage_entries_add_up():
+    profiler = StageProfiler()
+    for batch in (3, 4):
+        with profiler.stage("csv_parse") as stage:
+            stage.rows += batch
+    with profiler.stage("analyze"):
+        pass
+    report = profiler.report("full")
+    assert list(report["stages"]) == ["csv_parse", "analyze"]
+    assert report["stages"]["csv_parse"]["calls"] == 2
+    assert report["stages"]["csv_parse"]["rows"] == 7
+    assert report["stages"]["analyze"]["rows_per_s"] is None
+    assert report["total"]["peak_rss_mib"] > 0
+
+
+def test_disabled_profiler_only_runs_blocks():
+    profiler = StageProfiler(enabled=False)
+    ran = []
+    with profiler.stage("csv_parse") as stage:
+        stage.rows += 5
+        ran.append(True)
+    assert ran and profiler.report("full")["stages"] == {}
+
+
+def test_failed_stage_is_still_timed():
+    profiler = StageProfiler()
+    with pytest.raises(ValueError):
+        with profiler.stage("insert_brands"):
+            raise ValueError
+    assert profiler.stages["insert_brands"].calls == 1
+
+
+@pytest.mark.parametrize("before, after, warned", [
+    ((1.0, 1000, 100), (2.0, 1000, 100), True),                       # 2x slower per row
+    ((1.0, 1000, 100), (4.0, 4000, 100), False),                      # Bigger input, same rate
+    ((0.01, 1000, 100), (0.05, 1000, 100), False),                    # Slower, but below the noise floor
+    ((1.0, 0, 100), (1.0 * REGRESSION_FACTOR + 0.01, 0, 100), True),  # No rows: total time
+    ((1.0, 1000, 100), (1.0, 1000, 200), True),                       # Memory doubled
+    ((1.0, 1000, 10), (1.0, 1000, 10 + MIN_REGRESSION_MIB / 2), False),
+])
+def test_regressions(before, after, warned):
+    assert bool(regressions(profile(stage=before), profile(stage=after))) == warned
+
+
+def test_new_stages_are_not_regressions():
+    assert regressions(profile(), profile(fts=(10.0, 0, 100))) == []
+
+
+def test_finish_keeps_one_profile_per_mode(tmp_path, capsys):
+    db = tmp_path / "medicines.db"
+    for mode in ("full", "incremental", "full"):
+        profiler = StageProfiler()
+        with profiler.stage("csv_parse") as stage:
+            stage.rows += 1
+        profiler.finish(db, mode)
+    saved = json.loads(report_path(db).read_text())
+    assert saved["latest"] == "full" and set(saved["profiles"]) == {"full", "incremental"}
+    assert "No previous incremental profile" in capsys.readouterr().out
+    assert list(tmp_path.iterdir()) == [report_path(db)]
+
+
+def test_cprofile_stats_per_stage(tmp_path):
+    profiler = StageProfiler(cprofile=True)
+    with profiler.stage("csv_parse"):
+        sum(range(1000))
+    report = profiler.finish(tmp_path / "medicines.db", "full")
+    assert report["mode"] == "full+cprofile"
+    assert (stats_dir(tmp_path / "medicines.db") / "csv_parse.pstats").exists()
+
+
+def test_unreadable_report(tmp_path):
+    path = tmp_path / "medicines.profile.json"
+    assert load_profiles(path) == {}
+    path.write_text("not json")
+    assert load_profiles(path) == {}
+    path.write_text("[]")
+    assert load_profiles(path) == {}
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from benchmarks import synthetic_rows
+from compact_db import COMPACT_PAGE_SIZE, compact
+from db_publish import publish
+from test_build_db import build, medicine, write_csv
+
+APP_QUERIES = [
+    "SELECT * FROM brands ORDER BY id",
+    "SELECT * FROM brands WHERE generic_id = 3 ORDER BY price",
+    "SELECT b.name, g.name, m.name FROM brands b JOIN generics g ON g.id = b.generic_id "
+    "LEFT JOIN manufacturers m ON m.id = b.manufacturer_id WHERE lower(b.name) LIKE '%na%' ORDER BY b.id",
+    "SELECT rowid FROM brands_fts WHERE brands_fts MATCH 'generic' ORDER BY rowid",
+    "SELECT * FROM generic_aliases ORDER BY alias",
+    "SELECT * FROM metadata ORDER BY key",
+]
+
+
+@pytest.fixture(scope="module")
+def layouts(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("compact")
+    records = [
+        medicine(row["brand_name"], row["generic_name"], str(row.pop("price")), **row)
+        for row in synthetic_rows(400)
+    ]
+    conn = build(write_csv(directory / "in.csv", records))
+    conn.execute("INSERT INTO metadata VALUES ('version', '1.0')")
+    publish(conn, directory / "medicines.db")
+    return sqlite3.connect(directory / "medicines.db"), compact(directory / "medicines.db")
+
+
+@pytest.mark.parametrize("query", APP_QUERIES)
+def test_app_queries_unchanged(layouts, query):
+    legacy, compacted = layouts
+    assert compacted.execute(query).fetchall() == legacy.execute(query).fetchall()
+
+
+def test_compact_layout(layouts):
+    _, conn = layouts
+    kinds = dict(conn.execute("SELECT name, type FROM sqlite_master"))
+    assert kinds["brands"] == "view" and kinds["brand_rows"] == "table"
+    assert "brand_sources" not in kinds and "idx_brands_name" not in kinds
+    assert conn.execute("PRAGMA page_size").fetchone() == (COMPACT_PAGE_SIZE,)
+    for table in ("generic_aliases", "metadata"):
+        assert "WITHOUT ROWID" in conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (table,)).fetchone()[0]
+    # Most frequent value first, so most codes fit in one byte
+    counts = [count for count, in conn.execute(
+        "SELECT count(*) FROM brand_rows GROUP BY dosage_form_id ORDER BY dosage_form_id")]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_cheapest_brands_walk_price_index(layouts):
+    _, conn = layouts
+    plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN SELECT * FROM brands ORDER BY price LIMIT 50"))
+    assert "idx_brands_price" in plan and "TEMP B-TREE" not in plan
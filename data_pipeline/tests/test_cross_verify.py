@@ -0,0 +1,135 @@
+import random
+
+import numpy as np
+import pytest
+
+from cross_verify import (
+    CONFIDENCE_HIGH,
+    CONFIDENCE_LOW,
+    CONFIDENCE_MEDIUM,
+    CONFIDENCE_TIERS,
+    MATCH_THRESHOLD,
+    MedicineRecord,
+    VerifiedMedicine,
+    assign_confidence_tiers,
+    build_price_matrix,
+    calculate_price_discrepancies,
+    calculate_price_discrepancy,
+    cross_verify_incremental,
+    cross_verify_rows,
+    cross_verify_sharded,
+    state_row,
+)
+from verify_state import VerifyState
+
+
+def record(brand, strength="500 mg", price=1.0, **fields) -> MedicineRecord:
+    return MedicineRecord(brand_name=brand, strength=strength, unit_price=price, price=price, **fields)
+
+
+def test_records_are_slotted():
+    assert not hasattr(record("Napa"), "__dict__")
+    assert not hasattr(VerifiedMedicine("Napa", "", "", "", "", 1.0, 1.0, "", "", "", "LOW"), "__dict__")
+
+
+def test_categorical_fields_are_interned():
+    # Built at run time, so only interning makes them the same object
+    first = record("Napa", manufacturer="".join(["Beximco ", "Pharma"]), source="".join(["med", "ex"]))
+    second = record("Ace", manufacturer="".join(["Beximco", " Pharma"]), source="".join(["me", "dex"]))
+    assert first.manufacturer is second.manufacturer
+    assert first.source is second.source
+
+
+def test_match_and_ingest_keys():
+    med = record("Napa Extra", strength="500 mg", manufacturer="Beximco Pharma", dosage_form="Tablet")
+    assert med.get_match_key() == "napaextra_500mg"
+    assert med.get_ingest_key() == "napaextra_500mg|beximcopharma|tablet"
+
+
+def test_vectorized_discrepancies_match_scalar():
+    rng = random.Random(1)
+    price_rows = [
+        [rng.choice([0.0, rng.uniform(0.5, 50)]) for _ in range(rng.randint(1, 4))] for _ in range(500)
+    ]
+    prices, mask = build_price_matrix(price_rows)
+    averages, deviations, flags = calculate_price_discrepancies(prices, mask)
+    for i, row in enumerate(price_rows):
+        average, deviation, flag = calculate_price_discrepancy(row)
+        assert (averages[i], deviations[i], flags[i]) == (average, deviation, flag)
+
+
+def test_confidence_tiers():
+    tiers = assign_confidence_tiers(np.array([2, 2, 1, 3]), np.array([False, True, False, False]))
+    assert [CONFIDENCE_TIERS[t] for t in tiers] == [CONFIDENCE_HIGH, CONFIDENCE_MEDIUM, CONFIDENCE_LOW, CONFIDENCE_HIGH]
+
+
+def make_sources(seed: int = 0, count: int = 300) -> tuple[list[MedicineRecord], list[MedicineRecord]]:
+    rng = random.Random(seed)
+    brands = [f"Brand{i}" for i in range(count)]
+    strengths = ["500 mg", "250 mg", "10 mg"]
+    medex = [
+        record(rng.choice(brands), rng.choice(strengths), round(rng.uniform(1, 20), 2),
+               generic_name="Paracetamol", manufacturer="Beximco", indication="Fever", source="medex")
+        for _ in range(count)
+    ]
+    dgda = [
+        record(rng.choice(brands), rng.choice(strengths), rng.choice([0.0, round(rng.uniform(1, 20), 2)]),
+               generic_name="Paracetamol", manufacturer="Square", source="dgda")
+        for _ in range(count)
+    ]
+    # Spelling variants for the fuzzy pass
+    dgda += [record(f"Brnd{i}x", "500 mg", 5.0, source="dgda") for i in range(20)]
+    return medex, dgda
+
+
+@pytest.mark.parametrize("fuzzy_threshold", [None, MATCH_THRESHOLD])
+def test_sharded_run_matches_single_process(fuzzy_threshold):
+    medex, dgda = make_sources()
+    single = cross_verify_rows(medex, dgda, fuzzy_threshold)
+    sharded = cross_verify_sharded(medex, dgda, workers=3, fuzzy_threshold=fuzzy_threshold)
+    assert sharded == single
+
+
+def saved_state(path, medex, dgda) -> VerifyState:
+    state = VerifyState(path)
+    upserts = {}
+    for (source, position), verified_med, discrepancy in cross_verify_rows(medex, dgda):
+        origin = (medex, dgda)[source][position]
+        upserts[origin.get_match_key()] = state_row(origin, source, verified_med, discrepancy)
+    state.save(upserts, (), {"price_tolerance": "0.1"}, replace=True)
+    return state
+
+
+def test_verify_state_round_trip(tmp_path):
+    medex, dgda = make_sources()
+    state = saved_state(tmp_path / "state.db", medex, dgda)
+    rows = state.load_rows()
+    assert state.load_meta() == {"price_tolerance": "0.1"}
+    for (source, position), verified_med, discrepancy in cross_verify_rows(medex, dgda):
+        origin = (medex, dgda)[source][position]
+        assert rows[origin.get_match_key()] == state_row(origin, source, verified_med, discrepancy)
+    state.close()
+
+
+def test_incremental_run_matches_full_run(tmp_path):
+    medex, dgda = make_sources()
+    state = saved_state(tmp_path / "state.db", medex, dgda)
+
+    # Change a price, drop a record, add one and move two
+    new_medex = list(medex)
+    new_medex[5] = record(medex[5].brand_name, medex[5].strength, medex[5].unit_price + 1,
+                          generic_name="Paracetamol", manufacturer="Beximco", source="medex")
+    del new_medex[17]
+    new_medex.append(record("Brand9999", "500 mg", 3.0, source="medex"))
+    new_medex[40], new_medex[41] = new_medex[41], new_medex[40]
+    new_dgda = dgda[:-1]
+    touched = {r.get_match_key() for r in (new_medex[5], medex[17], new_medex[-1], dgda[-1])}
+
+    rows, upserts, deleted = cross_verify_incremental(new_medex, new_dgda, state.load_rows(), touched)
+    assert rows == cross_verify_rows(new_medex, new_dgda)
+    assert len(upserts) < len(rows)
+
+    state.save(upserts, deleted, {})
+    again, upserts, deleted = cross_verify_incremental(new_medex, new_dgda, state.load_rows(), set())
+    assert again == rows and not upserts and not deleted
+    state.close()
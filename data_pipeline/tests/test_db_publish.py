@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from db_publish import open_copy, publish, transform
+
+
+def database(path, *values):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (value TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?)", ((value,) for value in values))
+    conn.commit()
+    conn.close()
+    return path
+
+
+def values(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [value for value, in conn.execute("SELECT value FROM t ORDER BY rowid")]
+    finally:
+        conn.close()
+
+
+def test_publish_replaces_target(tmp_path):
+    target = database(tmp_path / "medicines.db", "old")
+    reader = sqlite3.connect(target)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (value TEXT)")
+    conn.execute("INSERT INTO t VALUES ('new')")  # Uncommitted: publish commits first
+    publish(conn, target)
+    assert values(target) == ["new"]
+    # A reader of the old file still sees a whole database, not a mix
+    assert reader.execute("SELECT value FROM t").fetchall() == [("old",)]
+    assert [path.name for path in tmp_path.iterdir()] == ["medicines.db"]
+
+
+def test_publish_creates_directory(tmp_path):
+    conn = open_copy(database(tmp_path / "source.db", "a"))
+    publish(conn, tmp_path / "assets" / "db" / "medicines.db")
+    assert values(tmp_path / "assets" / "db" / "medicines.db") == ["a"]
+
+
+def test_open_copy_leaves_source_alone(tmp_path):
+    path = database(tmp_path / "medicines.db", "a")
+    conn = open_copy(path)
+    conn.execute("INSERT INTO t VALUES ('b')")
+    conn.commit()
+    assert values(path) == ["a"]
+    with pytest.raises(FileNotFoundError):
+        open_copy(tmp_path / "missing.db")
+
+
+def test_transform_publishes_on_success(tmp_path):
+    path = database(tmp_path / "medicines.db", "a")
+    with transform(path) as conn:
+        conn.execute("UPDATE t SET value = 'b'")
+    assert values(path) == ["b"]
+
+    copy = tmp_path / "copy.db"
+    with transform(path, copy) as conn:
+        conn.execute("INSERT INTO t VALUES ('c')")
+    assert values(path) == ["b"] and values(copy) == ["b", "c"]
+
+
+def test_failed_transform_keeps_database(tmp_path):
+    path = database(tmp_path / "medicines.db", "a")
+    with pytest.raises(RuntimeError):
+        with transform(path) as conn:
+            conn.execute("DELETE FROM t")
+            raise RuntimeError("interrupted")
+    assert values(path) == ["a"]
+    assert [path.name for path in tmp_path.iterdir()] == ["medicines.db"]
@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+
+from fuzzy_match import MAX_QUERY_LENGTH, BatchMatcher
+from update_real_prices import match_price
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    longest = max(len(a), len(b))
+    return 1 - levenshtein(a, b) / longest if longest else 1.0
+
+
+def random_words(rng: random.Random, count: int, max_length: int) -> list[str]:
+    return ["".join(rng.choice("abcde ") for _ in range(rng.randint(0, max_length))) for _ in range(count)]
+
+
+def test_distances_match_naive_levenshtein():
+    rng = random.Random(11)
+    candidates = random_words(rng, 300, 20)
+    matcher = BatchMatcher(candidates)
+    for query in random_words(rng, 40, 20) + ["x" * (MAX_QUERY_LENGTH + 5), "abcdefg" * 10]:
+        expected = [levenshtein(query, candidate) for candidate in candidates]
+        assert matcher.distances(query).tolist() == expected
+
+
+def test_top_k_matches_naive_ranking():
+    rng = random.Random(5)
+    candidates = random_words(rng, 200, 12)
+    matcher = BatchMatcher(candidates)
+    for query in random_words(rng, 30, 12):
+        for min_score in (0.0, 0.5, 0.8):
+            ranked = sorted(
+                (i for i, c in enumerate(candidates) if similarity(query, c) >= min_score),
+                key=lambda i: (-similarity(query, candidates[i]), i),
+            )[:3]
+            result = matcher.top_k(query, k=3, min_score=min_score)
+            assert [index for _, _, index in result] == ranked
+            assert np.allclose([score for _, score, _ in result], [similarity(query, candidates[i]) for i in ranked])
+
+
+def test_empty_matcher():
+    assert BatchMatcher([]).top_k("napa") == []
+
+
+def test_fuzzy_price_matches_stay_within_the_manufacturer():
+    prices = {"napa extra": 2.5, "napa extend": 3.0}
+    by_mfr = {"beximco": {"napa extra"}, "square": {"napa extend"}}
+    matchers = {}
+    assert match_price("napa extra", "square", prices, by_mfr, matchers) == (2.5, False)
+    assert match_price("napa extr", "beximco", prices, by_mfr, matchers) == (2.5, True)
+    assert match_price("napa extr", "square", prices, by_mfr, matchers) is None
+    assert match_price("napa extr", "unknown", prices, by_mfr, matchers) is None
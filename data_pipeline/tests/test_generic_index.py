@@ -0,0 +1,91 @@
+import pytest
+
+from generic_index import GenericCanonicalizer, GenericIndex, SynonymTable, build_generic_index, split_ingredients
+
+
+@pytest.fixture(scope="module")
+def canonicalizer():
+    return GenericCanonicalizer()
+
+
+def test_split_ingredients_respects_brackets():
+    assert split_ingredients("Belgiri [Bael fruit + Connessi bark] + Ispaghula") == [
+        "Belgiri [Bael fruit + Connessi bark] ", " Ispaghula"]
+
+
+@pytest.mark.parametrize("spellings", [
+    ("Losartan Potassium + Hydrochlorothiazide", "Hydrochlorothiazide + Losartan Potassium"),
+    ("Salbutamol Sulphate", "Salbutamol Sulfate", "Albuterol Sulfate"),
+    ("Metformin HCl", "Metformin Hydrochloride"),
+    ("Amoxicillin Trihydrate BP", "Amoxicillin"),
+])
+def test_spellings_share_a_key(canonicalizer, spellings):
+    assert len({canonicalizer.key(spelling) for spelling in spellings}) == 1
+
+
+@pytest.mark.parametrize("salt_forms", [
+    ("Diclofenac Sodium", "Diclofenac Potassium", "Diclofenac"),
+    ("Betahistine Mesylate", "Betahistine Dihydrochloride"),
+])
+def test_salt_forms_keep_their_keys(canonicalizer, salt_forms):
+    assert len({canonicalizer.key(spelling) for spelling in salt_forms}) == len(salt_forms)
+    assert len({canonicalizer.bare_key(spelling) for spelling in salt_forms}) == 1
+
+
+@pytest.mark.parametrize("bare, ester", [
+    ("Prednisolone", "Prednisolone Acetate"),
+    ("Hydrocortisone", "Hydrocortisone Acetate"),
+    ("Methylprednisolone", "Methylprednisolone Acetate"),
+])
+def test_esters_are_not_salt_forms(canonicalizer, bare, ester):
+    assert canonicalizer.bare_key(ester) != canonicalizer.bare_key(bare)
+
+
+def test_cations_and_qualifiers_are_kept(canonicalizer):
+    assert canonicalizer.key("Ferrous Sulphate") == "ferrous sulfate"
+    assert canonicalizer.bare_key("Ferrous Sulphate Monohydrate") == "ferrous sulfate"
+    assert canonicalizer.key("Salbutamol (Inhaler)") != canonicalizer.key("Salbutamol")
+    assert canonicalizer.key("Vitamin C [Ascorbic Acid]") == canonicalizer.key("Vitamin C")
+
+
+def test_synonyms():
+    canonicalizer = GenericCanonicalizer(SynonymTable(synonyms={"acetaminophen": "paracetamol"}))
+    assert canonicalizer.key("Acetaminophen") == canonicalizer.key("Paracetamol")
+
+
+@pytest.mark.parametrize("spellings, generics", [
+    # A salt form joins a bare name already present
+    (["Losartan", "Losartan Potassium"], [["Losartan", "Losartan Potassium"]]),
+    (["Losartan Potassium", "Losartan"], [["Losartan Potassium"], ["Losartan"]]),
+    # Only one salt form does
+    (["Diclofenac", "Diclofenac Sodium", "Diclofenac Potassium", "Diclofenac Sodium BP"],
+     [["Diclofenac", "Diclofenac Sodium", "Diclofenac Sodium BP"], ["Diclofenac Potassium"]]),
+    # No bare name, nothing to fold into
+    (["Betahistine Dihydrochloride", "Betahistine Mesylate"],
+     [["Betahistine Dihydrochloride"], ["Betahistine Mesylate"]]),
+    (["Prednisolone", "Prednisolone Acetate"], [["Prednisolone"], ["Prednisolone Acetate"]]),
+])
+def test_index_folds_one_salt_form_into_a_present_bare_name(canonicalizer, spellings, generics):
+    index = build_generic_index(spellings, canonicalizer)
+    groups = {}
+    for spelling, key in index.items():
+        groups.setdefault(key, []).append(spelling)
+    assert list(groups.values()) == generics
+
+
+def test_index_continues_from_placed_spellings(canonicalizer):
+    index = GenericIndex(canonicalizer)
+    index.add("Diclofenac Sodium", "diclofenac")
+    index.add("Diclofenac", "diclofenac")
+    assert index.resolve("Diclofenac Potassium") == "diclofenac potassium"
+    assert index.resolve("Diclofenac Sodium BP") == "diclofenac"
+
+    index = GenericIndex(canonicalizer)
+    index.add("Losartan", "losartan")
+    assert index.resolve("Losartan Potassium") == "losartan"
+    assert index.resolve("Losartan Sodium") == "losartan sodium"
+
+
+def test_build_generic_index(canonicalizer):
+    index = build_generic_index(["Diclofenac Sodium", "Diclofenac Sodium", "Diclofenac Potassium"], canonicalizer)
+    assert index == {"Diclofenac Sodium": "diclofenac sodium", "Diclofenac Potassium": "diclofenac potassium"}
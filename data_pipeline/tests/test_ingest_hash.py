@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import ingest_hash
+from ingest_hash import IngestTracker, content_hash, load_touched_keys, normalize_field
+
+
+def test_normalize_field_collapses_whitespace():
+    assert normalize_field("  Napa \t 500  mg ") == "Napa 500 mg"
+    assert normalize_field(None) == ""
+    assert normalize_field(12) == "12"
+
+
+def test_prices_below_a_cent_hash_differently():
+    assert normalize_field(1.0) != normalize_field(1.004)
+    assert content_hash(["Napa", 1.001]) != content_hash(["Napa", 1.004])
+    assert content_hash(["Napa", 0.1 + 0.2]) == content_hash(["Napa", 0.30000000000000004])
+
+
+def test_state_dir_is_anchored_to_the_scripts():
+    assert ingest_hash.INGEST_STATE_DIR == Path(ingest_hash.__file__).parent / "output" / "ingest_state"
+
+
+def test_exact_duplicates_are_collapsed(tmp_path):
+    tracker = IngestTracker("test", tmp_path)
+    assert tracker.admit("napa", ["Napa", " 500 mg", 1.5])
+    assert not tracker.admit("napa", ["Napa", "500  mg ", 1.5])
+    assert tracker.admit("napa", ["Napa", "500 mg", 2.0])
+    assert tracker.duplicates == 1
+    assert len(tracker.current_hashes()) == 1
+
+
+def test_changes_against_the_previous_run(tmp_path):
+    first = IngestTracker("test", tmp_path)
+    for key, price in [("a", 1.0), ("b", 2.0), ("c", 3.0)]:
+        first.admit(key, [key, price])
+    changes = first.finish()
+    assert changes.first_run and changes.new == {"a", "b", "c"}
+    assert load_touched_keys("test", tmp_path) is None
+
+    second = IngestTracker("test", tmp_path)
+    for key, price in [("a", 1.0), ("b", 2.001), ("d", 4.0)]:
+        second.admit(key, [key, price])
+    changes = second.finish()
+    assert not changes.first_run
+    assert (changes.new, changes.changed, changes.unchanged, changes.deleted) == ({"d"}, {"b"}, {"a"}, {"c"})
+    assert load_touched_keys("test", tmp_path) == {"b", "c", "d"}
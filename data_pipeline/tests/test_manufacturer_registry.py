@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from manufacturer_registry import (
+    Manufacturer,
+    ManufacturerRegistry,
+    core_name,
+    load_registry,
+    normalize_company,
+    seed_registry,
+)
+
+
+@pytest.fixture
+def registry():
+    return ManufacturerRegistry([
+        Manufacturer(73, "Square Pharmaceuticals Ltd.", "square-pharmaceuticals-ltd-73", ["SQPL"]),
+        Manufacturer(14, "Beximco Pharmaceuticals Ltd.", "beximco-pharmaceuticals-ltd-14"),
+        Manufacturer(50, "Novo Nordisk", "novo-nordisk-50"),
+        Manufacturer(60, "Radiant Pharmaceuticals Ltd.", "radiant-pharmaceuticals-ltd-60"),
+        Manufacturer(61, "Radiant Laboratories Ltd.", "radiant-laboratories-ltd-61"),
+    ])
+
+
+def test_normalized_and_core_names():
+    assert normalize_company("  Square  Pharma. ") == "square pharma"
+    assert core_name("Beximco Pharmaceuticals Ltd.") == "beximco"
+    assert core_name("Incepta Pharmaceuticals Ltd, Dhaka") == "incepta"
+
+
+@pytest.mark.parametrize("company, manufacturer_id", [
+    ("Square Pharmaceuticals Ltd.", 73),
+    ("SQUARE", 73),
+    ("sqpl", 73),
+    ("Beximco Pharma", 14),
+    ("NovoNordisk", 50),
+    ("RADIANT PHARMACEUTICALS LTD", 60),
+])
+def test_resolve(registry, company, manufacturer_id):
+    assert registry.resolve(company).id == manufacturer_id
+
+
+def test_unknown_and_ambiguous_companies_do_not_resolve(registry):
+    assert registry.resolve("Acme Labs") is None
+    assert registry.resolve("Radiant") is None  # Core name of two manufacturers
+    assert registry.canonical_name("Acme Labs") == "Acme Labs"
+    assert registry.canonical_name("beximco") == "Beximco Pharmaceuticals Ltd."
+
+
+def test_seed_collapses_whitespace_and_keeps_aliases(tmp_path):
+    path = tmp_path / "manufacturers.json"
+    path.write_text(json.dumps({"manufacturers": [
+        {"id": 1, "name": "Old Name", "slug": "old-1", "aliases": ["OLD"]},
+    ]}), encoding="utf-8")
+    csv_path = tmp_path / "manufacturer.csv"
+    csv_path.write_text(
+        "manufacturer id,manufacturer name,slug\n"
+        "1,Chemist Laboratories  Ltd.,chemist-laboratories-ltd-1\n"
+        "2, Bronson  Laboratories (BD) Ltd. ,bronson-laboratories-bd-ltd-2\n",
+        encoding="utf-8",
+    )
+    registry = seed_registry(csv_path, path)
+    assert [m.name for m in registry.manufacturers.values()] == [
+        "Chemist Laboratories Ltd.", "Bronson Laboratories (BD) Ltd."]
+    assert load_registry(path).resolve("old").id == 1
+
+
+def test_shipped_names_have_single_spaces():
+    for manufacturer in load_registry().manufacturers.values():
+        assert manufacturer.name == " ".join(manufacturer.name.split())
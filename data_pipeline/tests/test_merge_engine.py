@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from cross_verify import RECORD_FIELDS_OF, MedicineRecord, cross_verify_rows
+from merge_engine import external_sort, merge_streams, merge_verify, precedence_order
+from test_cross_verify import make_sources
+
+
+def unique(records: list[MedicineRecord]) -> list[MedicineRecord]:
+    """Records without exact duplicates, as the loaders admit them."""
+    seen = set()
+    return [r for r in records if not (RECORD_FIELDS_OF(r) in seen or seen.add(RECORD_FIELDS_OF(r)))]
+
+
+def test_external_sort_is_stable_across_runs():
+    rng = random.Random(2)
+    records = [MedicineRecord(brand_name=rng.choice("abcdef"), unit_price=i) for i in range(500)]
+    result = list(external_sort(records, chunk_size=37))
+    expected = sorted(records, key=lambda r: r.get_match_key())
+    assert [key for key, _ in result] == [r.get_match_key() for r in expected]
+    assert [r.unit_price for _, r in result] == [r.unit_price for r in expected]
+
+
+def test_merge_streams_rejects_unsorted_sources():
+    records = [MedicineRecord(brand_name="b"), MedicineRecord(brand_name="a")]
+    with pytest.raises(ValueError):
+        list(merge_streams({"medex": ((r.get_match_key(), r) for r in records)}))
+
+
+def test_precedence_order():
+    assert precedence_order(["medex", "dgda", "kaggle"], ["dgda", "missing"]) == ["dgda", "medex", "kaggle"]
+
+
+def test_two_source_merge_matches_cross_verify():
+    medex, dgda = (unique(records) for records in make_sources(seed=4))
+    expected = {}
+    for (source, position), verified_med, discrepancy in cross_verify_rows(medex, dgda):
+        expected[(medex, dgda)[source][position].get_match_key()] = (verified_med, discrepancy)
+
+    streams = {"medex": external_sort(medex, chunk_size=64), "dgda": external_sort(dgda, chunk_size=50)}
+    rows = list(merge_verify(streams, price_precedence=["dgda", "medex"], batch_size=40))
+    assert [key for key, _, _ in rows] == sorted(expected)
+    assert {key: (verified_med, discrepancy) for key, verified_med, discrepancy in rows} == expected
@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+
+from build_db import create_tables
+from monograph_store import MonographStore, compress, decompress, text_hash, train_dictionary
+
+SHARED = "May cause drowsiness; do not drive or operate machinery."
+TEXTS = [
+    f"Relief of fever and mild to moderate pain. {SHARED}",
+    f"Allergic rhinitis and urticaria. {SHARED}",
+    "Gastric and duodenal ulcer, reflux oesophagitis.",
+    "ঔষধটি জ্বর ও ব্যথা কমায়। Take with food.",
+]
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    return conn.cursor()
+
+
+def test_dictionary_holds_shared_phrases():
+    dictionary = train_dictionary(TEXTS)
+    assert SHARED.encode("utf-8") in dictionary
+    assert b"Gastric" not in dictionary  # Only in one text
+    assert len(train_dictionary(TEXTS * 100, size=40)) <= 40
+
+
+@pytest.mark.parametrize("dictionary", [b"", train_dictionary(TEXTS)])
+@pytest.mark.parametrize("text", TEXTS + ["", "x"])
+def test_compress_round_trip(text, dictionary):
+    assert decompress(compress(text, dictionary), dictionary) == text
+
+
+def test_dictionary_shrinks_shared_text():
+    dictionary = train_dictionary(TEXTS)
+    assert len(compress(TEXTS[1], dictionary)) < len(compress(TEXTS[1], b""))
+
+
+def test_write_read_round_trip(cursor):
+    store = MonographStore(cursor)
+    store.write([
+        (1, {"indication": TEXTS[0], "side_effects": TEXTS[1]}),
+        (2, {"indication": TEXTS[1], "side_effects": ""}),
+        (3, {"indication": TEXTS[3], "side_effects": TEXTS[2]}),
+    ])
+    assert MonographStore(cursor).read([1, 3]) == {
+        1: {"indication": TEXTS[0], "dosage_info": "", "side_effects": TEXTS[1], "contraindication": ""},
+        3: {"indication": TEXTS[3], "dosage_info": "", "side_effects": TEXTS[2], "contraindication": ""},
+    }
+    assert MonographStore(cursor).read()[2]["indication"] == TEXTS[1]
+    # Every distinct text stored once, content-addressed
+    cursor.execute("SELECT hash FROM monograph_texts ORDER BY id")
+    assert [row[0] for row in cursor.fetchall()] == [text_hash(text) for text in TEXTS[:2] + [TEXTS[3], TEXTS[2]]]
+
+
+def test_unchanged_monographs_are_skipped(cursor):
+    store = MonographStore(cursor)
+    store.write([(1, {"indication": TEXTS[0]}), (2, {"indication": TEXTS[2]})])
+    store = MonographStore(cursor)
+    store.write([(1, {"indication": TEXTS[0]}), (2, {"indication": TEXTS[2]})])
+    assert store.written_bytes == 0
+    assert cursor.connection.total_changes == 5  # Dictionary, two texts, two monographs
+    store.write([(1, {"indication": TEXTS[0]}), (2, {"indication": TEXTS[1]})])
+    assert cursor.connection.total_changes == 7  # One text, one monograph
+    assert store.read([2])[2]["indication"] == TEXTS[1]
+
+
+def test_later_writes_keep_the_dictionary(cursor):
+    MonographStore(cursor).write([(1, {"indication": TEXTS[0]})])
+    cursor.execute("SELECT data FROM monograph_dictionary")
+    dictionary = cursor.fetchall()
+    MonographStore(cursor).write([(2, {"indication": TEXTS[1]}), (3, {"indication": TEXTS[2]})])
+    cursor.execute("SELECT data FROM monograph_dictionary")
+    assert cursor.fetchall() == dictionary
+    assert MonographStore(cursor).read([1])[1]["indication"] == TEXTS[0]
+
+
+def test_prune(cursor):
+    cursor.executemany("INSERT INTO generics (id, name) VALUES (?, ?)", [(1, "Paracetamol"), (2, "Cetirizine")])
+    store = MonographStore(cursor)
+    store.write([(1, {"indication": TEXTS[0]}), (2, {"indication": TEXTS[1]}), (3, {"indication": TEXTS[2]})])
+    store.write([(2, {"indication": TEXTS[0]})])
+    store.prune()
+    assert set(store.read()) == {1, 2}
+    cursor.execute("SELECT hash FROM monograph_texts")
+    assert [row[0] for row in cursor.fetchall()] == [text_hash(TEXTS[0])]
+    # Pruned texts are stored again when they come back
+    store.write([(2, {"indication": TEXTS[1]})])
+    assert store.read([2])[2]["indication"] == TEXTS[1]
@@ -0,0 +1,64 @@
+import csv
+
+import pytest
+
+from near_duplicates import completeness, find_near_duplicates, price_of, write_merge_plan
+
+
+def record(brand, generic="Paracetamol", price="1.0", **fields):
+    return {
+        "brand_name": brand,
+        "generic_name": generic,
+        "manufacturer": "Square Pharmaceuticals Ltd.",
+        "strength": "",
+        "dosage_form": "Tablet",
+        "price": price,
+        **fields,
+    }
+
+
+def test_spelling_variants_cluster():
+    records = [record("Napa Extra"), record("Napa-Extra"), record("NAPA EXTRA"), record("Ace Plus")]
+    assert find_near_duplicates(records) == [[0, 1, 2]]
+
+
+def test_brand_family_with_different_generics_does_not_cluster():
+    records = [
+        record("Aristovit X", "Multivitamin & Multimineral"),
+        record("Aristovit M", "Multivitamin"),
+        record("Aristovit B", "Vitamin B Complex"),
+        record("Aristovit-B", "Vitamin B Complex"),
+    ]
+    assert find_near_duplicates(records) == [[2, 3]]
+
+
+def test_generic_spellings_still_cluster():
+    records = [record("Sultolin", "Salbutamol Sulphate"), record("Sultolin", "Salbutamol Sulfate BP")]
+    assert find_near_duplicates(records) == [[0, 1]]
+
+
+def test_salt_forms_do_not_cluster():
+    records = [record("Clofenac", "Diclofenac Sodium"), record("Clofenac", "Diclofenac Potassium")]
+    assert find_near_duplicates(records) == []
+
+
+@pytest.mark.parametrize("price, expected", [
+    ("4.5", 4.5), ("0.0", float("inf")), ("0", float("inf")), ("-1", float("inf")),
+    ("", float("inf")), (None, float("inf")), ("n/a", float("inf")),
+])
+def test_price_of(price, expected):
+    assert price_of({"price": price}) == expected
+
+
+def test_completeness_ignores_zero_placeholders():
+    assert completeness({"brand_name": "Napa", "price": "0.0", "strength": "", "pack": None}) == 1
+    assert completeness({"brand_name": "Napa", "price": "2.5", "rank": 3}) == 3
+
+
+def test_merge_plan_keeps_priced_record(tmp_path):
+    records = [record("Napa Extra", price="0.0"), record("Napa-Extra", price="2.5"), record("NAPA EXTRA", price="3")]
+    path = tmp_path / "merge_plan.csv"
+    write_merge_plan(records, find_near_duplicates(records), path)
+    with open(path, newline="", encoding="utf-8") as f:
+        actions = {int(row["row"]): (row["action"], int(row["keep_row"])) for row in csv.DictReader(f)}
+    assert actions == {0: ("merge", 1), 1: ("keep", 1), 2: ("merge", 1)}
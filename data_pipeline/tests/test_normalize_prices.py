@@ -0,0 +1,85 @@
+import math
+import sqlite3
+
+import numpy as np
+import pytest
+
+from normalize_prices import (
+    FLAGS, find_price_flags, form_group, grouped_median, normalize_strength, pack_count, write_flags,
+)
+
+
+@pytest.mark.parametrize("form, group", [
+    ("Tablet (Film Coated)", "oral solid"), ("IV Infusion", "injection"),
+    ("Ophthalmic Solution", "eye"), ("Powder", "powder"), (None, ""),
+])
+def test_form_group(form, group):
+    assert form_group(form) == group
+
+
+@pytest.mark.parametrize("pack, count", [("30's pack", 30.0), ("10 x 10", 100.0), ("3 X 4's", 12.0)])
+def test_pack_count(pack, count):
+    assert pack_count(pack) == count
+
+
+def test_pack_count_unknown():
+    assert math.isnan(pack_count("100 ml bottle"))
+    assert normalize_strength(" 500 Mg ") == "500mg"
+
+
+def test_grouped_median_matches_numpy():
+    rng = np.random.default_rng(0)
+    groups = rng.integers(0, 20, 1000)
+    values = rng.normal(size=1000)
+    medians, sizes = grouped_median(groups, values, 22)
+    for group in range(20):
+        assert medians[group] == pytest.approx(np.median(values[groups == group]))
+        assert sizes[group] == (groups == group).sum()
+    assert np.isnan(medians[20:]).all() and (sizes[20:] == 0).all()
+
+
+def flag(prices, packs=None, generic_ids=None):
+    prices = np.array(prices, dtype=np.float64)
+    count = len(prices)
+    result = find_price_flags(
+        np.zeros(count, dtype=np.int64) if generic_ids is None else np.array(generic_ids),
+        ["500 mg"] * count,
+        ["Tablet"] * count,
+        prices,
+        np.full(count, np.nan) if packs is None else np.array(packs, dtype=np.float64),
+    )
+    return [FLAGS[code] for code in result.flags], result
+
+
+def test_outliers_and_scale_errors():
+    prices = [10, 11, 9, 10, 10.5, 9.5, 1000, 300, 0.1, 25, math.nan, 0]
+    packs = [math.nan] * 7 + [30] + [math.nan] * 4
+    flags, result = flag(prices, packs)
+    assert flags == ["", "", "", "", "", "", "paisa", "pack_price", "low", "", "missing", "missing"]
+    assert result.suggested[6] == pytest.approx(10)
+    assert result.suggested[7] == pytest.approx(10)
+    assert math.isnan(result.suggested[8])
+    assert result.medians[0] == pytest.approx(math.sqrt(10 * 10.5))  # Geometric middle of 10 priced rows
+
+
+def test_small_groups_are_not_judged():
+    flags, result = flag([10, 10, 10, 1000, 10, 10], generic_ids=[0, 0, 0, 0, 1, 1])
+    assert flags == [""] * 6
+    assert np.isnan(result.z_scores).all()
+
+
+def test_identical_prices_are_not_flagged():
+    flags, _ = flag([10] * 8 + [12])
+    assert flags == [""] * 9
+
+
+def test_write_flags_replaces_table():
+    conn = sqlite3.connect(":memory:")
+    prices = np.array([10, 11, 9, 10, 10.5, 1000, math.nan])
+    _, result = flag(prices)
+    brand_ids = np.arange(1, len(prices) + 1)
+    write_flags(conn, brand_ids, prices, result)
+    rows = write_flags(conn, brand_ids, prices, result)
+    assert conn.execute("SELECT brand_id, flag, price, suggested_price FROM price_flags").fetchall() == [
+        (6, "paisa", 1000.0, 10.0), (7, "missing", None, None)]
+    assert len(rows) == 2
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from package_price import extract_price
+
+
+@pytest.mark.parametrize("text, price", [
+    ("100 ml bottle: ৳ 40.12", 40.12),
+    ("Unit Price: ৳ 5.00 (10 x 10: ৳ 500.00)", 5.0),
+    ("10 x 10: ৳ 1,200.50", 1200.5),
+    ("৳ 1.2.3", None),
+    ("100 ml bottle", None),
+    ("", None),
+    (None, None),
+])
+def test_extract_price(text, price):
+    assert extract_price(text) == price
+
+
+def test_source_adapters_import_no_script():
+    # update_real_prices.py reconfigures stdout when imported
+    code = "import sys, source_adapters; assert 'update_real_prices' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parents[1], check=True)
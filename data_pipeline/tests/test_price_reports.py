@@ -0,0 +1,101 @@
+import random
+import statistics
+
+import pytest
+
+from cross_verify import CONFIDENCE_HIGH, CONFIDENCE_LOW, CONFIDENCE_MEDIUM
+from price_reports import (
+    EXACT_MEDIAN_REPORTS,
+    MIN_REPORTS,
+    SECONDS_PER_DAY,
+    PriceReport,
+    PriceReportStore,
+    ReportAggregate,
+    fold_reports,
+    parse_report,
+    report_key,
+    update_store,
+)
+
+NOW = 1_700_000_000.0
+
+
+def aggregate_of(prices, start=NOW, spacing=60.0) -> ReportAggregate:
+    aggregate = ReportAggregate()
+    for i, price in enumerate(prices):
+        aggregate.add(price, start + i * spacing)
+    return aggregate
+
+
+def test_median_is_exact_until_the_switch():
+    rng = random.Random(0)
+    prices = [rng.lognormvariate(3, 0.5) for _ in range(EXACT_MEDIAN_REPORTS - 1)]
+    aggregate = ReportAggregate()
+    for count, price in enumerate(prices, 1):
+        aggregate.add(price, NOW)
+        assert aggregate.median == statistics.median(prices[:count])
+    assert aggregate.n is None
+
+
+def test_p2_median_tracks_the_exact_median():
+    for seed in range(20):
+        rng = random.Random(seed)
+        prices = [rng.lognormvariate(4, 0.3) for _ in range(1000)]
+        aggregate = aggregate_of(prices)
+        assert aggregate.n is not None
+        exact = statistics.median(prices)
+        assert abs(aggregate.median - exact) / exact < 0.05
+
+
+def test_recent_mean_weights_newer_reports():
+    aggregate = ReportAggregate()
+    aggregate.add(10.0, NOW)
+    aggregate.add(20.0, NOW + 30 * SECONDS_PER_DAY)  # One half-life later
+    assert aggregate.recent_mean == pytest.approx((0.5 * 10 + 20) / 1.5)
+    assert aggregate.weight_at(NOW + 60 * SECONDS_PER_DAY) == pytest.approx(0.75)
+
+
+@pytest.mark.parametrize("count", [1, 4, EXACT_MEDIAN_REPORTS - 1, EXACT_MEDIAN_REPORTS, 500])
+def test_row_round_trip(count):
+    rng = random.Random(count)
+    aggregate = aggregate_of([rng.uniform(1, 100) for _ in range(count)])
+    restored = ReportAggregate.from_row(aggregate.to_row())
+    assert restored == aggregate
+    restored.add(50.0, NOW)
+    aggregate.add(50.0, NOW)
+    assert restored == aggregate
+
+
+def test_store_folds_only_new_reports(tmp_path):
+    store = PriceReportStore(tmp_path / "reports.db")
+    reports = [PriceReport(str(i), "napa|1.50", 1.5 + i / 100, NOW + i) for i in range(10)]
+    update_store(store, reports[:6])
+    assert store.watermark() == (NOW + 5, "5")
+    update_store(store, reports[6:])
+    assert store.load(["napa|1.50"])["napa|1.50"] == aggregate_of([r.price_paid for r in reports], spacing=1.0)
+    store.close()
+
+
+def test_parse_report():
+    row = {"id": 7, "medicine_name": "Napa Extra", "mrp": "2.5", "price_paid": "2.4",
+           "created_at": "2024-01-02T03:04:05Z"}
+    report = parse_report(row)
+    assert report.key == report_key("Napa Extra", 2.5) == "napaextra|2.50"
+    assert parse_report({**row, "price_paid": "0"}) is None
+    assert parse_report({**row, "created_at": "yesterday"}) is None
+
+
+def test_fold_rules():
+    agreeing = aggregate_of([10.0, 10.2, 9.9])
+    assert fold_reports(10.0, CONFIDENCE_MEDIUM, agreeing, NOW) == (10.0, CONFIDENCE_HIGH)
+    assert fold_reports(None, CONFIDENCE_LOW, agreeing, NOW) == (10.0, CONFIDENCE_LOW)
+    # Too few reports: untouched
+    assert fold_reports(20.0, CONFIDENCE_HIGH, aggregate_of([10.0] * (MIN_REPORTS - 1)), NOW) == (
+        20.0, CONFIDENCE_HIGH)
+    # Disagreeing reports lower a multi-source price, but replace a single-source one
+    assert fold_reports(20.0, CONFIDENCE_HIGH, agreeing, NOW) == (20.0, CONFIDENCE_MEDIUM)
+    assert fold_reports(20.0, CONFIDENCE_LOW, agreeing, NOW) == (10.03, CONFIDENCE_LOW)
+    # ... unless they are stale
+    stale = NOW + 120 * SECONDS_PER_DAY
+    assert fold_reports(20.0, CONFIDENCE_LOW, agreeing, stale) == (20.0, CONFIDENCE_LOW)
+
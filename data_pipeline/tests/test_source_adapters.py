@@ -0,0 +1,68 @@
+import json
+import pickle
+
+import pytest
+
+from source_adapters import SOURCES_CONFIG, SourceAdapter, load_concurrently, load_sources, ranked_names
+
+
+def count_records(adapter: SourceAdapter) -> int:
+    return sum(1 for _ in adapter.records())
+
+
+@pytest.fixture
+def config(tmp_path):
+    (tmp_path / "prices.csv").write_text(
+        "medicine_name,dosage_mg,company,price\nNapa,500,Beximco,1.5\nSeclo,,Square,\n", encoding="utf-8"
+    )
+    (tmp_path / "kaggle.csv").write_text(
+        "brand name,package container\nAce,\"100 ml bottle: ৳ 40.12\"\n", encoding="utf-8"
+    )
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps({"sources": [
+        {"name": "prices", "path": "prices.csv", "price_precedence": 2,
+         "fields": {"brand_name": "medicine_name", "strength": "{dosage_mg} mg",
+                    "manufacturer": "company", "unit_price": "price"}},
+        {"name": "kaggle", "path": "kaggle.csv", "price_precedence": 1, "price_format": "package",
+         "fields": {"brand_name": "brand name", "unit_price": "package container"}},
+    ]}), encoding="utf-8")
+    return path
+
+
+def test_load_sources_resolves_paths_against_the_config(config):
+    adapters = load_sources(config)
+    assert list(adapters) == ["prices", "kaggle"]
+    assert adapters["prices"].path == config.parent / "prices.csv"
+
+
+def test_rows_become_records(config):
+    adapters = load_sources(config)
+    napa, seclo = adapters["prices"].records()
+    assert (napa.brand_name, napa.strength, napa.manufacturer, napa.unit_price, napa.source) == (
+        "Napa", "500 mg", "Beximco", 1.5, "prices")
+    assert (seclo.strength, seclo.unit_price) == ("", 0.0)
+    [ace] = adapters["kaggle"].records()
+    assert ace.unit_price == 40.12
+
+
+def test_invalid_config_is_rejected():
+    with pytest.raises(ValueError):
+        SourceAdapter("bad", SOURCES_CONFIG, {"colour": "colour"})
+    with pytest.raises(ValueError):
+        SourceAdapter("bad", SOURCES_CONFIG, {"price": "price"}, price_format="roman")
+
+
+def test_adapters_survive_pickling(config):
+    adapter = pickle.loads(pickle.dumps(load_sources(config)["prices"]))
+    assert next(adapter.records()).strength == "500 mg"
+
+
+def test_ranked_names_and_concurrent_loading(config):
+    adapters = load_sources(config)
+    assert ranked_names(adapters.values(), "price_precedence") == ["kaggle", "prices"]
+    assert ranked_names(adapters.values(), "info_precedence") == ["prices", "kaggle"]
+    assert load_concurrently(adapters.values(), count_records, executor="thread") == {"prices": 2, "kaggle": 1}
+
+
+def test_shipped_config_loads():
+    assert {"medex", "dgda", "kaggle"} <= set(load_sources())
@@ -0,0 +1,102 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks import validate_record
+from validation_rules import RuleSet, compile_rule, iter_chunks, load_rules, parse_number
+
+
+def evaluate(spec, records):
+    return RuleSet([compile_rule(spec)]).evaluate(records).violations[spec["name"]].tolist()
+
+
+@pytest.mark.parametrize("text, number", [
+    ("12.5", 12.5), ("৳ 1,200.50", 1200.5), (" 3 ", 3.0), ("-2", -2.0),
+])
+def test_parse_number(text, number):
+    assert parse_number(text) == number
+
+
+@pytest.mark.parametrize("text", ["", "n/a", "1.2.3"])
+def test_parse_number_nan(text):
+    assert math.isnan(parse_number(text))
+
+
+def test_required_and_number():
+    records = [{"price": "10"}, {"price": " "}, {"price": "abc"}, {}]
+    assert evaluate({"name": "r", "type": "required", "field": "price"}, records) == [False, True, False, True]
+    assert evaluate({"name": "n", "type": "number", "field": "price"}, records) == [False, False, True, False]
+
+
+def test_range_overrides_by_group():
+    spec = {"name": "range", "type": "range", "field": "price", "min": 0, "max": 100,
+            "by": "dosage_form", "ranges": {"IV Infusion": {"max": 1000}}}
+    records = [
+        {"price": "500", "dosage_form": "Tablet"},
+        {"price": "500", "dosage_form": "iv infusion"},
+        {"price": "5000", "dosage_form": "IV Infusion"},
+        {"price": "-1", "dosage_form": "IV Infusion"},
+        {"price": "", "dosage_form": "Tablet"},
+    ]
+    assert evaluate(spec, records) == [True, False, True, True, False]
+
+
+def test_regex_and_compare():
+    regex = {"name": "s", "type": "regex", "field": "strength", "pattern": r"\d+ mg"}
+    assert evaluate(regex, [{"strength": "500 mg"}, {"strength": "mg"}, {"strength": ""}]) == [False, True, False]
+    compare = {"name": "c", "type": "compare", "left": "unit_price", "op": "<=", "right": "price"}
+    records = [{"unit_price": "2", "price": "10"}, {"unit_price": "20", "price": "10"}, {"unit_price": "20", "price": ""}]
+    assert evaluate(compare, records) == [False, True, False]
+
+
+@pytest.mark.parametrize("spec", [
+    {"name": "x", "type": "unknown", "field": "price"},
+    {"name": "x", "type": "required", "field": "price", "severity": "fatal"},
+])
+def test_invalid_rules_raise(spec):
+    with pytest.raises(ValueError):
+        compile_rule(spec)
+
+
+def test_warnings_are_counted_not_rejected():
+    rules = RuleSet([
+        compile_rule({"name": "brand", "type": "required", "field": "brand_name"}),
+        compile_rule({"name": "strength", "type": "required", "field": "strength", "severity": "warning"}),
+    ])
+    result = rules.evaluate([{"brand_name": "Napa", "strength": ""}, {"brand_name": "", "strength": ""}])
+    assert result.rejected.tolist() == [False, True]
+    assert result.counts() == {"brand": 1, "strength": 2}
+    assert result.violations_by_row() == {0: ["strength"], 1: ["brand", "strength"]}
+
+
+def test_factorized_columns_match_distinct_columns():
+    spec = {"name": "range", "type": "range", "field": "price", "max": 100,
+            "by": "dosage_form", "ranges": {"Injection": {"max": 1000}}}
+    rng = random.Random(0)
+    records = [
+        {"price": str(rng.choice([5, 50, 500, 5000])), "dosage_form": rng.choice(["Tablet", "Injection"])}
+        for _ in range(200)
+    ]
+    repeated = evaluate(spec, records)  # Few distinct prices: factorized
+    unique = [{**record, "price": record["price"] + "." + "0" * i} for i, record in enumerate(records)]
+    assert evaluate(spec, unique) == repeated  # All prices distinct: parsed row at a time
+
+
+def test_shipped_rules_reject_like_validate_record():
+    rng = random.Random(1)
+    records = [
+        {
+            "brand_name": rng.choice(["Napa", "", "Ace"]),
+            "generic_name": rng.choice(["Paracetamol", ""]),
+            "manufacturer": rng.choice(["Beximco", "", "Square"]),
+            "strength": "500 mg",
+            "dosage_form": "Tablet",
+            "price": rng.choice(["", "12", "৳ 1,200.50", "60000", "abc", "1.2.3"]),
+        }
+        for _ in range(500)
+    ]
+    rules = load_rules()
+    rejected = np.concatenate([rules.evaluate(chunk).rejected for chunk in iter_chunks(records, 64)])
+    assert rejected.tolist() == [not validate_record(record)[0] for record in records]
@@ -2,39 +2,53 @@
 Update Database with REAL Kaggle Prices
 - Extracts prices from 'package container' field in Kaggle medicine.csv
 - Updates database with real prices and marks as VERIFIED
+- Names matched only by typo tolerance must share the manufacturer and are
+  marked FUZZY, not VERIFIED (a similar name can be another product)
 - Any medicine without real price stays ESTIMATED
+- Works on an in-memory copy that replaces the database atomically (db_publish.py)
 """
 
 import csv
-import re
-import sqlite3
 import sys
 
+from db_publish import open_copy, publish
+from fuzzy_match import BatchMatcher
+from manufacturer_registry import load_registry
+from package_price import extract_price
+
 sys.stdout.reconfigure(encoding='utf-8')
 
+# Similarity needed to accept a typo-tolerant name match (exact match first)
+FUZZY_MIN_SCORE = 0.9
+CONFIDENCE_FUZZY = 'FUZZY'
+
 def normalize_name(name):
     """Normalize medicine name for matching"""
     if not name:
         return ""
     return name.lower().strip()
 
-def extract_price(package_container):
-    """Extract price from package container field (e.g., '100 ml bottle: ৳ 40.12')"""
-    if not package_container:
+def manufacturer_key(registry, company):
+    """Registry id of a company, or its normalized name if the registry does not know it."""
+    manufacturer = registry.resolve(company or '')
+    return manufacturer.id if manufacturer else normalize_name(company)
+
+def match_price(name, mfr_key, kaggle_prices, names_by_mfr, matchers):
+    """
+    (price, fuzzy) for a normalized brand name, or None.
+    Exact names match across manufacturers; typo-tolerant matches only
+    within the manufacturer (matchers caches one BatchMatcher per manufacturer).
+    """
+    if name in kaggle_prices:
+        return kaggle_prices[name], False
+    if mfr_key not in names_by_mfr:
         return None
-    
-    # Look for Unit Price first, then any ৳ symbol
-    match = re.search(r'Unit Price:\s*৳\s*([\d,.]+)', package_container)
-    if not match:
-        match = re.search(r'৳\s*([\d,.]+)', package_container)
-    
-    if match:
-        price_str = match.group(1).replace(',', '')
-        try:
-            return float(price_str)
-        except:
-            return None
-    return None
+    if mfr_key not in matchers:
+        matchers[mfr_key] = BatchMatcher(sorted(names_by_mfr[mfr_key]))
+    best = matchers[mfr_key].top_k(name, k=1, min_score=FUZZY_MIN_SCORE)
+    if not best:
+        return None
+    return kaggle_prices[best[0][0]], True
 
 def main():
     kaggle_path = 'data_pipeline/input/kaggle_data/medicine.csv'
@@ -46,7 +60,9 @@ def main():
     
     # Step 1: Load Kaggle data with prices
     print("\n[1] Loading Kaggle medicine data...")
-    kaggle_prices = {}  # name -> (price, original)
+    kaggle_prices = {}  # name -> price
+    names_by_mfr = {}   # manufacturer key -> names with a price
+    registry = load_registry()
     
     with open(kaggle_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
@@ -59,12 +75,14 @@ def main():
                 # Keep the first (usually correct) price for each medicine
                 if name not in kaggle_prices:
                     kaggle_prices[name] = price
+                mfr_key = manufacturer_key(registry, row.get('manufacturer', ''))
+                names_by_mfr.setdefault(mfr_key, set()).add(name)
     
     print(f"   Loaded {len(kaggle_prices)} unique medicines with prices")
     
     # Step 2: Update database
     print("\n[2] Updating database...")
-    conn = sqlite3.connect(db_path)
+    conn = open_copy(db_path)
     c = conn.cursor()
     
     # First, mark all as ESTIMATED
@@ -72,23 +90,39 @@ def main():
     conn.commit()
     
     # Get all brands
-    c.execute("SELECT id, name, price FROM brands")
+    c.execute("""
+        SELECT b.id, b.name, m.name, b.price
+        FROM brands b
+        LEFT JOIN manufacturers m ON b.manufacturer_id = m.id
+    """)
     brands = c.fetchall()
     
     updated_count = 0
     verified_count = 0
+    fuzzy_count = 0
+    matchers = {}
     
-    for brand_id, brand_name, current_price in brands:
+    for brand_id, brand_name, mfr_name, current_price in brands:
         norm_name = normalize_name(brand_name)
+        mfr_key = manufacturer_key(registry, mfr_name)
+        match = match_price(norm_name, mfr_key, kaggle_prices, names_by_mfr, matchers)
         
-        if norm_name in kaggle_prices:
-            real_price = kaggle_prices[norm_name]
+        if match and match[1]:
+            # Typo-tolerant match: real price, but not VERIFIED
+            c.execute("""
+                UPDATE brands 
+                SET price = ?, verified = 0, confidence = ?
+                WHERE id = ?
+            """, (match[0], CONFIDENCE_FUZZY, brand_id))
+            updated_count += 1
+            fuzzy_count += 1
+        elif match:
             # Update with real price and mark as VERIFIED
             c.execute("""
                 UPDATE brands 
                 SET price = ?, verified = 1, confidence = 'VERIFIED'
                 WHERE id = ?
-            """, (real_price, brand_id))
+            """, (match[0], brand_id))
             updated_count += 1
             verified_count += 1
         else:
@@ -100,17 +134,20 @@ def main():
     # Step 3: Get final stats
     c.execute("SELECT COUNT(*) FROM brands WHERE verified = 1")
     verified = c.fetchone()[0]
-    c.execute("SELECT COUNT(*) FROM brands WHERE verified = 0")
+    c.execute("SELECT COUNT(*) FROM brands WHERE confidence = 'ESTIMATED'")
     estimated = c.fetchone()[0]
+    c.execute("SELECT COUNT(*) FROM brands WHERE confidence = ?", (CONFIDENCE_FUZZY,))
+    fuzzy = c.fetchone()[0]
     c.execute("SELECT COUNT(*) FROM brands")
     total = c.fetchone()[0]
     
-    print(f"   Updated {updated_count} medicines with real prices")
+    print(f"   Updated {updated_count} medicines with real prices ({fuzzy_count} by fuzzy name match)")
     
     print("\n" + "=" * 60)
     print("FINAL SUMMARY")
     print("=" * 60)
     print(f"🟢 VERIFIED (Real Kaggle Price): {verified} ({verified/total*100:.1f}%)")
+    print(f"🟡 FUZZY (Similar Name, Same Mfr): {fuzzy} ({fuzzy/total*100:.1f}%)")
     print(f"🟠 ESTIMATED (Generated Price):  {estimated} ({estimated/total*100:.1f}%)")
     print(f"📊 Total Medicines:              {total}")
     print("=" * 60)
@@ -123,10 +160,11 @@ def main():
     
     # Sample estimated medicines
     print("\nSample ESTIMATED medicines:")
-    c.execute("SELECT name, price FROM brands WHERE verified = 0 LIMIT 5")
+    c.execute("SELECT name, price FROM brands WHERE confidence = 'ESTIMATED' LIMIT 5")
     for name, price in c.fetchall():
         print(f"  ~ {name}: {price:.2f} Tk (estimated)")
     
+    publish(conn, db_path)
     conn.close()
     print("\n✅ Database updated successfully!")
 
@@ -2,66 +2,67 @@
 Medicine Saver BD - Data Validator
 
 Validates the scraped medicine data for completeness and sanity.
-Generates a validation report and cleans the data.
+Generates a validation report and cleans the data. Records are checked
+chunk by chunk against the declarative rules in validation_rules.json
+(validation_rules.py); rows violating an error rule are written, with the
+names of the rules they violate, to a quarantine file. Near-duplicate
+products ("Napa Extra" / "NAPA-EXTRA 500") are clustered with MinHash/LSH
+(near_duplicates.py) and listed in the report; they are not removed.
 
 Usage:
     python validate.py
+    python validate.py --merge-plan output/merge_plan.csv  # Also write a merge plan
+    python validate.py --no-near-duplicates
+    python validate.py --rules my_rules.json                # Alternative rule set
 """
 
+import argparse
 import csv
-import re
 from collections import Counter
 from pathlib import Path
 
+import numpy as np
+
+from near_duplicates import SIMILARITY_THRESHOLD, find_near_duplicates, write_merge_plan
+from validation_rules import CHUNK_SIZE, RULES_CONFIG, SEVERITY_WARNING, iter_chunks, load_rules
+
 # Paths
 INPUT_CSV = Path("output/raw_medicines.csv")
 VALIDATED_CSV = Path("output/validated_medicines.csv")
 REPORT_PATH = Path("output/validation_report.txt")
+QUARANTINE_CSV = Path("output/quarantined_medicines.csv")
 
-
-def validate_price(price_str: str) -> tuple[bool, float | None]:
-    """Validate and parse price string."""
-    if not price_str:
-        return True, None  # Missing price is acceptable
-
-    try:
-        # Remove currency symbols and clean
-        cleaned = re.sub(r"[^\d.]", "", price_str)
-        price = float(cleaned)
-
-        # Sanity checks
-        if price < 0:
-            return False, None
-        if price > 50000:  # Unreasonably high
-            return False, None
-
-        return True, price
-    except ValueError:
-        return False, None
-
-
-def validate_record(record: dict) -> tuple[bool, list[str]]:
-    """Validate a single medicine record."""
-    errors = []
-
-    # Required fields
-    if not record.get("brand_name"):
-        errors.append("Missing brand name")
-    if not record.get("generic_name"):
-        errors.append("Missing generic name")
-    if not record.get("manufacturer"):
-        errors.append("Missing manufacturer")
-
-    # Price validation
-    if record.get("price"):
-        is_valid_price, _ = validate_price(record["price"])
-        if not is_valid_price:
-            errors.append(f"Invalid price: {record['price']}")
-
-    return len(errors) == 0, errors
+FIELDNAMES = ["brand_name", "generic_name", "strength", "dosage_form",
+              "manufacturer", "price"]
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Validate scraped medicine data")
+    parser.add_argument(
+        "--merge-plan",
+        type=Path,
+        default=None,
+        help="Write a near-duplicate merge plan CSV (keep/merge per clustered row)",
+    )
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=SIMILARITY_THRESHOLD,
+        help=f"Near-duplicate similarity threshold (default: {SIMILARITY_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--no-near-duplicates",
+        action="store_true",
+        help="Skip near-duplicate clustering",
+    )
+    parser.add_argument(
+        "--rules",
+        type=Path,
+        default=RULES_CONFIG,
+        help="Validation rules config (default: validation_rules.json)",
+    )
+    args = parser.parse_args()
+
     if not INPUT_CSV.exists():
         print(f"Error: Input file not found at {INPUT_CSV}")
         print("Please run 'python scraper.py' first.")
@@ -82,29 +83,37 @@ def main():
         "warnings": 0,
         "missing_price": 0,
     }
-    error_counts = Counter()
+    rules = load_rules(args.rules)
+    rule_counts = Counter()
     valid_records = []
+    quarantined = []
 
-    # Validate each record
-    for record in records:
-        is_valid, errors = validate_record(record)
+    # Evaluate the rules a chunk at a time
+    for chunk in iter_chunks(records, CHUNK_SIZE):
+        result = rules.evaluate(chunk)
+        rule_counts.update(result.counts())
+        violated = result.violations_by_row()
 
-        if is_valid:
-            stats["valid"] += 1
-            valid_records.append(record)
-        else:
-            stats["invalid"] += 1
-            for error in errors:
-                error_counts[error] += 1
+        for row in np.flatnonzero(result.rejected).tolist():
+            quarantined.append(dict(chunk[row], violations="; ".join(violated[row])))
+        accepted = np.flatnonzero(~result.rejected).tolist()
+        valid_records.extend(chunk[row] for row in accepted)
+        stats["warnings"] += sum(1 for row in accepted if row in violated)
 
-        if not record.get("price"):
-            stats["missing_price"] += 1
+    stats["valid"] = len(valid_records)
+    stats["invalid"] = len(quarantined)
+    stats["missing_price"] = sum(1 for record in records if not record.get("price"))
 
     # Check for duplicates
     brand_names = [r["brand_name"] for r in valid_records]
     duplicates = [name for name, count in Counter(brand_names).items() if count > 1]
     stats["duplicates"] = len(duplicates)
 
+    # Cluster near-duplicates (spelling, case and suffix variants)
+    clusters = [] if args.no_near_duplicates else find_near_duplicates(valid_records, args.similarity)
+    stats["near_duplicate_clusters"] = len(clusters)
+    stats["near_duplicate_rows"] = sum(len(rows) for rows in clusters)
+
     # Generate report
     REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
     with open(REPORT_PATH, "w", encoding="utf-8") as f:
@@ -116,35 +125,57 @@ def main():
         f.write(f"  Total Records: {stats['total']}\n")
         f.write(f"  Valid Records: {stats['valid']}\n")
         f.write(f"  Invalid Records: {stats['invalid']}\n")
+        f.write(f"  Valid With Warnings: {stats['warnings']}\n")
         f.write(f"  Missing Price: {stats['missing_price']}\n")
-        f.write(f"  Duplicates: {stats['duplicates']}\n\n")
-
-        if error_counts:
-            f.write("ERROR BREAKDOWN:\n")
-            for error, count in error_counts.most_common():
-                f.write(f"  {error}: {count}\n")
+        f.write(f"  Duplicates: {stats['duplicates']}\n")
+        f.write(f"  Near-Duplicate Clusters: {stats['near_duplicate_clusters']} "
+                f"({stats['near_duplicate_rows']} records)\n\n")
+
+        if any(rule_counts.values()):
+            f.write("RULE VIOLATIONS:\n")
+            for rule in rules.rules:
+                if rule_counts[rule.name]:
+                    label = " (warning)" if rule.severity == SEVERITY_WARNING else ""
+                    f.write(f"  {rule.name}{label}: {rule_counts[rule.name]} - {rule.message}\n")
             f.write("\n")
 
         if duplicates[:10]:
             f.write(f"SAMPLE DUPLICATES (first 10 of {len(duplicates)}):\n")
             for dup in duplicates[:10]:
                 f.write(f"  - {dup}\n")
+            f.write("\n")
 
-    # Save validated records
-    fieldnames = ["brand_name", "generic_name", "strength", "dosage_form",
-                  "manufacturer", "price"]
+        if clusters:
+            f.write(f"SAMPLE NEAR-DUPLICATE CLUSTERS (first 10 of {len(clusters)}):\n")
+            for rows in clusters[:10]:
+                names = sorted({valid_records[row]["brand_name"] for row in rows})
+                sample = valid_records[rows[0]]
+                f.write(f"  - {len(rows)} records: {' / '.join(names)} "
+                        f"({sample.get('strength', '')}, {sample.get('dosage_form', '')})\n")
 
+    # Save validated and quarantined records
     with open(VALIDATED_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES, extrasaction="ignore")
         writer.writeheader()
         writer.writerows(valid_records)
 
+    with open(QUARANTINE_CSV, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES + ["violations"], extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(quarantined)
+
     print(f"\nValidation complete!")
     print(f"  Valid: {stats['valid']} / {stats['total']}")
-    print(f"  Invalid: {stats['invalid']}")
+    print(f"  Invalid: {stats['invalid']} (quarantined to {QUARANTINE_CSV})")
+    print(f"  Near-duplicate clusters: {stats['near_duplicate_clusters']} "
+          f"({stats['near_duplicate_rows']} records)")
     print(f"  Report saved to: {REPORT_PATH}")
     print(f"  Clean data saved to: {VALIDATED_CSV}")
 
+    if args.merge_plan:
+        write_merge_plan(valid_records, clusters, args.merge_plan)
+        print(f"  Merge plan saved to: {args.merge_plan}")
+
 
 if __name__ == "__main__":
     main()
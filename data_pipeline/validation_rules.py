@@ -0,0 +1,325 @@
+"""
+Medicine Saver BD - Validation Rule Engine
+
+Declarative validation rules, kept in validation_rules.json next to this
+script:
+
+    {
+        "rules": [
+            {"name": "brand_name_required", "type": "required", "field": "brand_name"},
+            {"name": "price_range", "type": "range", "field": "price",
+             "min": 0, "max": 50000, "by": "dosage_form",
+             "ranges": {"IV Infusion": {"max": 500000}}},
+            {"name": "strength_format", "type": "regex", "field": "strength",
+             "pattern": "[0-9].*", "severity": "warning"},
+            {"name": "unit_price_within_price", "type": "compare",
+             "left": "unit_price", "op": "<=", "right": "price"}
+        ]
+    }
+
+Rule types:
+- required: the field is not blank
+- number:   the field is blank or a number ("৳ 1,200.50" counts)
+- range:    a present number lies within [min, max]; with "by", the bounds
+            can be overridden per value of another field (case-insensitive)
+- regex:    a present value fully matches "pattern"
+- compare:  "left" <op> "right" wherever both are numbers
+
+Every rule compiles to a function from a chunk of records to a boolean
+violation mask. Each field a rule reads is pulled out of the
+chunk once, with C-level map() calls; columns whose values repeat
+(dosage forms, strengths, manufacturers) are factorized into distinct
+values plus integer row codes, so number parsing, regex matching and
+per-group bound lookups run once per distinct value and are broadcast
+back to the rows by indexing with the codes. Masks are combined as numpy
+arrays. Rows violating an
+"error" rule (the default severity) are rejected; "warning" rules are
+only counted.
+
+Usage:
+    python validation_rules.py                                 # Per-rule counts for raw_medicines.csv
+    python validation_rules.py --input output/verified_medicines.csv
+
+    rules = load_rules()
+    result = rules.evaluate(records)
+    result.counts()             # {"brand_name_required": 0, ...}
+    result.rejected             # bool mask of rows violating an error rule
+"""
+
+import argparse
+import csv
+import json
+import math
+import operator
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+
+# Paths
+RULES_CONFIG = Path(__file__).parent / "validation_rules.json"
+DEFAULT_INPUT = Path("output/raw_medicines.csv")
+
+# Records evaluated per chunk
+CHUNK_SIZE = 50_000
+
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+
+COMPARISONS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+NON_NUMBER_CHARS = re.compile(r"[^\d.]")
+
+
+def parse_number(text: str) -> float:
+    """Number in a price-like string ("৳ 1,200.50" -> 1200.5); NaN if there is none."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return float(NON_NUMBER_CHARS.sub("", text))
+    except ValueError:
+        return math.nan
+
+
+class ColumnChunk:
+    """A chunk of records as columns of stripped field values."""
+
+    def __init__(self, records: list[dict]):
+        self.records = records
+        self._values: dict[str, list[str]] = {}
+        self._codes: dict[str, tuple[list[str], np.ndarray] | None] = {}
+        self._numbers: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def values(self, name: str) -> list[str]:
+        """Stripped values of a field ("" where a record lacks it)."""
+        values = self._values.get(name)
+        if values is None:
+            try:
+                values = list(map(str.strip, map(operator.itemgetter(name), self.records)))
+            except (KeyError, TypeError):
+                values = [str(record.get(name) or "").strip() for record in self.records]
+            self._values[name] = values
+        return values
+
+    def codes(self, name: str) -> tuple[list[str], np.ndarray] | None:
+        """
+        (distinct values, index of each row's value) of a field, or None
+        when most values are distinct and factorizing would not pay off.
+        """
+        if name not in self._codes:
+            values = self.values(name)
+            distinct = dict.fromkeys(values)
+            codes = None
+            if len(distinct) * 2 <= len(values):
+                index = {value: i for i, value in enumerate(distinct)}
+                codes = list(index), np.fromiter(map(index.__getitem__, values), dtype=np.intp, count=len(values))
+            self._codes[name] = codes
+        return self._codes[name]
+
+    def per_value(self, name: str, function: Callable[[str], object], dtype=bool) -> np.ndarray:
+        """function() of each row's value, called once per distinct value where they repeat."""
+        codes = self.codes(name)
+        if codes is None:
+            values = self.values(name)
+            return np.fromiter(map(function, values), dtype=dtype, count=len(values))
+        distinct, rows = codes
+        return np.array([function(value) for value in distinct], dtype=dtype)[rows]
+
+    def blank(self, name: str) -> np.ndarray:
+        """Rows where a field is missing or whitespace."""
+        values = self.values(name)
+        return np.fromiter(map(operator.not_, values), dtype=bool, count=len(values))
+
+    def numbers(self, name: str) -> np.ndarray:
+        """A field parsed as numbers (NaN where blank or malformed)."""
+        column = self._numbers.get(name)
+        if column is None:
+            column = self._numbers[name] = self.per_value(name, parse_number, np.float64)
+        return column
+
+
+@dataclass
+class Rule:
+    """A compiled rule: check() maps a chunk to its violation mask."""
+    name: str
+    kind: str
+    severity: str
+    message: str
+    check: Callable[[ColumnChunk], np.ndarray]
+
+
+def compile_required(spec: dict) -> Callable[[ColumnChunk], np.ndarray]:
+    name = spec["field"]
+    return lambda chunk: chunk.blank(name)
+
+
+def compile_number(spec: dict) -> Callable[[ColumnChunk], np.ndarray]:
+    name = spec["field"]
+    return lambda chunk: ~chunk.blank(name) & np.isnan(chunk.numbers(name))
+
+
+def compile_range(spec: dict) -> Callable[[ColumnChunk], np.ndarray]:
+    name, group = spec["field"], spec.get("by")
+    default = (float(spec.get("min", -math.inf)), float(spec.get("max", math.inf)))
+    overrides = {
+        key.lower(): (float(bounds.get("min", default[0])), float(bounds.get("max", default[1])))
+        for key, bounds in spec.get("ranges", {}).items()
+    }
+
+    def check(chunk: ColumnChunk) -> np.ndarray:
+        values = chunk.numbers(name)
+        if group and overrides:
+            low = chunk.per_value(group, lambda value: overrides.get(value.lower(), default)[0], np.float64)
+            high = chunk.per_value(group, lambda value: overrides.get(value.lower(), default)[1], np.float64)
+        else:
+            low, high = default
+        # NaN compares False, so blank and malformed values pass
+        return (values < low) | (values > high)
+
+    return check
+
+
+def compile_regex(spec: dict) -> Callable[[ColumnChunk], np.ndarray]:
+    name, pattern = spec["field"], re.compile(spec["pattern"])
+
+    return lambda chunk: chunk.per_value(
+        name, lambda value: bool(value) and pattern.fullmatch(value) is None,
+    )
+
+
+def compile_compare(spec: dict) -> Callable[[ColumnChunk], np.ndarray]:
+    left, right, compare = spec["left"], spec["right"], COMPARISONS[spec["op"]]
+
+    def check(chunk: ColumnChunk) -> np.ndarray:
+        a, b = chunk.numbers(left), chunk.numbers(right)
+        return ~(np.isnan(a) | np.isnan(b)) & ~compare(a, b)
+
+    return check
+
+
+RULE_COMPILERS = {
+    "required": compile_required,
+    "number": compile_number,
+    "range": compile_range,
+    "regex": compile_regex,
+    "compare": compile_compare,
+}
+
+
+def compile_rule(spec: dict) -> Rule:
+    """Rule from its config entry (ValueError for unknown types or severities)."""
+    compiler = RULE_COMPILERS.get(spec["type"])
+    if compiler is None:
+        raise ValueError(f"Rule {spec['name']!r}: unknown type {spec['type']!r}")
+    severity = spec.get("severity", SEVERITY_ERROR)
+    if severity not in (SEVERITY_ERROR, SEVERITY_WARNING):
+        raise ValueError(f"Rule {spec['name']!r}: unknown severity {severity!r}")
+    return Rule(
+        name=spec["name"],
+        kind=spec["type"],
+        severity=severity,
+        message=spec.get("message", spec["name"]),
+        check=compiler(spec),
+    )
+
+
+@dataclass
+class RuleResult:
+    """Violation masks of one chunk, by rule name, and the rows rejected."""
+    violations: dict[str, np.ndarray]
+    rejected: np.ndarray
+
+    def counts(self) -> dict[str, int]:
+        """Violations per rule."""
+        return {name: int(mask.sum()) for name, mask in self.violations.items()}
+
+    def violations_by_row(self) -> dict[int, list[str]]:
+        """Violated rule names (in rule order) of every row with a violation."""
+        names = list(self.violations)
+        if not names:
+            return {}
+        rules, rows = np.nonzero(np.vstack(list(self.violations.values())))
+        by_row = defaultdict(list)
+        for index in np.argsort(rows, kind="stable").tolist():
+            by_row[int(rows[index])].append(names[rules[index]])
+        return by_row
+
+
+class RuleSet:
+    """Compiled rules, evaluated a chunk at a time."""
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = rules
+
+    def evaluate(self, records: list[dict]) -> RuleResult:
+        """Evaluate every rule over one chunk of records."""
+        chunk = ColumnChunk(records)
+        violations = {rule.name: rule.check(chunk) for rule in self.rules}
+        rejected = np.zeros(len(chunk), dtype=bool)
+        for rule in self.rules:
+            if rule.severity == SEVERITY_ERROR:
+                rejected |= violations[rule.name]
+        return RuleResult(violations, rejected)
+
+
+def load_rules(path: Path = RULES_CONFIG) -> RuleSet:
+    """Rule set from validation_rules.json."""
+    with open(path, "r", encoding="utf-8") as f:
+        specs = json.load(f)["rules"]
+    return RuleSet([compile_rule(spec) for spec in specs])
+
+
+def iter_chunks(records: Iterable[dict], chunk_size: int = CHUNK_SIZE) -> Iterator[list[dict]]:
+    """Consecutive lists of up to chunk_size records."""
+    records = iter(records)
+    while chunk := list(islice(records, chunk_size)):
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count validation rule violations in a CSV")
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT, help="CSV to check")
+    parser.add_argument("--rules", type=Path, default=RULES_CONFIG, help="Rules config")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"Error: {args.input} not found")
+        return
+
+    rules = load_rules(args.rules)
+    counts, total, rejected = Counter(), 0, 0
+    with open(args.input, "r", encoding="utf-8") as f:
+        for chunk in iter_chunks(csv.DictReader(f), args.chunk_size):
+            result = rules.evaluate(chunk)
+            counts.update(result.counts())
+            total += len(chunk)
+            rejected += int(result.rejected.sum())
+
+    print(f"\n{'=' * 50}")
+    print(f"VALIDATION RULES: {args.input}")
+    print(f"{'=' * 50}")
+    print(f"  Records:  {total:,}")
+    print(f"  Rejected: {rejected:,}")
+    for rule in rules.rules:
+        print(f"  {rule.name:<28} {rule.severity:<8} {counts[rule.name]:>8,}")
+
+
+if __name__ == "__main__":
+    main()
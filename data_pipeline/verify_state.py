@@ -0,0 +1,129 @@
+"""
+Medicine Saver BD - Persistent Cross-Verification State
+
+Keeps the result of the last cross-verification per match key in SQLite
+(output/verify_state.db), so a re-run only recomputes the keys touched by
+changed source rows and regenerates the CSV outputs from this table.
+
+Tables:
+    verified   one row per match key: the VerifiedMedicine fields (with
+               price_sources split into medex_price/dgda_price), the source
+               the row was built from (0 = Medex, 1 = DGDA), that record's
+               raw brand name, strength and unit price, and the deviation
+               (NULL if not flagged)
+    meta       settings and ingest-state fingerprints the rows were built from
+
+Usage:
+    state = VerifyState()
+    rows = state.load_rows()    # {match_key: (origin_source, origin, fields, deviation)}
+    state.save(upserts, deleted_keys, meta)
+"""
+
+import sqlite3
+from pathlib import Path
+
+# Paths
+VERIFY_STATE_DB = Path(__file__).parent / "output" / "verify_state.db"
+
+# VerifiedMedicine fields in declaration order
+VERIFIED_COLUMNS = (
+    "brand_name", "generic_name", "strength", "dosage_form", "manufacturer",
+    "verified_price", "unit_price", "pack_size", "indication", "side_effects",
+    "confidence", "price_sources", "discrepancy_flag", "discrepancy_details",
+    "last_updated",
+)
+PRICE_SOURCES_COLUMN = VERIFIED_COLUMNS.index("price_sources")
+
+# Stored columns: price_sources is kept as one price column per source
+STORED_COLUMNS = (
+    VERIFIED_COLUMNS[:PRICE_SOURCES_COLUMN]
+    + ("medex_price", "dgda_price")
+    + VERIFIED_COLUMNS[PRICE_SOURCES_COLUMN + 1:]
+)
+ORIGIN_COLUMNS = ("origin_brand_name", "origin_strength", "origin_unit_price")
+
+
+class VerifyState:
+    """Per-key cross-verification results from the previous run."""
+
+    def __init__(self, path: Path = VERIFY_STATE_DB):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS verified (
+                match_key TEXT PRIMARY KEY,
+                origin_source INTEGER NOT NULL,
+                {", ".join(ORIGIN_COLUMNS)},
+                {", ".join(STORED_COLUMNS)},
+                deviation_percent REAL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def load_meta(self) -> dict[str, str]:
+        """Settings and fingerprints recorded by the last save()."""
+        return dict(self.conn.execute("SELECT name, value FROM meta"))
+
+    def load_rows(self) -> dict[str, tuple[int, tuple, tuple, float | None]]:
+        """
+        All stored results.
+        Returns: {match_key: (origin_source, (origin brand, strength, unit price),
+                  verified_fields, deviation_percent)}
+        """
+        rows = {}
+        cursor = self.conn.execute(
+            f"SELECT match_key, origin_source, {', '.join(ORIGIN_COLUMNS)}, "
+            f"{', '.join(STORED_COLUMNS)}, deviation_percent FROM verified"
+        )
+        split = PRICE_SOURCES_COLUMN
+        for key, origin_source, brand, strength, unit_price, *stored, deviation in cursor:
+            price_sources = {}
+            if stored[split] is not None:
+                price_sources["medex"] = stored[split]
+            if stored[split + 1] is not None:
+                price_sources["dgda"] = stored[split + 1]
+            stored[split + 2] = bool(stored[split + 2])
+            fields = (*stored[:split], price_sources, *stored[split + 2:])
+            rows[key] = (origin_source, (brand, strength, unit_price), fields, deviation)
+        return rows
+
+    def save(
+        self,
+        upserts: dict[str, tuple[int, tuple, tuple, float | None]],
+        deleted_keys,
+        meta: dict[str, str],
+        replace: bool = False,
+    ) -> None:
+        """
+        Write recomputed keys (same layout as load_rows()) and drop deleted
+        ones in one transaction. With replace=True the table is cleared first.
+        """
+        placeholders = ", ".join("?" * (len(ORIGIN_COLUMNS) + len(STORED_COLUMNS) + 3))
+        split = PRICE_SOURCES_COLUMN
+        records = []
+        for key, (origin_source, origin, fields, deviation) in upserts.items():
+            price_sources = fields[split]
+            records.append((
+                key, origin_source, *origin,
+                *fields[:split], price_sources.get("medex"), price_sources.get("dgda"),
+                *fields[split + 1:], deviation,
+            ))
+
+        with self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM verified")
+            self.conn.executemany(
+                "DELETE FROM verified WHERE match_key = ?", ((key,) for key in deleted_keys)
+            )
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO verified VALUES ({placeholders})", records
+            )
+            self.conn.execute("DELETE FROM meta")
+            self.conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
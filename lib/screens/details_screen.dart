@@ -7,6 +7,7 @@ import '../services/price_report_service.dart';
 import '../models/price_report.dart';
 import '../models/brand.dart';
 import '../services/auth_service.dart';
+import '../services/database_helper.dart';
 
 /// Displays full details for a medicine, alternatives, and savings calculator.
 class DetailsScreen extends StatefulWidget {
@@ -23,6 +24,7 @@ class DetailsScreen extends StatefulWidget {
   final DateTime? lastUpdated;
   final String? heroTag;
   final int? brandId; // Added ID for reporting
+  final int? genericId; // Indication/side effects are fetched by ID when not given
 
   const DetailsScreen({
     super.key,
@@ -39,6 +41,7 @@ class DetailsScreen extends StatefulWidget {
     this.lastUpdated,
     this.heroTag,
     this.brandId,
+    this.genericId,
   });
 
   @override
@@ -90,10 +93,32 @@ class _DetailsScreenState extends State<DetailsScreen> {
   bool _isLoadingReports = false;
   double? _averageStreetPrice;
 
+  // Medical text, from the widget or loaded lazily from the database
+  String? _indication;
+  String? _sideEffects;
+
   @override
   void initState() {
     super.initState();
+    _indication = widget.indication;
+    _sideEffects = widget.sideEffects;
     _loadReports();
+    _loadMonograph();
+  }
+
+  Future<void> _loadMonograph() async {
+    if (_indication != null || _sideEffects != null || widget.genericId == null) return;
+    try {
+      final generic = await DatabaseHelper.instance.getGeneric(widget.genericId!);
+      if (generic != null && mounted) {
+        setState(() {
+          _indication = generic.indication;
+          _sideEffects = generic.sideEffects;
+        });
+      }
+    } catch (_) {
+      // No text to show (e.g. a database from before generic_monographs)
+    }
   }
 
   Future<void> _loadReports() async {
@@ -555,19 +580,19 @@ class _DetailsScreenState extends State<DetailsScreen> {
     return Column(
       crossAxisAlignment: CrossAxisAlignment.start,
       children: [
-        if (widget.indication != null && widget.indication!.isNotEmpty) ...[
+        if (_indication != null && _indication!.isNotEmpty) ...[
           Text(
             'Indication',
             style: Theme.of(context).textTheme.titleMedium,
           ),
           const SizedBox(height: 8),
           Text(
-            widget.indication!,
+            _indication!,
             style: Theme.of(context).textTheme.bodyMedium,
           ),
           const SizedBox(height: 16),
         ],
-        if (widget.sideEffects != null && widget.sideEffects!.isNotEmpty) ...[
+        if (_sideEffects != null && _sideEffects!.isNotEmpty) ...[
           Text(
             'Side Effects',
             style: Theme.of(context).textTheme.titleMedium?.copyWith(
@@ -589,7 +614,7 @@ class _DetailsScreenState extends State<DetailsScreen> {
                 const SizedBox(width: 8),
                 Expanded(
                   child: Text(
-                    widget.sideEffects!,
+                    _sideEffects!,
                     style: Theme.of(context).textTheme.bodyMedium,
                   ),
                 ),
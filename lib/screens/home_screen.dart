@@ -634,6 +634,7 @@ class _HomeScreenState extends State<HomeScreen> with TickerProviderStateMixin {
                               MaterialPageRoute(
                                 builder: (context) => DetailsScreen(
                                   brandId: _exactMatch!.id,
+                                  genericId: _exactMatch!.genericId,
                                   brandName: _exactMatch!.name,
                                   genericName: _exactMatch!.genericName ?? 'Unknown',
                                   manufacturer: _exactMatch!.manufacturerName ?? 'Unknown',
@@ -917,6 +918,8 @@ class _HomeScreenState extends State<HomeScreen> with TickerProviderStateMixin {
                                         packSize: brand.packSize,
                                         isCheapest: isCheapest,
                                         isVerified: brand.verified,
+                                        brandId: brand.id,
+                                        genericId: brand.genericId,
                                         onAddToCabinet: () => _addToCabinet(brand),
                                       ),
                                     ),
@@ -109,6 +109,7 @@ class _ScannerScreenState extends State<ScannerScreen> {
                                       indication: null, // Will be fetched in details
                                       sideEffects: null,
                                       brandId: brand.id,
+                                      genericId: brand.genericId,
                                     ),
                                   ),
                                 );
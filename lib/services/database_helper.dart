@@ -1,3 +1,4 @@
+import 'dart:convert';
 import 'dart:io';
 import 'package:flutter/services.dart';
 import 'package:path/path.dart';
@@ -10,6 +11,8 @@ import '../models/models.dart';
 class DatabaseHelper {
   static final DatabaseHelper instance = DatabaseHelper._init();
   static Database? _database;
+  static List<int>? _monographDictionary;
+  static bool _monographDictionaryLoaded = false;
 
   DatabaseHelper._init();
 
@@ -60,14 +63,36 @@ class DatabaseHelper {
       path,
       version: 1,
       onCreate: (Database db, int version) async {
-        // Generics table
+        // Generics table (names only; searches join through it)
         await db.execute('''
           CREATE TABLE IF NOT EXISTS generics (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            indication TEXT,
-            dosage_info TEXT,
-            side_effects TEXT
+            name TEXT NOT NULL
+          )
+        ''');
+
+        // Long-form medical text, read only by the details screen: IDs of
+        // deduplicated texts, compressed against a shared dictionary
+        await db.execute('''
+          CREATE TABLE IF NOT EXISTS generic_monographs (
+            generic_id INTEGER PRIMARY KEY,
+            indication_id INTEGER,
+            dosage_info_id INTEGER,
+            side_effects_id INTEGER,
+            contraindication_id INTEGER
+          )
+        ''');
+        await db.execute('''
+          CREATE TABLE IF NOT EXISTS monograph_texts (
+            id INTEGER PRIMARY KEY,
+            hash BLOB NOT NULL UNIQUE,
+            body BLOB NOT NULL
+          )
+        ''');
+        await db.execute('''
+          CREATE TABLE IF NOT EXISTS monograph_dictionary (
+            id INTEGER PRIMARY KEY,
+            data BLOB NOT NULL
           )
         ''');
 
@@ -181,18 +206,55 @@ class DatabaseHelper {
     return strengths;
   }
 
-  /// Gets a specific generic by ID.
+  /// Gets a specific generic by ID, with its medical text.
+  /// The text lives in generic_monographs, off the search path, so it is
+  /// only read here (when a details screen opens).
   Future<Generic?> getGeneric(int id) async {
     final db = await database;
-    final List<Map<String, dynamic>> results = await db.query(
-      'generics',
-      where: 'id = ?',
-      whereArgs: [id],
-      limit: 1,
-    );
+    final List<Map<String, dynamic>> results = await db.rawQuery('''
+      SELECT
+        g.id, g.name,
+        i.body AS indication, d.body AS dosage_info, s.body AS side_effects
+      FROM generics g
+      LEFT JOIN generic_monographs m ON m.generic_id = g.id
+      LEFT JOIN monograph_texts i ON i.id = m.indication_id
+      LEFT JOIN monograph_texts d ON d.id = m.dosage_info_id
+      LEFT JOIN monograph_texts s ON s.id = m.side_effects_id
+      WHERE g.id = ?
+      LIMIT 1
+    ''', [id]);
 
     if (results.isEmpty) return null;
-    return Generic.fromMap(results.first);
+    final row = Map<String, dynamic>.from(results.first);
+    final dictionary = await _getMonographDictionary(db);
+    for (final column in const ['indication', 'dosage_info', 'side_effects']) {
+      final body = row[column];
+      row[column] = body == null
+          ? null
+          : _decodeMonographText(body as List<int>, dictionary);
+    }
+    return Generic.fromMap(row);
+  }
+
+  /// The preset dictionary monograph texts are compressed against
+  /// (null if there is none), read once per connection.
+  Future<List<int>?> _getMonographDictionary(Database db) async {
+    if (!_monographDictionaryLoaded) {
+      final rows = await db.rawQuery(
+        'SELECT data FROM monograph_dictionary WHERE id = 1',
+      );
+      final data = rows.isEmpty ? null : rows.first['data'] as List<int>;
+      _monographDictionary = data == null || data.isEmpty ? null : data;
+      _monographDictionaryLoaded = true;
+    }
+    return _monographDictionary;
+  }
+
+  /// Text of a monograph_texts body: raw deflate against the dictionary
+  /// (see data_pipeline/monograph_store.py).
+  String _decodeMonographText(List<int> body, List<int>? dictionary) {
+    final decoder = ZLibDecoder(raw: true, dictionary: dictionary);
+    return utf8.decode(decoder.convert(body));
   }
 
   /// Closes the database connection.
@@ -200,5 +262,7 @@ class DatabaseHelper {
     final db = await database;
     await db.close();
     _database = null;
+    _monographDictionary = null;
+    _monographDictionaryLoaded = false;
   }
 }
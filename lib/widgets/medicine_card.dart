@@ -14,6 +14,8 @@ class MedicineCard extends StatelessWidget {
   final String? packSize;
   final bool isCheapest;
   final bool isVerified; // True = real price, False = estimated price
+  final int? brandId;
+  final int? genericId; // Lets the details screen load the indication and side effects
   final VoidCallback? onAddToCabinet;
   
   // Trusted manufacturers in Bangladesh (#6)
@@ -34,6 +36,8 @@ class MedicineCard extends StatelessWidget {
     this.packSize,
     this.isCheapest = false,
     this.isVerified = false,
+    this.brandId,
+    this.genericId,
     this.onAddToCabinet,
   });
   
@@ -80,15 +84,16 @@ class MedicineCard extends StatelessWidget {
               MaterialPageRoute(
                 builder: (context) => DetailsScreen(
                   heroTag: '${brandName}_$strength',
+                  brandId: brandId,
+                  genericId: genericId,
                   brandName: brandName,
                   genericName: genericName,
                   manufacturer: manufacturer,
                   strength: strength,
                   dosageForm: dosageForm,
                   price: price,
-                  indication: 'Used for treating acid reflux, heartburn, and GERD.',
-                  sideEffects: 'Headache, nausea, diarrhea, abdominal pain.',
-                  lastUpdated: DateTime(2025, 12, 1),
+                  packSize: packSize,
+                  isVerified: isVerified,
                 ),
               ),
             );